@@ -0,0 +1,113 @@
+###
+# VEP MIDI AutoMate 1.0.0 cli.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+import argparse, json, multiprocessing, signal, sys, threading, time, core
+from pathlib import Path
+
+ABORT_HOTKEY = 'ctrl+f12'
+BULLET = '▸'
+
+EXIT_OKAY = 0
+EXIT_ERROR = 1
+EXIT_CSV_PROBLEMS = 3
+EXIT_ABORTED = 4
+EXIT_VEP_NOT_FOUND = 5
+EXIT_DESTINATION_FAILED = 6
+EXIT_ROWS_SKIPPED = 7
+
+def emit(event, **details):
+    # writes one progress event as a line of JSON
+    print(json.dumps({'event': event, 'time': round(time.time(), 3), **details}, ensure_ascii=False), flush=True)
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(prog='cli.py', description='Runs VEP MIDI AutoMate without the GUI, writing newline-delimited JSON progress events to stdout.', epilog=f'exit codes: {EXIT_OKAY} done, {EXIT_ERROR} error, 2 bad arguments, {EXIT_CSV_PROBLEMS} CSV problems, {EXIT_ABORTED} aborted, {EXIT_VEP_NOT_FOUND} VEP not found, {EXIT_DESTINATION_FAILED} destination failed, {EXIT_ROWS_SKIPPED} done but some rows skipped (with --recover)')
+    parser.add_argument('csv_paths', nargs='*', metavar='CSV', help='CSV files to input, one after another')
+    parser.add_argument('--export', metavar='OUT', help='read the MIDI Controllers table of the open VEP window back into a CSV at OUT, after inputting any CSVs given')
+    parser.add_argument('--slow-mode', action='store_true', help='pause between all UI events')
+    parser.add_argument('--sync', action='store_true', help='keep the rows unchanged since the last successful run in the same VEP window, and only input the rest')
+    parser.add_argument('--turbo', action='store_true', help='stop waiting for steps that keep succeeding, checking them every few rows instead (ignored with --slow-mode)')
+    parser.add_argument('--recover', action='store_true', help='when a row fails, delete it and try again once, then skip it, writing skipped rows to CSV-rejects.csv, instead of stopping')
+    parser.add_argument('--navigation', choices=['mouse', 'keyboard'], default='mouse', help='select menu items by hovering over them (default) or with arrow keys')
+    parser.add_argument('--record', action='store_true', help='record every captured frame to a .vmarec file next to each CSV, for replay.py')
+    parser.add_argument('--no-hotkey', action='store_true', help=f'do not listen for \'{ABORT_HOTKEY}\' to abort (Ctrl+C still aborts)')
+    options = parser.parse_args(arguments)
+    if not options.csv_paths and not options.export:
+        parser.error('give at least one CSV to input, or --export OUT')
+    return options
+
+def run(path, abort_event, abort_time, slow_mode, record=False, navigation='mouse', turbo_mode=False, sync=False, recovery=False):
+    # inputs one CSV, returning its exit code
+    problems = core.find_csv_problems(path)
+    if problems:
+        emit('csv_problems', csv=str(path), problems=problems)
+        return EXIT_CSV_PROBLEMS
+    record_path = core.recording_path(path) if record else None
+    emit('start', csv=str(path), slow_mode=slow_mode, turbo_mode=turbo_mode, sync=sync, recovery=recovery, navigation=navigation, **({'recording': str(record_path)} if record_path else {}))
+    skipped_rows = []
+    def progress(details):
+        if details['event'] == 'rejected':
+            skipped_rows.append(details['csv_row'])
+        emit(details.pop('event'), csv=str(path), **details)
+    exit_code = call_core(path, core.go, path, abort_event, slow_mode, lambda message: emit('log', csv=str(path), message=message), core.REQUIRED_HEADERS, BULLET, progress_callback=progress, abort_time=abort_time, record_path=record_path, navigation=navigation, turbo_mode=turbo_mode, sync=sync, recovery=recovery)
+    return EXIT_ROWS_SKIPPED if exit_code == EXIT_OKAY and skipped_rows else exit_code
+
+def export(path, abort_event, abort_time):
+    # reads the VEP table back into the CSV at path, returning the exit code
+    emit('start', csv=str(path), export=True)
+    return call_core(path, core.export_table, path, abort_event, lambda message: emit('log', csv=str(path), message=message), core.REQUIRED_HEADERS, BULLET, progress_callback=lambda details: emit(details.pop('event'), csv=str(path), **details), abort_time=abort_time)
+
+def call_core(path, function, *args, **kwargs):
+    # calls a core entry point, turning its exceptions into error events and exit codes
+    try:
+        function(*args, **kwargs)
+    except core.VEP_MIDI_AutoMate_Abort as e:
+        emit('aborted', csv=str(path), message=str(e))
+        return EXIT_ABORTED
+    except core.VEP_MIDI_AutoMate_Not_Found as e:
+        emit('error', csv=str(path), kind='vep_not_found', message=str(e))
+        return EXIT_VEP_NOT_FOUND
+    except core.VEP_MIDI_AutoMate_Destination_Error as e:
+        emit('error', csv=str(path), kind='destination', message=str(e))
+        return EXIT_DESTINATION_FAILED
+    except Exception as e:
+        emit('error', csv=str(path), kind='error', message=str(e))
+        return EXIT_ERROR
+    return EXIT_OKAY
+
+def main(arguments=None):
+    options = parse_arguments(arguments)
+    abort_event = threading.Event()
+    abort_time = multiprocessing.Value('d', 0.0)
+    abort = lambda *_: core.request_abort(abort_event, abort_time)
+    signal.signal(signal.SIGINT, abort)
+    hotkey_handle = None
+    if not options.no_hotkey:
+        try:
+            import keyboard
+            hotkey_handle = keyboard.add_hotkey(ABORT_HOTKEY, abort)
+        except Exception as e:
+            emit('log', message=f'Could not listen for \'{ABORT_HOTKEY}\' ({e}). Press Ctrl+C to abort.')
+    try:
+        final_exit_code = EXIT_OKAY
+        for csv_path in options.csv_paths:
+            exit_code = run(Path(csv_path), abort_event, abort_time, options.slow_mode, options.record, options.navigation, options.turbo, options.sync, options.recover)
+            if exit_code == EXIT_ROWS_SKIPPED:
+                final_exit_code = exit_code # skipped rows are in the rejects CSV, so carry on with the next CSV
+            elif exit_code != EXIT_OKAY:
+                return exit_code
+        if options.export:
+            exit_code = export(Path(options.export), abort_event, abort_time)
+            if exit_code != EXIT_OKAY:
+                return exit_code
+        return final_exit_code
+    finally:
+        if hotkey_handle is not None:
+            try:
+                keyboard.remove_hotkey(hotkey_handle)
+            except Exception:
+                pass
+
+if __name__ == '__main__':
+    sys.exit(main())
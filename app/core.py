@@ -3,19 +3,197 @@
 # https://github.com/robertrussell22/VEP-MIDI-AutoMate
 ###
 
-import os, sys, time, datetime, ctypes, mss, csv, psutil
-import numpy as np
-import pygetwindow as gw
-import pyautogui as pag
-from ctypes import wintypes
-from PIL import ImageChops
+import os, sys, re, time, datetime, csv, json, importlib, statistics, struct, zlib
+from pathlib import Path
+
+class Lazy_Module:
+    # stands in for a module that is only imported the first time it is used, keeping start-up fast
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+    def _load(self):
+        if self._module is None:
+            object.__setattr__(self, '_module', importlib.import_module(self._name))
+        return self._module
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+ctypes = Lazy_Module('ctypes')
+wintypes = Lazy_Module('ctypes.wintypes')
+mss = Lazy_Module('mss')
+psutil = Lazy_Module('psutil')
+np = Lazy_Module('numpy')
+gw = Lazy_Module('pygetwindow')
+pag = Lazy_Module('pyautogui')
+ImageChops = Lazy_Module('PIL.ImageChops')
+futures = Lazy_Module('concurrent.futures')
+mmap = Lazy_Module('mmap')
+
+if os.name == 'nt':
+    _base = Path(os.getenv('APPDATA', Path.home()))
+else:
+    _base = Path(os.getenv('XDG_CONFIG_HOME', Path.home() / '.config'))
+CONFIG_DIR = _base / 'VEP MIDI AutoMate'
+LEDGER_FILE = CONFIG_DIR / 'ledgers.json'
+GLYPH_ATLAS_FILE = CONFIG_DIR / 'glyph_atlas.json'
+
+REQUIRED_HEADERS = ['device', 'channel', 'cc', 'layer 1', 'layer 2', 'layer 3', 'layer 4', 'repeat']
 
 class VEP_MIDI_AutoMate_Error(Exception): pass
 
+class VEP_MIDI_AutoMate_Not_Found(VEP_MIDI_AutoMate_Error): pass
+
+class VEP_MIDI_AutoMate_Destination_Error(VEP_MIDI_AutoMate_Error): pass
+
 class VEP_MIDI_AutoMate_Abort(Exception): pass
 
-def screenshot(scope='window', window_origin=None, window_size=None, region=None):
-    # takes a screenshot
+# kinds of CSV problem, and how they are named when filtering
+CSV_PROBLEM_KINDS = {'file': 'Unreadable file', 'headings': 'Missing headings', 'missing': 'Missing entries', 'layers': 'Layers out of order', 'integer': 'Not integers', 'range': 'Out of range', 'repeat': 'Repeat problems'}
+
+def find_csv_problem_records(path, required_headers=REQUIRED_HEADERS):
+    # lists every problem with the CSV at path as {'row', 'column', 'kind', 'message'}, with row numbers that include the heading row (row and column are None for problems with the whole file)
+    problems = []
+
+    def add_problem(row_number, column, kind, message):
+        problems.append({'row': row_number, 'column': column, 'kind': kind, 'message': message})
+
+    try:
+        f = Path(path).open('r', encoding='utf-8-sig', newline='')    
+    except Exception as e:
+        add_problem(None, None, 'file', f'Could not read CSV: {e}')
+        return problems
+    
+    valid_integers_string = {
+        'device': '{1, 2, 3, …}',
+        'channel': '{1, 2, 3, …, 16}',
+        'cc': '{0, 1, 2, …, 127}'
+    }
+
+    with f:
+        reader = csv.DictReader(f, skipinitialspace=True)
+        if reader.fieldnames is None:
+            add_problem(None, None, 'headings', f'No header row found. The first row must contain {", ".join(required_headers)}.')
+            return problems
+        missing_headers = [header for header in required_headers if header not in reader.fieldnames]
+        if missing_headers:
+            add_problem(None, None, 'headings', f'Missing some headings: {", ".join(missing_headers)}.')
+        for row_number, row in enumerate(reader, start=2):
+            row = {key : (value.strip() if isinstance(value, str) else value) for key, value in row.items()}
+            row_string = f'Row {row_number} (device={row.get("device")},channel={row.get("channel")},cc={row.get("cc")})'
+            for header in ['device', 'channel', 'cc', 'layer 1', 'layer 2']:
+                if not row.get(header, ''):
+                    add_problem(row_number, header, 'missing', f'Missing an entry in row {row_number}: \'{header}\'.')
+            if row.get('layer 3') and not row.get('layer 2'):
+                add_problem(row_number, 'layer 3', 'layers', f'{row_string}: Cannot have \'layer 3\' without \'layer 2\'.')
+            if row.get('layer 4') and not row.get('layer 3'):
+                add_problem(row_number, 'layer 4', 'layers', f'{row_string}: Cannot have \'layer 4\' without \'layer 3\'.')
+            if row.get('repeat') and not (row.get('layer 3') or row.get('layer 4')):
+                add_problem(row_number, 'repeat', 'repeat', f'{row_string}: Must have \'layer 3\' or \'layer 4\' to have \'repeat\'.')
+            for header in ['device', 'channel', 'cc']:
+                value_string = (row.get(header, '') or '').strip()
+                if not value_string.isdecimal():
+                    add_problem(row_number, header, 'integer', f'{row_string}: Must have an integer for \'{header}\'.')
+                    continue
+                value = int(value_string)
+                if header == 'device' and value < 1 or header == 'channel' and value not in range(1, 17) or header == 'cc' and value not in range(0, 128):
+                    add_problem(row_number, header, 'range', f'{row_string}: Must have an integer from {valid_integers_string[header]} for \'{header}\'.')
+            value_string = (row.get('repeat', '') or '').strip()
+            if value_string:
+                if not value_string.isdecimal() or int(value_string) < 1:
+                    add_problem(row_number, 'repeat', 'repeat', f'{row_string}: Must be blank or have an integer (1, 2, 3, …) for \'repeat\'.')
+
+    return problems
+
+def find_csv_problems(path, required_headers=REQUIRED_HEADERS):
+    # lists every problem with the CSV at path, with row numbers that include the heading row
+    return [problem['message'] for problem in find_csv_problem_records(path, required_headers)]
+
+def load_csv(path, required_headers=REQUIRED_HEADERS):
+    # reads the CSV at path as a list of rows, each a dict with stripped, lower-case headings and stripped values
+    data = []
+    with Path(path).open('r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is None:
+            raise VEP_MIDI_AutoMate_Error('CSV appears empty or has no header row. Expected columns: ' + ','.join(required_headers) + '. Consider using the template provided.')
+        missing_headers = [header for header in required_headers if header not in reader.fieldnames]
+        if missing_headers:
+            raise VEP_MIDI_AutoMate_Error('CSV is missing required columns: ' + ','.join(missing_headers) + '. Consider using the template provided.')
+        for _, raw_data in enumerate(reader, start=2):
+            raw_datum = {(k or '').strip().lower(): (v or '').strip() for k, v in raw_data.items()}
+            data.append(raw_datum)
+    return data
+
+def row_update_string(row_number, number_of_rows, datum, time_remaining=None):
+    # describes the row about to be input for the log, with the estimated time remaining in seconds (unknown before the first row is done)
+    update_string = f' {row_number + 1}/{number_of_rows} {"∞:∞∞:∞∞" if time_remaining is None else datetime.timedelta(seconds = int(time_remaining))} ({datum["device"]},{datum["channel"]},{datum["cc"]}) → {datum["layer 1"]}/{datum["layer 2"]}{"/" if datum["layer 3"] else ""}{datum["layer 3"]}{"/" if datum["layer 4"] else ""}{datum["layer 4"]}'
+    if datum['repeat']:
+        update_string += f'(R{datum["repeat"]})'
+    return update_string
+
+RECORDING_MAGIC = b'VMAREC1\n'
+RECORDING_FRAME_HEADER = struct.Struct('<d4iBII') # time, left, top, width, height, delta flag, input length, payload length
+
+# the open recording, if any, the last frame recorded for each region and the latest input sent
+recording_state = {'file': None, 't_0': None, 'previous_frames': {}, 'last_input': ''}
+
+def recording_path(csv_path):
+    # names a new recording for csv_path, next to it
+    return csv_path.with_name(f'{csv_path.stem}-{datetime.datetime.now():%Y%m%d-%H%M%S}.vmarec')
+
+def start_recording(path):
+    # starts recording every frame screenshot captures to path
+    recording_state['file'] = open(path, 'wb')
+    recording_state['file'].write(RECORDING_MAGIC)
+    recording_state['t_0'] = time.perf_counter()
+    recording_state['previous_frames'] = {}
+    recording_state['last_input'] = ''
+
+def stop_recording():
+    # closes the recording, if any
+    if recording_state['file'] is not None:
+        recording_state['file'].close()
+    recording_state['file'] = None
+    recording_state['previous_frames'] = {}
+
+def record_frame(region, image):
+    # appends one frame to the recording, XORed against the previous frame of the same region (so unchanged pixels become zeros) and then compressed
+    frame = image.tobytes()
+    previous_frame = recording_state['previous_frames'].get(region)
+    if previous_frame is None:
+        payload = zlib.compress(frame, 1)
+    else:
+        payload = zlib.compress(np.bitwise_xor(np.frombuffer(frame, dtype=np.uint8), np.frombuffer(previous_frame, dtype=np.uint8)).tobytes(), 1)
+    recording_state['previous_frames'][region] = frame
+    last_input = recording_state['last_input'].encode('utf-8')
+    recording_state['file'].write(RECORDING_FRAME_HEADER.pack(time.perf_counter() - recording_state['t_0'], *region, previous_frame is not None, len(last_input), len(payload)))
+    recording_state['file'].write(last_input)
+    recording_state['file'].write(payload)
+
+def read_recording(path):
+    # yields (time, (left, top, width, height), last input, image) for each frame of a recording, reading it through a memory map
+    from PIL import Image as PILImage
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as recording:
+        if recording[:len(RECORDING_MAGIC)] != RECORDING_MAGIC:
+            raise VEP_MIDI_AutoMate_Error(f'{path} is not a VEP MIDI AutoMate recording.')
+        previous_frames = {}
+        offset = len(RECORDING_MAGIC)
+        while offset + RECORDING_FRAME_HEADER.size <= len(recording):
+            frame_time, left, top, width, height, delta, input_length, payload_length = RECORDING_FRAME_HEADER.unpack_from(recording, offset)
+            offset += RECORDING_FRAME_HEADER.size
+            last_input = recording[offset:offset + input_length].decode('utf-8')
+            offset += input_length
+            frame = zlib.decompress(recording[offset:offset + payload_length])
+            offset += payload_length
+            region = (left, top, width, height)
+            if delta:
+                frame = np.bitwise_xor(np.frombuffer(frame, dtype=np.uint8), np.frombuffer(previous_frames[region], dtype=np.uint8)).tobytes()
+            previous_frames[region] = frame
+            yield frame_time, region, last_input, PILImage.frombytes('RGB', (width, height), frame)
+
+def screenshot(scope='window', window_origin=None, window_size=None, region=None, packed=False):
+    # takes a screenshot, as an RGB image or, if packed, as an array of packed colours straight from the capture (see pack_pixels)
     with mss.mss() as sct:
         if region:
             left, top, right, bottom = region
@@ -28,7 +206,13 @@ def screenshot(scope='window', window_origin=None, window_size=None, region=None
                 bounding_box = {'left': window_origin[0], 'top': window_origin[1], 'width': window_size[0], 'height': window_size[1]}
         screen_grab = sct.grab(bounding_box)
         from PIL import Image as PILImage
-        image = PILImage.frombytes('RGB', screen_grab.size, screen_grab.rgb)
+        if recording_state['file'] is not None or not packed:
+            image = PILImage.frombytes('RGB', screen_grab.size, screen_grab.rgb)
+            if recording_state['file'] is not None:
+                record_frame((bounding_box['left'], bounding_box['top'], bounding_box['width'], bounding_box['height']), image)
+        if packed:
+            # the capture is BGRA, which read as little-endian uint32 is 0xAARRGGBB, so masking off alpha gives the packed colour
+            return np.frombuffer(screen_grab.raw, dtype='<u4').reshape(screen_grab.height, screen_grab.width) & 0xFFFFFF
         return image
 
 def crop_by_largest_difference(image_before, image_after, extract_last_menu_only=False):
@@ -39,9 +223,11 @@ def crop_by_largest_difference(image_before, image_after, extract_last_menu_only
         image_before_np = np.frombuffer(image_before.tobytes(), dtype=np.uint8).reshape(height, width, 3)
         image_after_np = np.frombuffer(image_after.tobytes(), dtype=np.uint8).reshape(height, width, 3)
 
-        mask_difference = np.abs(image_after_np.astype(np.int16) - image_before_np.astype(np.int16))
-        mask_luminance = (77*mask_difference[...,0] + 150*mask_difference[...,1] + 29*mask_difference[...,2]) >> 8
-        matrix = mask_luminance > 25
+        # the luminance of the difference is summed in int16 a channel at a time, rather than from a full int16 copy of both images, to keep peak memory to a few bytes per pixel
+        mask_luminance = np.zeros((height, width), dtype=np.int16)
+        for channel, weight in enumerate((77, 150, 29)):
+            mask_luminance += weight * (np.maximum(image_after_np[..., channel], image_before_np[..., channel]) - np.minimum(image_after_np[..., channel], image_before_np[..., channel])).astype(np.int16)
+        matrix = (mask_luminance >> 8) > 25
 
         column_sum = matrix.sum(axis=0)
         heavy_columns = column_sum >= 1
@@ -77,287 +263,997 @@ def crop_by_largest_difference(image_before, image_after, extract_last_menu_only
     except Exception:
         raise VEP_MIDI_AutoMate_Error('Something went wrong. Possibly a popup on your screen confused the algorithm. Please close and try again')
 
+def pack_colour(colour):
+    # packs an RGB tuple into one integer, 0xRRGGBB
+    return (colour[0] << 16) | (colour[1] << 8) | colour[2]
+
+def pack_pixels(image):
+    # packs every pixel of an RGB image into a 2D uint32 array of 0xRRGGBB, so that colours compare as single integers; arrays are passed through
+    if isinstance(image, np.ndarray):
+        return image
+    width, height = image.size
+    rgb = np.frombuffer(image.convert('RGB').tobytes(), dtype=np.uint8).reshape(height, width, 3)
+    return (rgb[..., 0].astype(np.uint32) << 16) | (rgb[..., 1].astype(np.uint32) << 8) | rgb[..., 2]
+
+def colour_line(image, start_position, direction):
+    # returns the packed colours of image from start_position in direction to the edge, packing only the pixels on the line
+    x, y = start_position
+    height, width = image.shape if isinstance(image, np.ndarray) else image.size[::-1]
+    if not (0 <= x < width and 0 <= y < height):
+        return np.empty(0, dtype=np.uint32)
+    steps = min(((width - x - 1) // direction[0] if direction[0] > 0 else x // -direction[0]) + 1 if direction[0] else width + height, ((height - y - 1) // direction[1] if direction[1] > 0 else y // -direction[1]) + 1 if direction[1] else width + height)
+    xs = x + direction[0] * np.arange(steps)
+    ys = y + direction[1] * np.arange(steps)
+    if isinstance(image, np.ndarray):
+        return image[ys, xs]
+    left, top = int(xs.min()), int(ys.min())
+    return pack_pixels(image.crop((left, top, int(xs.max()) + 1, int(ys.max()) + 1)))[ys - top, xs - left]
+
+def colour_distance(packed, colour):
+    # sums the absolute difference of each channel between packed colours and one packed colour
+    colour = int(colour)
+    return sum(np.abs(((packed >> shift) & 0xFF).astype(np.int16) - ((colour >> shift) & 0xFF)) for shift in (16, 8, 0))
+
+def colour_band_starts(line):
+    # returns the index at which each colour band of a line of packed colours starts
+    return np.flatnonzero(np.r_[len(line) > 0, line[1:] != line[:-1]])
+
 def count_colour_bands(image, start_position, direction):
     # counts the colour bands in image from start_position in direction
-    x, y = start_position
-    pixel = image.load()
-    width = image.size[0]
-    height = image.size[1]
-    p = (-1, -1, -1)
-    count = 0
-    while 0 <= x < width and 0 <= y < height:
-        previous_p = p
-        p = pixel[x,y]
-        if p != previous_p:
-            count += 1
-        x += direction[0]
-        y += direction[1]
-    return count
+    return len(colour_band_starts(colour_line(image, start_position, direction)))
 
 def find_nth_colour_band(image, n, start_position, direction):
-    # searches image from start_position in direction until the nth new colour band
-    x, y = start_position
-    target_band_number = n
-
-    pixel = image.load()
-
-    width = image.size[0]
-    height = image.size[1]
-
-    band_number = -1
-    target_band_start = (-1, -1)
-    target_band_end = (-1, -1)
-    p = (-1, -1, -1)
-    while 0 <= x < width and 0 <= y < height:
-        previous_p = p
-        p = pixel[x,y]
-        if p != previous_p:
-            target_band_end = (x - direction[0], y - direction[1])
-            if band_number == target_band_number:
-                target_band_middle = (int((target_band_start[0] + target_band_end[0])/2), int((target_band_start[1] + target_band_end[1])/2))
-                return (target_band_start, target_band_middle, target_band_end)
-            else:
-                target_band_start = (x, y)
-            band_number += 1
-        x += direction[0]
-        y += direction[1]
-    return ((-1,-1), (-1,-1), (-1,-1))
+    # searches image from start_position in direction until the nth new colour band, returning its start, middle and end once the band after it begins
+    starts = colour_band_starts(colour_line(image, start_position, direction))
+    if n + 1 >= len(starts) or n < 0:
+        return ((-1,-1), (-1,-1), (-1,-1))
+    start, end = int(starts[n]), int(starts[n + 1]) - 1
+    target_band_start = (start_position[0] + start * direction[0], start_position[1] + start * direction[1])
+    target_band_end = (start_position[0] + end * direction[0], start_position[1] + end * direction[1])
+    target_band_middle = (int((target_band_start[0] + target_band_end[0])/2), int((target_band_start[1] + target_band_end[1])/2))
+    return (target_band_start, target_band_middle, target_band_end)
+
+GLYPH_WIDTH_TOLERANCE = 1 # pixels by which glyphs of the same string may differ in width, being drawn at different subpixel positions
+LAYER_SEPARATOR = '\x1f' # what the atlas reads the glyphs a destination cell shows between its layers as
+
+def new_glyph_atlas():
+    # creates an empty glyph atlas; glyphs maps each binarised glyph to the string it has been learnt as, widths maps each string to the narrowest and widest glyphs learnt for it,
+    # and disputed holds the glyphs that have been seen as different strings (such as l and I in some fonts), which are read as unknown
+    return {'glyphs': {}, 'widths': {}, 'disputed': set(), 'largest_letter_gap': None, 'smallest_word_gap': None}
+
+def load_glyph_atlas():
+    # returns the glyph atlas saved by earlier runs, or a new one
+    atlas = new_glyph_atlas()
+    try:
+        saved = json.loads(GLYPH_ATLAS_FILE.read_text(encoding='utf-8'))
+        for top, height, width, bits, strings in saved['glyphs']:
+            atlas['glyphs'][(top, (height, width), bytes.fromhex(bits))] = tuple(strings)
+        atlas['widths'] = {string: list(width_range) for string, width_range in saved['widths'].items()}
+        atlas['disputed'] = {(top, (height, width), bytes.fromhex(bits)) for top, height, width, bits in saved['disputed']}
+        atlas['largest_letter_gap'] = saved['largest_letter_gap']
+        atlas['smallest_word_gap'] = saved['smallest_word_gap']
+    except Exception:
+        return new_glyph_atlas()
+    return atlas
 
-def wait_for_destination_text_to_appear(distance, time_out=1.0):
+def save_glyph_atlas(atlas):
+    # saves the glyph atlas for later runs and exports
+    try:
+        glyphs = [[top, height, width, bits.hex(), list(strings)] for (top, (height, width), bits), strings in atlas['glyphs'].items()]
+        disputed = [[top, height, width, bits.hex()] for top, (height, width), bits in atlas['disputed']]
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        GLYPH_ATLAS_FILE.write_text(json.dumps({'glyphs': glyphs, 'widths': atlas['widths'], 'disputed': disputed, 'largest_letter_gap': atlas['largest_letter_gap'], 'smallest_word_gap': atlas['smallest_word_gap']}), encoding='utf-8')
+    except Exception:
+        pass
+
+def find_ink(image, threshold=25):
+    # separates text from its flat background, taken to be the most common colour in image
+    width, height = image.size
+    image_np = np.frombuffer(image.tobytes(), dtype=np.uint8).reshape(height, width, 3).astype(np.int32)
+    packed = (image_np[...,0] << 16) | (image_np[...,1] << 8) | image_np[...,2]
+    values, counts = np.unique(packed, return_counts=True)
+    background = int(values[counts.argmax()])
+    mask_difference = np.abs(image_np - np.array([background >> 16, (background >> 8) & 255, background & 255]))
+    mask_luminance = (77*mask_difference[...,0] + 150*mask_difference[...,1] + 29*mask_difference[...,2]) >> 8
+    return mask_luminance > threshold
+
+def segment_glyphs(ink):
+    # splits a single line of ink into glyphs, returning (left, right, key) for each glyph
+    # glyphs are connected pieces of ink, with pieces sharing columns with a larger piece (such as the dot on an i) joined to it
+    height, width = ink.shape
+    labels = np.zeros(ink.shape, dtype=np.int32)
+    pieces = []
+    for y, x in np.argwhere(ink):
+        if labels[y, x]:
+            continue
+        pieces.append([])
+        labels[y, x] = len(pieces)
+        stack = [(y, x)]
+        while stack:
+            y_piece, x_piece = stack.pop()
+            pieces[-1].append((y_piece, x_piece))
+            for y_next, x_next in ((y_piece - 1, x_piece), (y_piece + 1, x_piece), (y_piece, x_piece - 1), (y_piece, x_piece + 1)):
+                if 0 <= y_next < height and 0 <= x_next < width and ink[y_next, x_next] and not labels[y_next, x_next]:
+                    labels[y_next, x_next] = len(pieces)
+                    stack.append((y_next, x_next))
+    if not pieces:
+        return []
+    groups = []
+    for label, piece in sorted(enumerate(pieces, start=1), key=lambda item: min(x for _, x in item[1])):
+        left = min(x for _, x in piece)
+        right = max(x for _, x in piece) + 1
+        if groups and (left >= groups[-1][0] and right <= groups[-1][1] or left <= groups[-1][0] and right >= groups[-1][1]):
+            groups[-1] = [min(left, groups[-1][0]), max(right, groups[-1][1]), groups[-1][2] + [label]]
+        else:
+            groups.append([left, right, [label]])
+    line_top = int(np.flatnonzero(ink.any(axis=1))[0])
+    glyphs = []
+    for left, right, group_labels in groups:
+        glyph = np.isin(labels[:, left:right], group_labels)
+        glyph_rows = np.flatnonzero(glyph.any(axis=1))
+        top = int(glyph_rows[0])
+        bottom = int(glyph_rows[-1]) + 1
+        key = (top - line_top, glyph[top:bottom].shape, np.packbits(glyph[top:bottom]).tobytes())
+        glyphs.append((int(left), int(right), key))
+    return glyphs
+
+def split_words(glyphs, number_of_words):
+    # groups glyphs into number_of_words words at the widest gaps
+    if len(glyphs) < number_of_words:
+        return None
+    gaps = [glyphs[index + 1][0] - glyphs[index][1] for index in range(len(glyphs) - 1)]
+    word_ends = sorted(sorted(range(len(gaps)), key=lambda index: gaps[index])[len(gaps) - number_of_words + 1:])
+    words = []
+    start = 0
+    for word_end in word_ends + [len(glyphs) - 1]:
+        words.append(glyphs[start:word_end + 1])
+        start = word_end + 1
+    return words
+
+def find_text_cursor(glyphs, text):
+    # returns the index of the text cursor among glyphs segmented from a text box showing text, or None: a last glyph at most 2 pixels wide that is one glyph too many or taller than the rest
+    if len(glyphs) < 2 or glyphs[-1][1] - glyphs[-1][0] > 2:
+        return None
+    if len(glyphs) == len(''.join(text.split())) + 1 or all(glyphs[-1][2][1][0] > key[1][0] for _, _, key in glyphs[:-1]):
+        return len(glyphs) - 1
+    return None
+
+def glyph_widths_agree(atlas, lessons):
+    # checks that each string in lessons, a list of (glyph, string) pairs, has glyphs of a consistent width, among the lessons and with those atlas has learnt
+    # inconsistent widths mean the glyphs were split up or matched to the text wrongly; the glyphs between layers are several different glyphs, so are not checked
+    widths = {}
+    for (left, right, _), string in lessons:
+        if string == LAYER_SEPARATOR:
+            continue
+        narrowest, widest = widths.get(string, atlas['widths'].get(string, (right - left, right - left)))
+        widths[string] = [min(narrowest, right - left), max(widest, right - left)]
+        if widths[string][1] - widths[string][0] > GLYPH_WIDTH_TOLERANCE:
+            return False
+    return True
+
+def teach_glyph_atlas(atlas, lessons):
+    # teaches atlas lessons, a list of (glyph, string) pairs whose widths agree, returning whether anything new was learnt
+    # a glyph taught as a different string from the one it was learnt as looks the same as another (such as l and I in some fonts), so is disputed and read as unknown from then on
+    learnt = False
+    for (left, right, key), string in lessons:
+        if key in atlas['disputed']:
+            continue
+        if atlas['glyphs'].get(key, (string,)) != (string,):
+            atlas['disputed'].add(key)
+            del atlas['glyphs'][key]
+            learnt = True
+            continue
+        if key not in atlas['glyphs']:
+            atlas['glyphs'][key] = (string,)
+            learnt = True
+        if string != LAYER_SEPARATOR:
+            narrowest, widest = atlas['widths'].get(string, (right - left, right - left))
+            atlas['widths'][string] = [min(narrowest, right - left), max(widest, right - left)]
+    return learnt
+
+def learn_glyph_atlas(atlas, image, text):
+    # teaches atlas the glyphs in image, a text box known to show text; returns False if nothing could be learnt
+    # glyphs touching their neighbours are learnt as clusters of characters, but only once the rest of their word is known,
+    # and nothing is learnt if the glyphs cannot be matched to text one for one or their widths disagree with those learnt before
+    ink = find_ink(image)
+    glyphs = segment_glyphs(ink)
+    cursor = find_text_cursor(glyphs, text)
+    if cursor is not None:
+        # the cursor is taller than the text, so it is removed before segmenting again, keeping the glyphs' positions relative to the top of the text
+        ink[:, glyphs[cursor][0]:glyphs[cursor][1]] = False
+        glyphs = segment_glyphs(ink)
+    words = split_words(glyphs, len(text.split()))
+    if not text.split() or words is None:
+        return False
+    lessons = []
+    for word_glyphs, word in zip(words, text.split()):
+        if len(word_glyphs) > len(word):
+            return False
+        if len(word_glyphs) == len(word):
+            strings = list(word)
+        else:
+            strings = [None] * len(word_glyphs)
+            start = 0
+            for index, (_, _, key) in enumerate(word_glyphs):
+                matches = [string for string in atlas['glyphs'].get(key, ()) if word.startswith(string, start)]
+                if not matches:
+                    break
+                strings[index] = matches[0]
+                start += len(matches[0])
+            end = len(word)
+            for index in range(len(word_glyphs) - 1, -1, -1):
+                if strings[index] is not None:
+                    break
+                matches = [string for string in atlas['glyphs'].get(word_glyphs[index][2], ()) if word.endswith(string, start, end)]
+                if not matches:
+                    break
+                strings[index] = matches[0]
+                end -= len(matches[0])
+            if strings.count(None) != 1 or start >= end:
+                continue
+            strings[strings.index(None)] = word[start:end]
+        lessons += list(zip(word_glyphs, strings))
+    if not glyph_widths_agree(atlas, lessons):
+        return False
+    for word_glyphs in words:
+        for index in range(len(word_glyphs) - 1):
+            gap = word_glyphs[index + 1][0] - word_glyphs[index][1]
+            if atlas['largest_letter_gap'] is None or gap > atlas['largest_letter_gap']:
+                atlas['largest_letter_gap'] = gap
+    for index in range(len(words) - 1):
+        gap = words[index + 1][0][0] - words[index][-1][1]
+        if atlas['smallest_word_gap'] is None or gap < atlas['smallest_word_gap']:
+            atlas['smallest_word_gap'] = gap
+    return teach_glyph_atlas(atlas, lessons)
+
+def find_word_gap(atlas):
+    # the smallest gap between glyphs taken to separate words, if known
+    if atlas['smallest_word_gap'] is None:
+        return None
+    if atlas['largest_letter_gap'] is None:
+        return atlas['smallest_word_gap']
+    return (atlas['smallest_word_gap'] + atlas['largest_letter_gap'] + 1) // 2
+
+def read_glyphs(atlas, image):
+    # reads image as a list of glyph classes: the string each glyph has been learnt as, (' ',) between words and () for unknown or disputed glyphs
+    glyphs = segment_glyphs(find_ink(image))
+    word_gap = find_word_gap(atlas)
+    classes = []
+    for index, (left, _, key) in enumerate(glyphs):
+        if index > 0 and word_gap is not None and left - glyphs[index - 1][1] >= word_gap:
+            classes.append((' ',))
+        classes.append(atlas['glyphs'].get(key, ()))
+    return classes
+
+def read_text(atlas, image):
+    # reads image as a string, with '?' for unknown glyphs
+    return ''.join(glyph_class[0] if glyph_class else '?' for glyph_class in read_glyphs(atlas, image))
+
+def read_controller_cell(atlas, image):
+    # reads the device, channel and cc a row's controller cell shows, or None if any of their digits are unknown
+    text = ''.join(glyph_class[0] if glyph_class else '?' for glyph_class in read_glyphs(atlas, image))
+    if any('?' in word and re.search(r'\d', word) for word in text.split()):
+        return None
+    numbers = [int(number) for number in re.findall(r'\d+', text)]
+    return tuple(numbers[:3]) if len(numbers) >= 3 else None
+
+def read_destination_cell(atlas, image):
+    # reads the layers a row's destination cell shows, or None if it is empty or any glyph is unknown
+    classes = read_glyphs(atlas, image)
+    if not classes or () in classes:
+        return None
+    return [layer.strip() for layer in re.split(f'{LAYER_SEPARATOR}+', ''.join(glyph_class[0] for glyph_class in classes))]
+
+def learn_controller_cell(atlas, image, numbers):
+    # teaches atlas the digits of a controller cell known to show numbers (device, channel, cc), once there is only one way to place them:
+    # exactly as many words as numbers must consist of glyphs that are unknown or digits, with the right number of glyphs each
+    word_gap = find_word_gap(atlas)
+    glyphs = segment_glyphs(find_ink(image))
+    if word_gap is None or not glyphs:
+        return False
+    words = [[glyphs[0]]]
+    for previous_glyph, glyph in zip(glyphs, glyphs[1:]):
+        if glyph[0] - previous_glyph[1] >= word_gap:
+            words.append([])
+        words[-1].append(glyph)
+    candidates = [word for word in words if all(not atlas['glyphs'].get(key) or any(string.isdigit() for string in atlas['glyphs'][key]) for _, _, key in word)]
+    if len(candidates) != len(numbers) or any(len(word) != len(str(number)) for word, number in zip(candidates, numbers)):
+        return False
+    lessons = [(glyph, digit) for word, number in zip(candidates, numbers) for glyph, digit in zip(word, str(number))]
+    if any(atlas['glyphs'].get(key) and digit not in atlas['glyphs'][key] for (_, _, key), digit in lessons) or not glyph_widths_agree(atlas, lessons):
+        return False
+    return teach_glyph_atlas(atlas, lessons)
+
+def learn_destination_cell(atlas, image, layers):
+    # teaches atlas the glyphs of a destination cell known to show layers, with the same glyphs between each layer, once the glyph count leaves only one way to place them
+    glyphs = segment_glyphs(find_ink(image))
+    lengths = [len(''.join(layer.split())) for layer in layers]
+    extra = len(glyphs) - sum(lengths)
+    if len(layers) < 2 or extra <= 0 or extra % (len(layers) - 1):
+        return False
+    separator_length = extra // (len(layers) - 1)
+    lessons = []
+    position = 0
+    for index, layer in enumerate(layers):
+        lessons += list(zip(glyphs[position:position + lengths[index]], ''.join(layer.split())))
+        position += lengths[index]
+        if index < len(layers) - 1:
+            lessons += [(glyph, LAYER_SEPARATOR) for glyph in glyphs[position:position + separator_length]]
+            position += separator_length
+    if any(atlas['glyphs'].get(key) and string not in atlas['glyphs'][key] for (_, _, key), string in lessons) or not glyph_widths_agree(atlas, lessons):
+        return False
+    return teach_glyph_atlas(atlas, lessons)
+
+def layers_match(reading, layers):
+    # compares the layers read from a destination cell with those the CSV asks for, ignoring spaces, which the atlas only places by the gaps between glyphs
+    return [''.join(layer.split()) for layer in reading] == [''.join(layer.split()) for layer in layers]
+
+def check_destination_cell(atlas, image, layers, description):
+    # fails fast when a destination cell reads as a different path from layers (ignoring spaces), such as uncommitted search text or the right name under another layer 1
+    # returns whether the cell could be read at all; one that cannot, or is empty, is left to the colour band checks, such as wait_for_destination_text_to_appear, as before the atlas
+    reading = read_destination_cell(atlas, image)
+    if reading is None:
+        return False
+    if not layers_match(reading, layers):
+        raise VEP_MIDI_AutoMate_Destination_Error(f'{description} reads \'{" > ".join(reading)}\' on screen, but the CSV asks for \'{" > ".join(layers)}\'. Make sure each layer is spelt exactly as it appears in VEP.')
+    return True
+
+def spot_check_destination_cell(atlas, image, layers, description):
+    # checks a destination cell turbo mode did not wait for, as check_destination_cell does, except that a cell the atlas cannot read must at least not be empty,
+    # judged as wait_for_destination_text_to_appear does, by a single colour band across its middle
+    if not check_destination_cell(atlas, image, layers, description) and count_colour_bands(image=image, start_position=(0, image.height // 2), direction=(1,0)) == 1:
+        raise VEP_MIDI_AutoMate_Destination_Error(f'{description} is empty on screen.')
+
+def wait_for_destination_text_to_appear(distance, abort_event=None, time_out=1.0):
     x, y = pag.position()
     strip_region = (x - distance + 1, y, x, y + 1)
-    strip = screenshot(scope='desktop', region=strip_region)
+    strip = screenshot(scope='desktop', region=strip_region, packed=True)
     t_0 = time.perf_counter()
     while count_colour_bands(image=strip, start_position=(0,0), direction=(1,0)) == 1 and time.perf_counter() - t_0 < time_out:
-        strip = screenshot(scope='desktop', region=strip_region)
+        check_abort(abort_event)
+        strip = screenshot(scope='desktop', region=strip_region, packed=True)
 
-def wait_for_new_row_button_to_be_ready(original_colour, time_out=10.0):
+def wait_for_new_row_button_to_be_ready(original_colour, abort_event=None, time_out=10.0):
     # waits for the new row button to be ready to be clicked
     x, y = pag.position()
+    original_colour = pack_colour(original_colour)
     detected_pixel = original_colour
     t_0 = time.perf_counter()
     while detected_pixel == original_colour and time.perf_counter() - t_0 < time_out:
-        time.sleep(0.1)
-        detected_pixel = screenshot(scope='desktop', region=(x-1, y, x, y+1)).getpixel((0,0))
+        wait(abort_event, 0.1)
+        detected_pixel = screenshot(scope='desktop', region=(x-1, y, x, y+1), packed=True)[0, 0]
     if time.perf_counter() - t_0 > time_out:
         raise VEP_MIDI_AutoMate_Error('Something went wrong. Unable to create a new row. Please contact the developer.')
 
-def wait_for_new_row_to_appear(strip, strip_region, time_out=10.0):
+def wait_for_new_row_to_appear(strip, strip_region, abort_event=None, time_out=10.0):
     # waits for the new row to appear by counting colour bands below the add-row button
     initial_number_of_colour_bands = count_colour_bands(image=strip, start_position=(0,0), direction=(0,1))
     t_0 = time.perf_counter()
     while count_colour_bands(image=strip, start_position=(0,0), direction=(0,1)) == initial_number_of_colour_bands and time.perf_counter() - t_0 < time_out:
-        time.sleep(0.1)
-        strip = screenshot(scope='desktop', region=strip_region)
+        wait(abort_event, 0.1)
+        strip = screenshot(scope='desktop', region=strip_region, packed=True)
     if time.perf_counter() - t_0 > time_out:
         raise VEP_MIDI_AutoMate_Error('Something went wrong. Unable to create a new row. Please contact the developer.')
 
-def wait_for_device_menu_to_open(grey_pixel, time_out=10.0):
+def wait_for_device_menu_to_open(grey_pixel, abort_event=None, time_out=10.0):
     # waits for the device menu to open, determined by a change in a specific pixel's colour 
     x, y = pag.position()
-    detected_pixel = (-1, -1, -1)
+    grey_pixel = pack_colour(grey_pixel)
+    detected_pixel = -1
     t_0 = time.perf_counter()
     while detected_pixel != grey_pixel and time.perf_counter() - t_0 < time_out:
-        time.sleep(0.1)
-        detected_pixel = screenshot(scope='desktop', region=(x-1, y, x, y+1)).getpixel((0,0))
+        wait(abort_event, 0.1)
+        detected_pixel = screenshot(scope='desktop', region=(x-1, y, x, y+1), packed=True)[0, 0]
     if time.perf_counter() - t_0 > time_out:
         raise VEP_MIDI_AutoMate_Error('Something went wrong. Make sure that your VEP mixer is set up properly, with correctly named channels, plugins, etc, exactly consistent with your CSV. Also please ensure your screen scale is set to 100% (System > Display). Please close and try again.')
 
-def wait_for_menu_item_to_turn_blue(blue_pixel, item_height, time_out=10.0):
+def wait_for_menu_item_to_turn_blue(blue_pixel, item_height, abort_event=None, time_out=10.0):
     # waits until the background of a menu item turns blue, indicating that the menu item is ready to be selected
     x, y = pag.position()
+    blue_pixel = pack_colour(blue_pixel)
     t_0 = time.perf_counter()
     offset = 0
     blue_pixel_detected = False
     while not blue_pixel_detected and time.perf_counter() - t_0 < time_out:
-        time.sleep(0.1)
+        wait(abort_event, 0.1)
         for offset in range(item_height // 2):
-            if screenshot(scope='desktop', region=(x-1, y+offset, x, y+offset+1)).getpixel((0,0)) == blue_pixel or screenshot(scope='desktop', region=(x-1, y-offset, x, y-offset+1)).getpixel((0,0)) == blue_pixel:
+            if screenshot(scope='desktop', region=(x-1, y+offset, x, y+offset+1), packed=True)[0, 0] == blue_pixel or screenshot(scope='desktop', region=(x-1, y-offset, x, y-offset+1), packed=True)[0, 0] == blue_pixel:
                 blue_pixel_detected = True
     if time.perf_counter() - t_0 > time_out:
         raise VEP_MIDI_AutoMate_Error('Something went wrong. Make sure that your VEP mixer is set up properly, with correctly named channels, plugins, etc, exactly consistent with your CSV. Also please ensure your screen scale is set to 100% (System > Display). Please close and try again.')
 
+def wait_for_region_to_settle(region, image_before, abort_event=None, time_out=0.5):
+    # waits for region to change from image_before and then stop changing, returning the settled image
+    t_0 = time.perf_counter()
+    image = screenshot(scope='desktop', region=region)
+    while not ImageChops.difference(image, image_before).getbbox() and time.perf_counter() - t_0 < time_out:
+        wait(abort_event, 0.03)
+        image = screenshot(scope='desktop', region=region)
+    previous_image = image_before
+    while ImageChops.difference(image, previous_image).getbbox() and time.perf_counter() - t_0 < time_out:
+        wait(abort_event, 0.03)
+        previous_image = image
+        image = screenshot(scope='desktop', region=region)
+    return image
+
+def search_destination(query, text_region, list_region, glyph_atlas, abort_event=None):
+    # replaces the text in the destination search bar with query, returning the settled image of the filtered list
+    image_before = screenshot(scope='desktop', region=list_region)
+    send_input(abort_event, pag.hotkey, 'ctrl','a')
+    send_input(abort_event, pag.press, 'delete')
+    if query:
+        type_text(abort_event, query)
+        learn_glyph_atlas(glyph_atlas, screenshot(scope='desktop', region=text_region), query)
+    return wait_for_region_to_settle(list_region, image_before, abort_event)
+
+def find_missing_destinations(data, click_position, text_region, list_region, glyph_atlas, abort_event, BULLET, first_csv_row=2):
+    # searches the destination list once for every distinct layer 1 (and layer 2 within it), returning a description of each one VEP does not offer
+    # an empty filtered list looks identical to the list for a query that cannot match anything
+    NO_MATCH_QUERY = '~~~~~~~~'
+    rows = {}
+    for row_number, datum in enumerate(data, start=first_csv_row):
+        rows.setdefault(datum['layer 1'], {}).setdefault(datum['layer 2'], []).append(row_number)
+
+    def open_search():
+        send_input(abort_event, pag.press, 'escape')
+        send_input(abort_event, pag.click, *click_position)
+
+    open_search()
+    no_match_image = search_destination(NO_MATCH_QUERY, text_region, list_region, glyph_atlas, abort_event)
+    if not ImageChops.difference(no_match_image, search_destination('', text_region, list_region, glyph_atlas, abort_event)).getbbox():
+        send_input(abort_event, pag.press, 'escape')
+        return None
+    check_abort(abort_event)
+
+    missing = []
+    for layer_1, layer_2s in rows.items():
+        if not ImageChops.difference(no_match_image, search_destination(layer_1, text_region, list_region, glyph_atlas, abort_event)).getbbox():
+            row_numbers = sorted(row_number for row_numbers in layer_2s.values() for row_number in row_numbers)
+            missing.append(f' {BULLET} layer 1 \'{layer_1}\' (rows {", ".join(map(str, row_numbers))})')
+            check_abort(abort_event)
+            continue
+        send_input(abort_event, pag.press, 'down')
+        layer_2_no_match_image = search_destination(NO_MATCH_QUERY, text_region, list_region, glyph_atlas, abort_event)
+        for layer_2, row_numbers in layer_2s.items():
+            if not ImageChops.difference(layer_2_no_match_image, search_destination(layer_2, text_region, list_region, glyph_atlas, abort_event)).getbbox():
+                missing.append(f' {BULLET} layer 2 \'{layer_2}\' in \'{layer_1}\' (rows {", ".join(map(str, row_numbers))})')
+            check_abort(abort_event)
+        open_search()
+    send_input(abort_event, pag.press, 'escape')
+    return missing
+
+ABORT_LATENCY_TARGET = 0.05
+
+# pause after each input, when the latest input was sent, and the shared value holding when an abort was requested
+input_state = {'pause': 0.03, 'last_input_time': None, 'abort_time': None}
+
+def request_abort(abort_event, abort_time=None):
+    # sets abort_event, first noting the time in abort_time (any object with a value, such as multiprocessing.Value('d')) so abort latency can be measured
+    if abort_time is not None and not abort_event.is_set():
+        abort_time.value = time.perf_counter()
+    abort_event.set()
+
 def check_abort(abort_event):
-    # checks for the abort event
+    # checks for the abort event, reporting how long after the abort request the last input was sent
     if abort_event and abort_event.is_set():
-        raise VEP_MIDI_AutoMate_Abort('Manually aborted. You can start again when you\'re ready.')
+        message = 'Manually aborted. You can start again when you\'re ready.'
+        abort_time = input_state['abort_time']
+        if abort_time is not None and abort_time.value:
+            last_input_time = input_state['last_input_time']
+            latency = max(0.0, last_input_time - abort_time.value) if last_input_time is not None else 0.0
+            message += f' The last input was sent {round(1000*latency)} ms after the abort was requested{" (over the " + str(round(1000*ABORT_LATENCY_TARGET)) + " ms target)" if latency > ABORT_LATENCY_TARGET else ""}.'
+        raise VEP_MIDI_AutoMate_Abort(message)
+
+def wait(abort_event, seconds):
+    # sleeps for seconds, but raises as soon as the abort event is set
+    if abort_event is None:
+        time.sleep(seconds)
+    elif abort_event.wait(seconds):
+        check_abort(abort_event)
+
+def send_input(abort_event, action, *args, **kwargs):
+    # sends one pyautogui input, unless aborted, then pauses until the next input is allowed
+    check_abort(abort_event)
+    action(*args, **kwargs)
+    input_state['last_input_time'] = time.perf_counter()
+    recording_state['last_input'] = ' '.join([getattr(action, '__name__', str(action))] + [str(arg) for arg in args])
+    wait(abort_event, input_state['pause'])
+
+def type_text(abort_event, text):
+    # types text one character at a time, so that an abort stops it mid-word
+    for character in text:
+        check_abort(abort_event)
+        pag.write(character)
+        input_state['last_input_time'] = time.perf_counter()
+        recording_state['last_input'] = f'write {character}'
+    wait(abort_event, input_state['pause'])
+
+def plan_row(datum, device_positions, item_height):
+    # prepares everything about a row that does not depend on the screen: menu item positions and destination keystrokes
+    device = int(datum['device'])
+    channel = int(datum['channel'])
+    cc = int(datum['cc'])
+    keystrokes = [('type', datum['layer 1']), ('learn', datum['layer 1']), ('press', 'down')]
+    for layer in ['layer 2', 'layer 3', 'layer 4']:
+        if datum[layer]:
+            keystrokes += CLEAR_TEXT_KEYSTROKES + [('type', datum[layer]), ('press', 'down')]
+    if datum['layer 3'] and datum['repeat']:
+        keystrokes += [('press', 'down')] * int(datum['repeat'])
+    keystrokes.append(('press', 'enter'))
+    return {
+        'device': device,
+        'channel': channel,
+        'controller_group': cc // 16,
+        'cc': cc,
+        'device_position': device_positions[device],
+        'channel_y': int((channel - 0.5) * item_height),
+        'controller_group_y': int((cc // 16 + 0.5) * item_height),
+        'cc_y': int((cc % 16 + 0.5) * item_height),
+        'menu_keys': [('down', device), ('right', 1), ('down', channel - 1), ('right', 1), ('down', cc // 16), ('right', 1), ('down', cc % 16)],
+        'menu_indices': [device - 1, channel - 1, cc // 16, cc % 16],
+        'keystrokes': keystrokes,
+        'layers': [datum[layer] for layer in ['layer 1', 'layer 2', 'layer 3', 'layer 4'] if datum[layer]]
+    }
+
+CLEAR_TEXT_KEYSTROKES = [('hotkey', ('ctrl', 'a')), ('press', 'delete')]
+
+def send_keystrokes(abort_event, keystrokes, text_region, glyph_atlas):
+    # sends planned keystrokes; 'learn' steps teach glyph_atlas the text just typed into text_region
+    for kind, value in keystrokes:
+        if kind == 'type':
+            type_text(abort_event, value)
+        elif kind == 'learn':
+            learn_glyph_atlas(glyph_atlas, screenshot(scope='desktop', region=text_region), value)
+        elif kind == 'hotkey':
+            send_input(abort_event, pag.hotkey, *value)
+        else:
+            send_input(abort_event, pag.press, value)
+
+def hover_menu_item(abort_event, pipeline, predictions, key, anchor, image_before, image_after, region_origin, item_position, extract_last_menu_only, blue_pixel, item_height):
+    # hovers over an item in the menu that opened between image_before and image_after, returning the hovered position and the menu's bounding box relative to region_origin
+    # item_position gives the item's position within the menu's bounding box; anchor is the position (the clicked row or hovered parent item) that the menu opened from
+    # once a menu with this key has been seen, the mouse moves straight to where it was relative to anchor while the diff that confirms it runs on the pipeline
+    analysis = pipeline.submit(crop_by_largest_difference, image_before, image_after, extract_last_menu_only)
+    predicted_position = None
+    if key in predictions:
+        left, top, right, bottom = predictions[key]
+        item_x, item_y = item_position((left, top, right, bottom))
+        predicted_position = (anchor[0] + left + item_x, anchor[1] + top + item_y)
+        send_input(abort_event, pag.moveTo, region_origin[0] + predicted_position[0], region_origin[1] + predicted_position[1])
+    _, bounding_box = analysis.result()
+    item_x, item_y = item_position(bounding_box)
+    position = (bounding_box[0] + item_x, bounding_box[1] + item_y)
+    predictions[key] = (bounding_box[0] - anchor[0], bounding_box[1] - anchor[1], bounding_box[2] - anchor[0], bounding_box[3] - anchor[1])
+    if position != predicted_position:
+        send_input(abort_event, pag.moveTo, region_origin[0] + position[0], region_origin[1] + position[1])
+    wait_for_menu_item_to_turn_blue(blue_pixel, item_height, abort_event)
+    return position, bounding_box
+
+def hover_menu_items(abort_event, pipeline, predictions, geometry_cache, levels, item_positions, click_point, menu_region, image_main, blue_pixel, item_height):
+    # hovers over the items of each menu level in turn by diffing captures of each menu as it opens, recording each menu's bounding box in geometry_cache relative to click_point
+    # levels are keys of the form (level name, row y, indices of the parent items...); predictions are keyed by level name and parent item index only
+    menu_origin = (menu_region[0], menu_region[1])
+    hovered = click_point
+    image_before = image_main
+    for index, (level, item_position) in enumerate(zip(levels, item_positions)):
+        image_after = screenshot(scope='desktop', region=menu_region)
+        hovered, bounding_box = hover_menu_item(abort_event, pipeline, predictions, (level[0], level[-1]), hovered, image_before, image_after, menu_origin, item_position, index > 0, blue_pixel, item_height)
+        geometry_cache[level] = (bounding_box[0] - click_point[0], bounding_box[1] - click_point[1], bounding_box[2] - click_point[0], bounding_box[3] - click_point[1])
+        image_before = image_after
+
+def probe_menu_item(abort_event, position, menu_box, blue_pixel, item_height, time_out=1.0):
+    # waits for the item at position to be highlighted, judged from a single pixel to its left, kept within menu_box (the menu's bounding box on the desktop); returns False if it never is
+    probe_x = max(position[0] - 2*item_height, (menu_box[0] + position[0]) // 2)
+    probe_region = (probe_x, position[1], probe_x + 1, position[1] + 1)
+    blue_pixel = pack_colour(blue_pixel)
+    t_0 = time.perf_counter()
+    while time.perf_counter() - t_0 < time_out:
+        if screenshot(scope='desktop', region=probe_region, packed=True)[0, 0] == blue_pixel:
+            return True
+        wait(abort_event, 0.01)
+    return False
+
+def hover_cached_menu_items(abort_event, geometry_cache, levels, item_positions, click_point, menu_origin, blue_pixel, item_height):
+    # hovers straight over the items of menus already in geometry_cache, confirming each with one probe; returns False, forgetting these menus, if any probe fails
+    for level, item_position in zip(levels, item_positions):
+        left, top, right, bottom = geometry_cache[level]
+        bounding_box = (click_point[0] + left, click_point[1] + top, click_point[0] + right, click_point[1] + bottom)
+        item_x, item_y = item_position(bounding_box)
+        position = (menu_origin[0] + bounding_box[0] + item_x, menu_origin[1] + bounding_box[1] + item_y)
+        menu_box = (menu_origin[0] + bounding_box[0], menu_origin[1] + bounding_box[1], menu_origin[0] + bounding_box[2], menu_origin[1] + bounding_box[3])
+        send_input(abort_event, pag.moveTo, *position)
+        if not probe_menu_item(abort_event, position, menu_box, blue_pixel, item_height):
+            for level in levels:
+                geometry_cache.pop(level, None)
+            return False
+    return True
+
+def load_ledger(window_title):
+    # returns the ledger of the rows the last successful run left in the VEP window with this title, if any
+    try:
+        return json.loads(LEDGER_FILE.read_text(encoding='utf-8')).get(window_title)
+    except Exception:
+        return None
+
+def save_ledger(window_title, ledger):
+    # saves (or, if ledger is None, forgets) the ledger for the VEP window with this title
+    try:
+        try:
+            ledgers = json.loads(LEDGER_FILE.read_text(encoding='utf-8'))
+        except Exception:
+            ledgers = {}
+        if ledger is None:
+            if window_title not in ledgers:
+                return
+            del ledgers[window_title]
+        else:
+            ledgers[window_title] = ledger
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        LEDGER_FILE.write_text(json.dumps(ledgers, indent=2), encoding='utf-8')
+    except Exception:
+        pass
+
+def ledger_rows(data, required_headers):
+    # reduces CSV rows to the values that make up each mapping
+    return [[datum[header] for header in required_headers] for datum in data]
+
+def common_prefix_length(rows_before, rows_after):
+    # counts the leading rows two lists have in common
+    length = 0
+    for row_before, row_after in zip(rows_before, rows_after):
+        if row_before != row_after:
+            break
+        length += 1
+    return length
+
+def compare_ledger(ledger, table_bands, window_size, rows):
+    # compares the ledger of the last run with the table now in VEP, of table_bands colour bands, and the ledger rows of the CSV, returning how many rows to keep and delete and why
+    # rows are only kept when the live row count matches the ledger, and all rows can be seen in the same window size
+    if ledger is None:
+        return 0, 0, 'no record of a previous run in this VEP window, so all rows will be input'
+    live_rows = (table_bands - ledger['empty_table_bands']) / ledger['bands_per_row'] if ledger['bands_per_row'] > 0 else None
+    if live_rows is None or ledger['scrolled'] or ledger['window_size'] != list(window_size):
+        return 0, 0, 'the rows from the last run cannot all be seen, so all rows will be input'
+    if live_rows != len(ledger['rows']):
+        return 0, 0, f'VEP shows {live_rows:g} rows but the last run left {len(ledger["rows"])}, so all rows will be input'
+    kept_rows = common_prefix_length(ledger['rows'], rows)
+    deleted_rows = len(ledger['rows']) - kept_rows
+    return kept_rows, deleted_rows, f'keeping {kept_rows} unchanged rows, deleting {deleted_rows} and inputting {len(rows) - kept_rows}'
+
+def row_reads_back(atlas, controller_cell, destination_cell, datum):
+    # whether a row's controller and destination cells read, with the glyph atlas, as the CSV row datum has them; a row the atlas cannot read does not
+    layers = [datum[layer] for layer in ['layer 1', 'layer 2', 'layer 3', 'layer 4'] if datum[layer]]
+    reading = read_destination_cell(atlas, destination_cell)
+    return read_controller_cell(atlas, controller_cell) == (int(datum['device']), int(datum['channel']), int(datum['cc'])) and reading is not None and layers_match(reading, layers)
+
+def count_table_bands(image, new_row_click_location):
+    # counts the colour bands below the new row button, which grow by the same number with every row while the table fits in the window
+    x, y = new_row_click_location
+    _, _, (_, button_bottom_y) = find_nth_colour_band(image=image, n=0, start_position=(x, y), direction=(0, 1))
+    return count_colour_bands(image=image, start_position=(x, button_bottom_y + 1), direction=(0, 1))
+
+def find_last_row_y(image, new_row_click_location, bottom_gray_y, rows_above=0, bands_per_row=0):
+    # finds the middle of the last row of the table in a window image, or of the row rows_above rows above it, each row being bands_per_row colour bands
+    _, (_, last_row_y), _ = find_nth_colour_band(image=image, n=3 + rows_above*bands_per_row, start_position=(new_row_click_location[0], bottom_gray_y), direction=(0,-1))
+    return last_row_y
+
+def delete_row(abort_event, row_y, window_origin, window_size, new_row_click_location, delete_start_x, time_out=10.0):
+    # deletes the row whose middle is at row_y, waiting for it to go so that no other row is deleted by mistake
+    image = screenshot(scope='window', window_origin=window_origin, window_size=window_size, packed=True)
+    table_bands = count_table_bands(image, new_row_click_location)
+    _, (x, _), _ = find_nth_colour_band(image=image, n=2, start_position=(delete_start_x, row_y), direction=(-1, 0))
+    send_input(abort_event, pag.click, window_origin[0] + x, window_origin[1] + row_y)
+    t_0 = time.perf_counter()
+    while count_table_bands(screenshot(scope='window', window_origin=window_origin, window_size=window_size, packed=True), new_row_click_location) == table_bands:
+        if time.perf_counter() - t_0 > time_out:
+            raise VEP_MIDI_AutoMate_Error('Something went wrong. Unable to delete a row. Please contact the developer.')
+        wait(abort_event, 0.03)
+
+def delete_last_rows(abort_event, number_of_rows, window_origin, window_size, new_row_click_location, bottom_gray_y, delete_start_x, time_out=10.0):
+    # deletes the last number_of_rows rows one at a time, waiting for each to go so that no row above is deleted by mistake
+    for _ in range(number_of_rows):
+        last_row_y = find_last_row_y(screenshot(scope='window', window_origin=window_origin, window_size=window_size, packed=True), new_row_click_location, bottom_gray_y)
+        delete_row(abort_event, last_row_y, window_origin, window_size, new_row_click_location, delete_start_x, time_out)
+
+KEYBOARD_NAVIGATION_MAX_FAILURES = 3
+
+ROW_RETRIES = 1
+
+def recover_row(abort_event, row_created, window_origin, window_size, new_row_click_location, bottom_gray_y, delete_start_x):
+    # closes any menus or text entry left open by a failed row and deletes the row, if it was created, so that it can be input again or skipped
+    for _ in range(4):
+        send_input(abort_event, pag.press, 'escape')
+    if row_created:
+        delete_last_rows(abort_event, 1, window_origin, window_size, new_row_click_location, bottom_gray_y, delete_start_x)
+
+def rejects_path(csv_path):
+    # returns the path of the CSV that the rows skipped when inputting csv_path are written to, next to it
+    return csv_path.with_name(f'{csv_path.stem}-rejects.csv')
+
+def write_rejects(path, rejected_rows, required_headers):
+    # writes the skipped rows in the order of the CSV they came from, and in the same format, with their original row number and error
+    with path.open('w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(required_headers + ['csv row', 'error'])
+        for csv_row, datum, error in sorted(rejected_rows, key=lambda rejected_row: rejected_row[0]):
+            writer.writerow([datum.get(header, '') for header in required_headers] + [csv_row, error])
+
+CELL_READING_STREAK = 5
+CELL_LEARNING_ROWS = 30
+
+TURBO_STREAK = 20
+TURBO_SPOT_CHECK_ROWS = 10
+TURBO_TIME_OUT = 1.0
+
+def turbo_trusts(turbo, transition, row_number):
+    # whether turbo mode may skip waiting for transition on this row: it must have succeeded TURBO_STREAK times running, and every TURBO_SPOT_CHECK_ROWS-th row is verified in full
+    return turbo is not None and turbo[transition] >= TURBO_STREAK and row_number % TURBO_SPOT_CHECK_ROWS != 0
+
+def turbo_record(turbo, transition, succeeded):
+    # counts a success of transition towards its streak, or starts the streak again after a failure
+    if turbo is not None:
+        turbo[transition] = turbo[transition] + 1 if succeeded else 0
+
+def find_highlighted_items(image, blue_pixel, item_height):
+    # finds the highlighted item of each open menu in image, from left to right, returning (left, top, offset) for each, where offset is the item's distance below the top of its menu
+    width, height = image.size
+    image_np = np.frombuffer(image.tobytes(), dtype=np.uint8).reshape(height, width, 3)
+    blue = (image_np == np.array(blue_pixel, dtype=np.uint8)).all(axis=2)
+    columns = np.flatnonzero(blue.sum(axis=0) >= max(1, item_height // 3))
+    items = []
+    for run in np.split(columns, np.flatnonzero(np.diff(columns) > 1) + 1) if len(columns) else []:
+        left = int(run[0])
+        rows = np.flatnonzero(blue[:, left:int(run[-1]) + 1].sum(axis=1) > len(run) // 2)
+        top = int(rows[0])
+        if top == 0 or abs(int(rows[-1]) + 1 - top - item_height) > 3:
+            return None
+        menu_top = top - 1
+        while menu_top > 0 and (image_np[menu_top - 1, left] == image_np[top - 1, left]).all():
+            menu_top -= 1
+        items.append((left, top, top - menu_top))
+    return items
+
+def select_menu_items_by_keyboard(abort_event, menu_keys, menu_region, expected_indices, blue_pixel, item_height, menu_padding, time_out=0.5):
+    # drives the open menus with batched key presses, then checks from a single capture that the highlighted items are at expected_indices (None for a level not to check)
+    # items are item_height apart below menu_padding, the first item's offset measured while calibrating, so an item off by one shows up as an offset out of line with it; returns False if this cannot be confirmed
+    for key, presses in menu_keys:
+        if presses:
+            send_input(abort_event, pag.press, key, presses=presses)
+    t_0 = time.perf_counter()
+    while time.perf_counter() - t_0 < time_out:
+        items = find_highlighted_items(screenshot(scope='desktop', region=menu_region), blue_pixel, item_height)
+        if items is not None and len(items) == len(expected_indices):
+            paddings = [offset - index*item_height for (_, _, offset), index in zip(items, expected_indices) if index is not None]
+            if max(paddings) - min(paddings) <= item_height // 2 and all(abs(padding - menu_padding) <= item_height // 2 for padding in paddings):
+                return True
+        wait(abort_event, 0.01)
+    return False
+
+def take_plan(next_plan, row_number, datum, device_positions, item_height):
+    # returns the plan made ahead for row_number, given as (row number, future), or plans the row now if there is none or it is for another row,
+    # as when the row before was skipped before the plan ahead was made
+    if next_plan is not None and next_plan[0] == row_number:
+        return next_plan[1].result()
+    return plan_row(datum, device_positions, item_height)
+
+def keyboard_menu_keys(menu_keys, hovered_levels):
+    # the planned menu keys still to press once the first hovered_levels menus have been hovered over with the mouse
+    # hovering over an item opens its menu without moving keyboard focus into it, so the right that does is kept
+    return menu_keys[2*hovered_levels - 1:] if hovered_levels else menu_keys
+
+def prepare_vep(abort_event, update_callback, BULLET):
+    # finds, maximises and tidies the VEP window and selects MIDI Controllers, returning the window, its type, the desktop origin, the window origin and size, and where MIDI Controllers was clicked
+    # find Vienna Ensemble Pro (VEP) window
+    update_callback(f'{BULLET} locating and preparing VEP')
+    window_found = False
+    for window in gw.getAllWindows():
+        if window.title.startswith('Vienna Ensemble Pro'):
+            window_found = True
+            break
+    if not window_found:
+        raise VEP_MIDI_AutoMate_Not_Found('Vienna Ensemble Pro window not found. Please ensure Vienna Ensemble Pro is open.')
+    check_abort(abort_event)
+
+    # determine VEP window type
+    window_type = None
+    if 'Standalone' in window.title:
+        window_type = 'standalone'
+    elif 'Server' in window.title:
+        window_type = 'server'
+    else:
+        raise VEP_MIDI_AutoMate_Error('Unrecognised Vienna Ensemble Pro window type.')
+    check_abort(abort_event)
+
+    # maximise VEP window
+    if sys.platform != 'win32':
+        raise OSError('Currently supports Windows only.')
+    try:
+        window.maximize()
+    except Exception:
+        raise VEP_MIDI_AutoMate_Error('Something went wrong. Couldn\'t maximise the Vienna Ensemble Pro window.')
+    check_abort(abort_event)
+
+    # bring VEP window to front
+    try:
+        window.activate()
+    except Exception:
+        raise VEP_MIDI_AutoMate_Error('Something went wrong. Couldn\'t activate the Vienna Ensemble Pro window.')
+    check_abort(abort_event)
 
-def go(path, abort_event, slow_mode, update_callback, required_headers, BULLET):
+    # get virtual desktop origin
+    with mss.mss() as sct:
+        virtual_desktop = sct.monitors[0]  # whole desktop
+        desktop_origin = (virtual_desktop['left'], virtual_desktop['top'])
+    check_abort(abort_event)
+
+    # get VEP window origin, width and height
+    if sys.platform == 'win32':
+        try:
+            ctypes.windll.user32.SetProcessDPIAware()
+        except Exception:
+            pass
+    window_handle = getattr(window, '_hWnd', None)
+    if window_handle is None:
+        raise RuntimeError('Could not obtain HWND from window object')
+    class RECTANGLE(ctypes.Structure):
+        _fields_ = [('left', wintypes.LONG), ('top', wintypes.LONG), ('right', wintypes.LONG), ('bottom', wintypes.LONG)]
+    class POINT(ctypes.Structure):
+        _fields_ = [('x', wintypes.LONG), ('y', wintypes.LONG)] 
+    rectangle = RECTANGLE()
+    if not ctypes.windll.user32.GetClientRect(window_handle, ctypes.byref(rectangle)):
+        raise RuntimeError('GetClientRect failed')
+    top_left = POINT(0, 0)
+    bottom_right = POINT(rectangle.right, rectangle.bottom)
+    if not ctypes.windll.user32.ClientToScreen(window_handle, ctypes.byref(top_left)):
+        raise RuntimeError('ClientToScreen(top_left) failed')
+    if not ctypes.windll.user32.ClientToScreen(window_handle, ctypes.byref(bottom_right)):
+        raise RuntimeError('ClientToScreen(bottom_right) failed')
+    window_origin = (top_left.x, top_left.y)
+    window_width = bottom_right.x - top_left.x
+    window_height = bottom_right.y - top_left.y
+    window_size = (window_width, window_height)
+    check_abort(abort_event)
+
+    # confirm VEP instances
+    wait(abort_event, 0.5)
+    image = screenshot(scope='window', window_origin=window_origin, window_size=window_size)
+    if window_type == 'server':
+        colour_bands_left = count_colour_bands(image, (0, 0), (0, 1))
+        if colour_bands_left == 1:
+            raise VEP_MIDI_AutoMate_Error('Vienna Ensemble Pro must have at least one instance.')
+    check_abort(abort_event)
+
+    # remove unnecessary sub-windows
+    _, (_, y), _ = find_nth_colour_band(image=image,n=0,start_position=(0,0),direction=(0,1))
+    _, (x, _), _ = find_nth_colour_band(image=image,n=1,start_position=(0,y),direction=(1,0))
+    send_input(abort_event, pag.moveTo, (window_origin[0] + x, window_origin[1] + y)) # File menu
+    send_input(abort_event, pag.click)
+    send_input(abort_event, pag.press, 'left') # Help menu
+    send_input(abort_event, pag.keyUp, "alt")
+    send_input(abort_event, pag.press, 'left') # View menu
+    for _ in range(7):
+        send_input(abort_event, pag.press, 'down')
+    send_input(abort_event, pag.press, 'enter') # Reset Windows
+    send_input(abort_event, pag.press, 'f2') # hide Channels
+    send_input(abort_event, pag.press, 'f3') # hide Mixer
+    for window_temp in gw.getAllWindows():
+        if window_temp.title == 'Group Settings':
+            send_input(abort_event, pag.press, 'f8') # hide Group Settings
+            break
+    check_abort(abort_event)
+
+    # ensure MIDI Controllers is selected
+    image = screenshot(scope='window', window_origin=window_origin, window_size=window_size)
+    _, (_, y), _ = find_nth_colour_band(image=image, n=3, start_position=(window_width-1, 0), direction=(0, 1)) # fourth (n=3) colour down from the top-right
+    _, (x, _), _ = find_nth_colour_band(image=image, n=2, start_position=(window_width-1, y), direction=(-1, 0)) # then third (n=2) colour to the left
+    send_input(abort_event, pag.moveTo, window_origin[0] + x, window_origin[1] + y)
+    send_input(abort_event, pag.mouseDown)
+    send_input(abort_event, pag.mouseUp)
+    check_abort(abort_event)
+    return window, window_type, desktop_origin, window_origin, window_size, (x, y)
+
+def find_new_row_button(image, window_type):
+    # locates the new row button in a window image
+    band_number = 4 if window_type == 'standalone' else 6 if window_type == 'server' else -1
+    _, _, (_, y) = find_nth_colour_band(image=image, n=band_number, start_position=(0, 0), direction=(0, 1))
+    _, (x, _), _ = find_nth_colour_band(image=image, n=0, start_position=(0, y), direction=(1, 0))
+    _, (_, y), _ = find_nth_colour_band(image=image, n=3, start_position=(x, y), direction=(0, 1))
+    return (x, y)
+
+def go(path, abort_event, slow_mode, update_callback, required_headers, BULLET, progress_callback=None, abort_time=None, record_path=None, navigation='mouse', turbo_mode=False, sync=False, recovery=False):
+
+    def send_progress(event, **details):
+        # sends a machine-readable progress event
+        if progress_callback is not None:
+            progress_callback({'event': event, **details})
 
     # temporary Windows priority bump
     p = psutil.Process(os.getpid())
     original_nice = None
+    pipeline = None
+    rejected_rows = []
 
     try:
         original_nice = p.nice()
         p.nice(psutil.HIGH_PRIORITY_CLASS)
 
+        # optional recording of every captured frame, for debugging and offline replay
+        if record_path is not None:
+            start_recording(record_path)
+            update_callback(f'{BULLET} recording frames to {record_path}')
+
         # import CSV file
         update_callback(f'{BULLET} importing CSV file')
-        data = []
-        with path.open('r', encoding='utf-8-sig', newline='') as f:
-            reader = csv.DictReader(f)
-            if reader.fieldnames is None:
-                raise VEP_MIDI_AutoMate_Error('CSV appears empty or has no header row. Expected columns: ' + ','.join(required_headers) + '. Consider using the template provided.')
-            missing_headers = [header for header in required_headers if header not in reader.fieldnames]
-            if missing_headers:
-                raise VEP_MIDI_AutoMate_Error('CSV is missing required columns: ' + ','.join(missing_headers) + '. Consider using the template provided.')
-            for _, raw_data in enumerate(reader, start=2):
-                raw_datum = {(k or '').strip().lower(): (v or '').strip() for k, v in raw_data.items()}
-                data.append(raw_datum)
+        data = load_csv(path, required_headers)
         check_abort(abort_event)
 
         # auto gui settings
         pag.FAILSAFE = True
+        pag.PAUSE = 0 # send_input pauses instead, so that pauses end as soon as an abort is requested
         if slow_mode:
-            pag.PAUSE = 0.5
-        else:
-            pag.PAUSE = 0.03
-        check_abort(abort_event)
-
-        # find Vienna Ensemble Pro (VEP) window
-        update_callback(f'{BULLET} locating and preparing VEP')
-        window_found = False
-        for window in gw.getAllWindows():
-            if window.title.startswith('Vienna Ensemble Pro'):
-                window_found = True
-                break
-        if not window_found:
-            raise VEP_MIDI_AutoMate_Error('Vienna Ensemble Pro window not found. Please ensure Vienna Ensemble Pro is open.')
-        check_abort(abort_event)
-
-        # determine VEP window type
-        window_type = None
-        if 'Standalone' in window.title:
-            window_type = 'standalone'
-        elif 'Server' in window.title:
-            window_type = 'server'
+            input_state['pause'] = 0.5
         else:
-            raise VEP_MIDI_AutoMate_Error('Unrecognised Vienna Ensemble Pro window type.')
+            input_state['pause'] = 0.03
+        input_state['abort_time'] = abort_time
+        input_state['last_input_time'] = None
+        # turbo mode keeps a streak of successes for each transition, and stops waiting for those with a long enough streak
+        turbo = {'new row button': 0, 'device menu': 0, 'destination': 0} if turbo_mode and not slow_mode else None
+        turbo_skips = 0
+        turbo_repairs = 0
         check_abort(abort_event)
 
-        # maximise VEP window
-        if sys.platform != 'win32':
-            raise OSError('Currently supports Windows only.')
-        try:
-            window.maximize()
-        except Exception:
-            raise VEP_MIDI_AutoMate_Error('Something went wrong. Couldn\'t maximise the Vienna Ensemble Pro window.')
-        check_abort(abort_event)
+        # find, maximise and tidy the VEP window, and select MIDI Controllers
+        window, window_type, desktop_origin, window_origin, window_size, (x, y) = prepare_vep(abort_event, update_callback, BULLET)
 
-        # bring VEP window to front
-        try:
-            window.activate()
-        except Exception:
-            raise VEP_MIDI_AutoMate_Error('Something went wrong. Couldn\'t activate the Vienna Ensemble Pro window.')
-        check_abort(abort_event)
-
-        # get virtual desktop origin
-        with mss.mss() as sct:
-            virtual_desktop = sct.monitors[0]  # whole desktop
-            desktop_origin = (virtual_desktop['left'], virtual_desktop['top'])
-        check_abort(abort_event)
-
-        # get VEP window origin, width and height
-        if sys.platform == 'win32':
-            try:
-                ctypes.windll.user32.SetProcessDPIAware()
-            except Exception:
-                pass
-        window_handle = getattr(window, '_hWnd', None)
-        if window_handle is None:
-            raise RuntimeError('Could not obtain HWND from window object')
-        class RECTANGLE(ctypes.Structure):
-            _fields_ = [('left', wintypes.LONG), ('top', wintypes.LONG), ('right', wintypes.LONG), ('bottom', wintypes.LONG)]
-        class POINT(ctypes.Structure):
-            _fields_ = [('x', wintypes.LONG), ('y', wintypes.LONG)] 
-        rectangle = RECTANGLE()
-        if not ctypes.windll.user32.GetClientRect(window_handle, ctypes.byref(rectangle)):
-            raise RuntimeError('GetClientRect failed')
-        top_left = POINT(0, 0)
-        bottom_right = POINT(rectangle.right, rectangle.bottom)
-        if not ctypes.windll.user32.ClientToScreen(window_handle, ctypes.byref(top_left)):
-            raise RuntimeError('ClientToScreen(top_left) failed')
-        if not ctypes.windll.user32.ClientToScreen(window_handle, ctypes.byref(bottom_right)):
-            raise RuntimeError('ClientToScreen(bottom_right) failed')
-        window_origin = (top_left.x, top_left.y)
-        window_width = bottom_right.x - top_left.x
-        window_height = bottom_right.y - top_left.y
-        window_size = (window_width, window_height)
-        check_abort(abort_event)
-
-        # confirm VEP instances
-        pag.sleep(0.5)
+        # locate the new row button
         image = screenshot(scope='window', window_origin=window_origin, window_size=window_size)
-        if window_type == 'server':
-            colour_bands_left = count_colour_bands(image, (0, 0), (0, 1))
-            if colour_bands_left == 1:
-                raise VEP_MIDI_AutoMate_Error('Vienna Ensemble Pro must have at least one instance.')
+        (x_start, y_start) = (x, y)
+        new_row_click_location = find_new_row_button(image, window_type)
         check_abort(abort_event)
 
-        # remove unnecessary sub-windows
-        _, (_, y), _ = find_nth_colour_band(image=image,n=0,start_position=(0,0),direction=(0,1))
-        _, (x, _), _ = find_nth_colour_band(image=image,n=1,start_position=(0,y),direction=(1,0))
-        pag.moveTo((window_origin[0] + x, window_origin[1] + y)) # File menu
-        pag.click()
-        pag.press('left') # Help menu
-        pag.keyUp("alt")
-        pag.press('left') # View menu
-        for _ in range(7):
-            pag.press('down')
-        pag.press('enter') # Reset Windows
-        pag.press('f2') # hide Channels
-        pag.press('f3') # hide Mixer
-        for window_temp in gw.getAllWindows():
-            if window_temp.title == 'Group Settings':
-                pag.press('f8') # hide Group Settings
-                break
+        # in sync mode, keep the rows that are unchanged since the last successful run in this VEP window, provided the live row count matches the ledger
+        ledger = load_ledger(window.title) if sync else None
+        table_bands = count_table_bands(image, new_row_click_location)
+        kept_rows, deleted_rows, sync_message = compare_ledger(ledger, table_bands, window_size, ledger_rows(data, required_headers)) if sync else (0, 0, None)
+        if sync_message:
+            update_callback(f'{BULLET} {sync_message}')
+        save_ledger(window.title, None) # forgotten until this run succeeds
         check_abort(abort_event)
 
-        # ensure MIDI Controllers is selected
-        image = screenshot(scope='window', window_origin=window_origin, window_size=window_size)
-        _, (_, y), _ = find_nth_colour_band(image=image, n=3, start_position=(window_width-1, 0), direction=(0, 1)) # fourth (n=3) colour down from the top-right
-        _, (x, _), _ = find_nth_colour_band(image=image, n=2, start_position=(window_width-1, y), direction=(-1, 0)) # then third (n=2) colour to the left
-        pag.moveTo(window_origin[0] + x, window_origin[1] + y)
-        pag.mouseDown()
-        pag.mouseUp()
-        check_abort(abort_event)
-        
-        # ensure all rows are deleted
-        update_callback(f'{BULLET} deleting current rows')
-        image = screenshot(scope='window', window_origin=window_origin, window_size=window_size)
-        (x_start, y_start) = (x, y)
-        number_of_colours = count_colour_bands(image=image, start_position=(x_start, y_start), direction=(0, 1))
-        while number_of_colours > 4:
-            _, _, (_, y) = find_nth_colour_band(image=image, n=3, start_position=(x_start, y_start), direction=(0, 1))
-            _, (x, _), _ = find_nth_colour_band(image=image, n=2, start_position=(x_start, y), direction=(-1, 0))
-            pag.click(window_origin[0] + x, window_origin[1] + y)
-            image = screenshot(scope='window', window_origin=window_origin, window_size=window_size)
+        # ensure all rows are deleted, unless kept
+        if kept_rows:
+            empty_table_bands = ledger['empty_table_bands']
+        else:
+            update_callback(f'{BULLET} deleting current rows')
             number_of_colours = count_colour_bands(image=image, start_position=(x_start, y_start), direction=(0, 1))
-            check_abort(abort_event)
+            while number_of_colours > 4:
+                _, _, (_, y) = find_nth_colour_band(image=image, n=3, start_position=(x_start, y_start), direction=(0, 1))
+                _, (x, _), _ = find_nth_colour_band(image=image, n=2, start_position=(x_start, y), direction=(-1, 0))
+                send_input(abort_event, pag.click, window_origin[0] + x, window_origin[1] + y)
+                image = screenshot(scope='window', window_origin=window_origin, window_size=window_size, packed=True)
+                number_of_colours = count_colour_bands(image=image, start_position=(x_start, y_start), direction=(0, 1))
+                check_abort(abort_event)
+            empty_table_bands = count_table_bands(image, new_row_click_location)
+        table_bands = count_table_bands(image, new_row_click_location)
 
         # start empty row
-        band_number = 4 if window_type == 'standalone' else 6 if window_type == 'server' else -1
-        _, _, (_, y) = find_nth_colour_band(image=image, n=band_number, start_position=(0, 0), direction=(0, 1))
-        _, (x, _), _ = find_nth_colour_band(image=image, n=0, start_position=(0, y), direction=(1, 0))
-        _, (_, y), _ = find_nth_colour_band(image=image, n=3, start_position=(x, y), direction=(0, 1))
-        new_row_click_location = (x, y)
-        pag.moveTo(window_origin[0] + new_row_click_location[0], window_origin[1] + new_row_click_location[1])
-        pag.mouseDown()
-        pag.mouseUp()
+        send_input(abort_event, pag.moveTo, window_origin[0] + new_row_click_location[0], window_origin[1] + new_row_click_location[1])
+        send_input(abort_event, pag.mouseDown)
+        send_input(abort_event, pag.mouseUp)
         check_abort(abort_event)
 
         # click to reveal menu Level 1
         update_callback(f'{BULLET} investigating layout')
         x, y = new_row_click_location
         image = screenshot(scope='window', window_origin=window_origin, window_size=window_size)
+        bands_per_row = count_table_bands(image, new_row_click_location) - table_bands
         _, (_, y), _ = find_nth_colour_band(image=image, n=4, start_position=(x, y), direction=(0, 1))
         grey_pixel = image.getpixel((x-1, y))
-        pag.moveTo(window_origin[0] + x, window_origin[1] + y)
+        send_input(abort_event, pag.moveTo, window_origin[0] + x, window_origin[1] + y)
         image_before = screenshot(scope='desktop')
-        pag.mouseDown()
-        pag.mouseUp()
-        wait_for_device_menu_to_open(grey_pixel)
+        send_input(abort_event, pag.mouseDown)
+        send_input(abort_event, pag.mouseUp)
+        wait_for_device_menu_to_open(grey_pixel, abort_event)
         image_after = screenshot(scope='desktop')
         device_menu, bounding_box = crop_by_largest_difference(image_before, image_after)
         check_abort(abort_event)
@@ -408,21 +1304,23 @@ def go(path, abort_event, slow_mode, update_callback, required_headers, BULLET):
         # calculate all left-column menu widths
         device_menu_width = device_menu.width
         image_device = screenshot(scope='desktop')
-        pag.moveTo(desktop_origin[0] + bounding_box[0] + device_menu_width // number_of_device_columns // 2, desktop_origin[1] + bounding_box[1] + int(0.5*average_item_height))
+        send_input(abort_event, pag.moveTo, desktop_origin[0] + bounding_box[0] + device_menu_width // number_of_device_columns // 2, desktop_origin[1] + bounding_box[1] + int(0.5*average_item_height))
         blue_pixel = screenshot(scope='desktop', region=(desktop_origin[0] + bounding_box[0] + device_menu_width // number_of_device_columns // 2, desktop_origin[1] + bounding_box[1] + int(0.5*average_item_height), desktop_origin[0] + bounding_box[0] + device_menu_width // number_of_device_columns // 2 + 1, desktop_origin[1] + bounding_box[1] + int(0.5*average_item_height) + 1)).getpixel((0,0))
-        pag.moveTo(desktop_origin[0] + bounding_box[0] + device_menu_width // number_of_device_columns // 2, desktop_origin[1] + bounding_box[1] + int(1.5*average_item_height))
-        wait_for_menu_item_to_turn_blue(blue_pixel, average_item_height)
+        send_input(abort_event, pag.moveTo, desktop_origin[0] + bounding_box[0] + device_menu_width // number_of_device_columns // 2, desktop_origin[1] + bounding_box[1] + int(1.5*average_item_height))
+        wait_for_menu_item_to_turn_blue(blue_pixel, average_item_height, abort_event)
         image_channel = screenshot(scope='desktop')
         _, bounding_box = crop_by_largest_difference(image_device, image_channel, extract_last_menu_only=True)
         channel_menu_width = int(bounding_box[2] - bounding_box[0])
-        pag.moveTo(desktop_origin[0] + bounding_box[0] + channel_menu_width // 2, desktop_origin[1] + bounding_box[1] + int(0.5*average_item_height))
-        wait_for_menu_item_to_turn_blue(blue_pixel, average_item_height)
+        send_input(abort_event, pag.moveTo, desktop_origin[0] + bounding_box[0] + channel_menu_width // 2, desktop_origin[1] + bounding_box[1] + int(0.5*average_item_height))
+        wait_for_menu_item_to_turn_blue(blue_pixel, average_item_height, abort_event)
         image_controller_group = screenshot(scope='desktop')
         _, bounding_box = crop_by_largest_difference(image_channel, image_controller_group, extract_last_menu_only=True)
         controller_group_menu_width = int(bounding_box[2] - bounding_box[0])
-        pag.moveTo(desktop_origin[0] + bounding_box[0] + controller_group_menu_width // 2, desktop_origin[1] + bounding_box[1] + int(0.5*average_item_height))
-        wait_for_menu_item_to_turn_blue(blue_pixel, average_item_height)
+        send_input(abort_event, pag.moveTo, desktop_origin[0] + bounding_box[0] + controller_group_menu_width // 2, desktop_origin[1] + bounding_box[1] + int(0.5*average_item_height))
+        wait_for_menu_item_to_turn_blue(blue_pixel, average_item_height, abort_event)
         image_cc = screenshot(scope='desktop')
+        highlighted_items = find_highlighted_items(image_cc.crop((bounding_box[0], 0, bounding_box[2], image_cc.height)), blue_pixel, average_item_height)
+        menu_padding = highlighted_items[0][2] if highlighted_items else None # the first item's offset below the top of its menu, from the controller group menu's first item
         _, bounding_box = crop_by_largest_difference(image_controller_group, image_cc, extract_last_menu_only=True)
         cc_menu_width = int(bounding_box[2] - bounding_box[0])
         total_menu_width = device_menu_width + channel_menu_width + controller_group_menu_width + cc_menu_width
@@ -431,9 +1329,14 @@ def go(path, abort_event, slow_mode, update_callback, required_headers, BULLET):
 
         # reset
         for _ in range(4):
-            pag.press('escape')
+            send_input(abort_event, pag.press, 'escape')
         check_abort(abort_event)
 
+        # keyboard navigation is checked against the padding above the menus' first items, so without it the menus are hovered over
+        if navigation == 'keyboard' and menu_padding is None:
+            navigation = 'mouse'
+            update_callback(f'{BULLET} could not measure the menus for keyboard navigation, so they will be hovered over')
+
         # locate important positions
         image = screenshot(scope='window', window_origin=window_origin, window_size=window_size)
         (_, first_row_top_y), (_, first_row_y), _ = find_nth_colour_band(image=image, n=4, start_position=new_row_click_location, direction=(0,1))
@@ -446,168 +1349,436 @@ def go(path, abort_event, slow_mode, update_callback, required_headers, BULLET):
         _, _, (_, first_row_bottom_y) = find_nth_colour_band(image=image, n=0, start_position=(right_menu_x, first_row_top_y), direction=(0,1))
         first_row_mid_y = int((first_row_top_y + first_row_bottom_y)/2)
         _, _, (right_menu_left_x, _) = find_nth_colour_band(image=image, n=0, start_position=(right_menu_x, first_row_mid_y), direction=(-1,0))
+        _, _, (right_menu_right_x, _) = find_nth_colour_band(image=image, n=0, start_position=(right_menu_x, first_row_mid_y), direction=(1,0))
+        half_row_height = (first_row_bottom_y - first_row_top_y) // 2
+        glyph_atlas = load_glyph_atlas()
+        cell_reading_streak = 0
         new_row_click_colour = image.getpixel(new_row_click_location)
         vertical_scrollbar_in_use = False
         vertical_scrollbar_x = -1
         vertical_scrollbar_y = -1
         check_abort(abort_event)
 
+        # in sync mode, only trust the ledger if the last row to keep reads back as the CSV has it, since every VEP Server window has the same title and the ledger may be another instance's
+        if kept_rows:
+            kept_row_y = find_last_row_y(screenshot(scope='window', window_origin=window_origin, window_size=window_size, packed=True), new_row_click_location, bottom_gray_y, deleted_rows + 1, bands_per_row)
+            kept_row_top_y, kept_row_bottom_y = window_origin[1] + kept_row_y - half_row_height, window_origin[1] + kept_row_y + half_row_height + 1
+            controller_cell = screenshot(scope='desktop', region=(window_origin[0] + left_menu_left_x + 1, kept_row_top_y, window_origin[0] + left_menu_right_x, kept_row_bottom_y))
+            destination_cell = screenshot(scope='desktop', region=(window_origin[0] + right_menu_left_x + 1, kept_row_top_y, window_origin[0] + right_menu_right_x, kept_row_bottom_y))
+            if not row_reads_back(glyph_atlas, controller_cell, destination_cell, data[kept_rows - 1]):
+                update_callback(f'{BULLET} the last row to keep does not read back as the CSV has it, so all rows will be input')
+                for _ in range(kept_rows + deleted_rows):
+                    delete_row(abort_event, first_row_y, window_origin, window_size, new_row_click_location, x_start)
+                kept_rows, deleted_rows = 0, 0
+            check_abort(abort_event)
+
+        # check every destination exists before creating any more rows, searching in the empty row just added (the last row), never in a row kept by sync mode
+        all_data = data
+        data = data[kept_rows:]
+        if data:
+            update_callback(f'{BULLET} checking destinations')
+            empty_row_y = find_last_row_y(screenshot(scope='window', window_origin=window_origin, window_size=window_size, packed=True), new_row_click_location, bottom_gray_y)
+            empty_row_text_region = (window_origin[0] + right_menu_left_x + 1, window_origin[1] + empty_row_y - half_row_height, window_origin[0] + right_menu_right_x, window_origin[1] + empty_row_y + half_row_height + 1)
+            list_region = (empty_row_text_region[0], empty_row_text_region[3], empty_row_text_region[2], desktop_origin[1] + screen_height)
+            missing_destinations = find_missing_destinations(data, (window_origin[0] + right_menu_x, window_origin[1] + empty_row_y), empty_row_text_region, list_region, glyph_atlas, abort_event, BULLET, first_csv_row=kept_rows + 2)
+            if missing_destinations is None:
+                update_callback(f'{BULLET} could not see the destination list, so destinations will be checked as each row is input')
+            elif missing_destinations:
+                raise VEP_MIDI_AutoMate_Destination_Error('These destinations in your CSV could not be found in VEP. Make sure they are spelt exactly as they appear in VEP.\n' + '\n'.join(missing_destinations))
+            check_abort(abort_event)
+
+        # delete the rows after those kept, along with the empty row, so that only the rest of the CSV is input
+        if kept_rows:
+            delete_last_rows(abort_event, deleted_rows + 1, window_origin, window_size, new_row_click_location, bottom_gray_y, x_start)
+            check_abort(abort_event)
+
+        def spot_check_unverified_rows(last_row_y, last_row_index):
+            # checks the destinations turbo mode did not confirm, counting up from the row at last_row_y, inputting again any that are wrong
+            # if recovering from failures, a row still wrong after that is deleted and skipped like any other failed row; rows are checked from the bottom up so that those still to check stay in the table
+            nonlocal turbo_repairs, recoveries, rows_input, previous_last_row_y
+            for unverified_row_number, unverified_plan, unverified_row_index in reversed(unverified_rows):
+                unverified_row_y = last_row_y - (last_row_index - unverified_row_index) * row_pitch
+                unverified_region = (window_origin[0] + right_menu_left_x + 1, window_origin[1] + unverified_row_y - half_row_height, window_origin[0] + right_menu_right_x, window_origin[1] + unverified_row_y + half_row_height + 1)
+                csv_row = unverified_row_number + kept_rows + 2
+                try:
+                    spot_check_destination_cell(glyph_atlas, screenshot(scope='desktop', region=unverified_region), unverified_plan['layers'], f'The destination in CSV row {csv_row}')
+                except VEP_MIDI_AutoMate_Destination_Error:
+                    update_callback(f'{BULLET} turbo mode spot check: inputting the destination in CSV row {csv_row} again')
+                    turbo_record(turbo, 'destination', False)
+                    turbo_repairs += 1
+                    try:
+                        send_input(abort_event, pag.moveTo, window_origin[0] + right_menu_x, window_origin[1] + unverified_row_y)
+                        send_input(abort_event, pag.click)
+                        send_keystrokes(abort_event, CLEAR_TEXT_KEYSTROKES + unverified_plan['keystrokes'], unverified_region, glyph_atlas)
+                        wait_for_destination_text_to_appear(right_menu_x - right_menu_left_x, abort_event)
+                        spot_check_destination_cell(glyph_atlas, screenshot(scope='desktop', region=unverified_region), unverified_plan['layers'], f'The destination in CSV row {csv_row}')
+                    except VEP_MIDI_AutoMate_Error as e:
+                        if not recovery:
+                            raise
+                        recoveries += 1
+                        update_callback(f'{BULLET} CSV row {csv_row} failed ({e}), skipping it')
+                        for _ in range(4):
+                            send_input(abort_event, pag.press, 'escape')
+                        delete_row(abort_event, unverified_row_y, window_origin, window_size, new_row_click_location, x_start)
+                        rejected_rows.append((csv_row, data[unverified_row_number], str(e)))
+                        send_progress('rejected', row=unverified_row_number + 1, rows=len(data), csv_row=csv_row, error=str(e))
+                        rows_input -= 1
+                        previous_last_row_y = None
+                        last_row_y = find_last_row_y(screenshot(scope='window', window_origin=window_origin, window_size=window_size, packed=True), new_row_click_location, bottom_gray_y)
+                        last_row_index -= 1
+                        check_abort(abort_event)
+            unverified_rows.clear()
+
         # main loop
         update_callback(f'{BULLET} inputting data for {len(data)} rows')
         start_time = time.time()
         elapsed_time = 0
+        row_times = []
+        menu_times = []
+        pipeline = futures.ThreadPoolExecutor(max_workers=1)
+        menu_predictions = {}
+        geometry_cache = {}
+        keyboard_failures = 0
+        unverified_rows = []
+        rows_input = 0 # rows of this run in the table, which excludes any skipped
+        row_pending = not kept_rows
+        recoveries = 0
+        previous_last_row_y = None
+        row_pitch = None
+        next_plan = None
         for row_number in range(len(data)):
 
             # send progress update
             if row_number > 0:
                 elapsed_time = time.time() - start_time
                 estimated_time_required = elapsed_time / row_number * len(data)
-            update_string = f' {row_number + 1}/{len(data)} {"∞:∞∞:∞∞" if row_number==0 else datetime.timedelta(seconds = int(estimated_time_required - elapsed_time))} ({data[row_number]["device"]},{data[row_number]["channel"]},{data[row_number]["cc"]}) → {data[row_number]["layer 1"]}/{data[row_number]["layer 2"]}{"/" if data[row_number]["layer 3"] else ""}{data[row_number]["layer 3"]}{"/" if data[row_number]["layer 4"] else ""}{data[row_number]["layer 4"]}'
-            if data[row_number]['repeat']:
-                update_string += f'(R{data[row_number]["repeat"]})'
-            update_callback(update_string)
-
-            # create new row
-            if row_number > 0:
-                pag.moveTo(window_origin[0] + new_row_click_location[0], window_origin[1] + new_row_click_location[1])
-                wait_for_new_row_button_to_be_ready(new_row_click_colour)
-
-                x, y = pag.position()
-                strip_region = (x, y, x+1, desktop_origin[1]+bottom_gray_y)
-                strip = screenshot(scope='desktop', region=strip_region)
-                pag.mouseDown()
-                pag.mouseUp()
-                wait_for_new_row_to_appear(strip, strip_region=strip_region)
-
-                # scroll down if required
-                image = screenshot(scope='window', window_origin=window_origin, window_size=window_size)
-                if not vertical_scrollbar_in_use:
-                    if count_colour_bands(image=image, start_position=(0,first_row_top_y), direction=(1,0)) != initial_colours_along_top_row:
-                        vertical_scrollbar_in_use = True
-                        _, (vertical_scrollbar_x, _), _ = find_nth_colour_band(image=image, n=1, start_position=(window_size[0]-1,first_row_y), direction=(-1,0))
-                if vertical_scrollbar_in_use:
-                    pixel = image.load()
-                    black_pixel = pixel[vertical_scrollbar_x, new_row_click_location[1]]
-                    found_vertical_scrollbar = False
-                    vertical_scrollbar_y_start = -1
-                    vertical_scrollbar_y_end = -1
-                    for y in range(new_row_click_location[1], window_size[1]):
-                        p = pixel[vertical_scrollbar_x,y]
-                        if found_vertical_scrollbar and abs(p[0] - black_pixel[0]) + abs(p[1] - black_pixel[1]) + abs(p[2] - black_pixel[2]) < 5 :
-                            vertical_scrollbar_y_end = y
-                            break
-                        if not found_vertical_scrollbar and abs(p[0] - black_pixel[0]) + abs(p[1] - black_pixel[1]) + abs(p[2] - black_pixel[2]) >= 5 :
-                            vertical_scrollbar_y_start = y
-                            found_vertical_scrollbar = True
-                    vertical_scrollbar_y = int((vertical_scrollbar_y_start+vertical_scrollbar_y_end)/2)
-                    pag.moveTo(window_origin[0] + vertical_scrollbar_x, window_origin[1] + vertical_scrollbar_y + 1)
-                    pag.dragTo(window_origin[0] + vertical_scrollbar_x, window_origin[1] + window_size[1]-1)
-                check_abort(abort_event)   
-
-            # click on new row
-            image = screenshot(scope='window', window_origin=window_origin, window_size=window_size)
-            _, (_, last_row_y), _ = find_nth_colour_band(image=image, n=3, start_position=(new_row_click_location[0], bottom_gray_y), direction=(0,-1))
-            pag.moveTo(window_origin[0] + left_menu_x, window_origin[1] + last_row_y)
-            menu_region = (window_origin[0] + left_menu_x, desktop_origin[1], window_origin[0] + left_menu_x + total_menu_width, desktop_origin[1] + screen_height)
-            image_main = screenshot(scope='desktop', region=menu_region)
-            pag.click()
-            wait_for_device_menu_to_open(grey_pixel)
-            check_abort(abort_event)
-
-            # select device
-            device_position_x, device_position_y = device_positions[int(data[row_number]['device'])]
-            image_device = screenshot(scope='desktop', region=menu_region)
-            _, bounding_box = crop_by_largest_difference(image_main, image_device)
-            pag.moveTo(menu_region[0] + bounding_box[0] + device_position_x, menu_region[1] + bounding_box[1] + device_position_y)
-            wait_for_menu_item_to_turn_blue(blue_pixel, average_item_height)
-            check_abort(abort_event)
-
-            # select channel
-            image_channel = screenshot(scope='desktop', region=menu_region)
-            _, bounding_box = crop_by_largest_difference(image_device, image_channel, extract_last_menu_only=True)
-            channel_position_x = int((bounding_box[2] - bounding_box[0])/2)
-            channel_position_y = int((int(data[row_number]['channel']) - 0.5) * average_item_height)
-            pag.moveTo(menu_region[0] + bounding_box[0] + channel_position_x, menu_region[1] + bounding_box[1] + channel_position_y)
-            wait_for_menu_item_to_turn_blue(blue_pixel, average_item_height)
-            check_abort(abort_event)
-
-            # select controller group
-            image_controller_group = screenshot(scope='desktop', region=menu_region)
-            _, bounding_box = crop_by_largest_difference(image_channel, image_controller_group, extract_last_menu_only=True)
-            controller_group_position_x = int((bounding_box[2] - bounding_box[0])/2)
-            controller_group_position_y = int((int(data[row_number]['cc']) // 16 + 0.5) * average_item_height)
-            pag.moveTo(menu_region[0] + bounding_box[0] + controller_group_position_x, menu_region[1] + bounding_box[1] + controller_group_position_y)
-            wait_for_menu_item_to_turn_blue(blue_pixel, average_item_height)
-            check_abort(abort_event)
-
-            # select cc
-            image_cc = screenshot(scope='desktop', region=menu_region)
-            _, bounding_box = crop_by_largest_difference(image_controller_group, image_cc, extract_last_menu_only=True)
-            cc_position_x = int((bounding_box[2] - bounding_box[0])/2)
-            cc_position_y = int((int(data[row_number]['cc']) % 16 + 0.5) * average_item_height)
-            pag.moveTo(menu_region[0] + bounding_box[0] + cc_position_x, menu_region[1] + bounding_box[1] + cc_position_y)
-            wait_for_menu_item_to_turn_blue(blue_pixel, average_item_height)
-            pag.click()
-            check_abort(abort_event)
-
-            # click on right menu
-            pag.moveTo(window_origin[0] + right_menu_x, window_origin[1] + last_row_y)
-            pag.click()
-            check_abort(abort_event)
-
-            # input layer 1
-            pag.write(data[row_number]['layer 1'])
-            pag.press('down')
-            check_abort(abort_event)
-
-            # input layer 2
-            pag.hotkey('ctrl','a')
-            pag.press('delete')
-            pag.write(data[row_number]['layer 2'])
-            pag.press('down')
-            check_abort(abort_event)
-
-            # input layer 3
-            if data[row_number]['layer 3']:
-                pag.hotkey('ctrl','a')
-                pag.press('delete')
-                pag.write(data[row_number]['layer 3'])
-                pag.press('down')
-                if not data[row_number]['layer 4'] and data[row_number]['repeat']:
-                    for _ in range(int(data[row_number]['repeat'])):
-                        pag.press('down')
-                check_abort(abort_event)
-
-                # input layer 4
-                if data[row_number]['layer 4']:
-                    pag.hotkey('ctrl','a')
-                    pag.press('delete')
-                    pag.write(data[row_number]['layer 4'])
-                    pag.press('down')
-                    if data[row_number]['repeat']:
-                        for _ in range(int(data[row_number]['repeat'])):
-                            pag.press('down')
-                    pag.press('enter')
-                else:
-                    pag.press('enter')
-                check_abort(abort_event)
-
+            update_callback(row_update_string(row_number, len(data), data[row_number], None if row_number == 0 else estimated_time_required - elapsed_time))
+            row_start_time = time.perf_counter()
+            plan = take_plan(next_plan, row_number, data[row_number], device_positions, average_item_height)
+
+            # input the row, or if recovering from failures, close whatever is open, delete the partial row and try again, skipping the row after ROW_RETRIES retries
+            attempts = ROW_RETRIES + 1 if recovery else 1
+            for attempt in range(attempts):
+                attempt_previous_last_row_y = previous_last_row_y
+                try:
+                    # create new row (the first row is already there, unless rows were kept or it was deleted to recover from a failure)
+                    row_created = row_pending
+                    row_pending = False
+                    if not row_created:
+                        send_input(abort_event, pag.moveTo, window_origin[0] + new_row_click_location[0], window_origin[1] + new_row_click_location[1])
+                        trusted = turbo_trusts(turbo, 'new row button', row_number)
+                        turbo_skips += trusted
+                        if not trusted:
+                            wait_for_new_row_button_to_be_ready(new_row_click_colour, abort_event)
+
+                        x, y = pag.position()
+                        strip_region = (x, y, x+1, desktop_origin[1]+bottom_gray_y)
+                        strip = screenshot(scope='desktop', region=strip_region, packed=True)
+                        send_input(abort_event, pag.mouseDown)
+                        send_input(abort_event, pag.mouseUp)
+                        try:
+                            wait_for_new_row_to_appear(strip, strip_region, abort_event, time_out=TURBO_TIME_OUT if trusted else 10.0)
+                            turbo_record(turbo, 'new row button', True)
+                        except VEP_MIDI_AutoMate_Error:
+                            # clicked before the button was ready, or VEP was slow to add the row, so wait for the button and click again only if the row has still not appeared since the strip taken before the first click
+                            if not trusted:
+                                raise
+                            turbo_record(turbo, 'new row button', False)
+                            wait_for_new_row_button_to_be_ready(new_row_click_colour, abort_event)
+                            if count_colour_bands(image=screenshot(scope='desktop', region=strip_region, packed=True), start_position=(0,0), direction=(0,1)) == count_colour_bands(image=strip, start_position=(0,0), direction=(0,1)):
+                                send_input(abort_event, pag.mouseDown)
+                                send_input(abort_event, pag.mouseUp)
+                            wait_for_new_row_to_appear(strip, strip_region, abort_event)
+                        row_created = True
+
+                        # scroll down if required
+                        image = screenshot(scope='window', window_origin=window_origin, window_size=window_size, packed=True)
+                        if not vertical_scrollbar_in_use:
+                            if count_colour_bands(image=image, start_position=(0,first_row_top_y), direction=(1,0)) != initial_colours_along_top_row:
+                                vertical_scrollbar_in_use = True
+                                _, (vertical_scrollbar_x, _), _ = find_nth_colour_band(image=image, n=1, start_position=(window_size[0]-1,first_row_y), direction=(-1,0))
+                        if vertical_scrollbar_in_use:
+                            # the scrollbar thumb is where the column first differs from the black of the track, until it is close to black again
+                            column = colour_line(image, (vertical_scrollbar_x, new_row_click_location[1]), (0, 1))
+                            close_to_black = colour_distance(column, column[0]) < 5
+                            thumb_starts = np.flatnonzero(~close_to_black)
+                            thumb_ends = np.flatnonzero(close_to_black[thumb_starts[0]:]) + thumb_starts[0] if thumb_starts.size else thumb_starts
+                            vertical_scrollbar_y_start = new_row_click_location[1] + int(thumb_starts[0]) if thumb_starts.size else -1
+                            vertical_scrollbar_y_end = new_row_click_location[1] + int(thumb_ends[0]) if thumb_ends.size else -1
+                            vertical_scrollbar_y = int((vertical_scrollbar_y_start+vertical_scrollbar_y_end)/2)
+                            send_input(abort_event, pag.moveTo, window_origin[0] + vertical_scrollbar_x, window_origin[1] + vertical_scrollbar_y + 1)
+                            send_input(abort_event, pag.dragTo, window_origin[0] + vertical_scrollbar_x, window_origin[1] + window_size[1]-1)
+                        check_abort(abort_event)   
+
+                    # click on new row
+                    row_created_time = time.perf_counter()
+                    image = screenshot(scope='window', window_origin=window_origin, window_size=window_size, packed=True)
+                    _, (_, last_row_y), _ = find_nth_colour_band(image=image, n=3, start_position=(new_row_click_location[0], bottom_gray_y), direction=(0,-1))
+                    send_input(abort_event, pag.moveTo, window_origin[0] + left_menu_x, window_origin[1] + last_row_y)
+                    menu_region = (window_origin[0] + left_menu_x, desktop_origin[1], window_origin[0] + left_menu_x + total_menu_width, desktop_origin[1] + screen_height)
+                    menu_origin = (menu_region[0], menu_region[1])
+                    click_point = (0, window_origin[1] + last_row_y - menu_region[1])
+                    menu_levels = [('device', last_row_y), ('channel', last_row_y, plan['device']), ('controller group', last_row_y, plan['device'], plan['channel']), ('cc', last_row_y, plan['device'], plan['channel'], plan['controller_group'])]
+                    item_positions = [lambda box: plan['device_position'], lambda box: ((box[2] - box[0]) // 2, plan['channel_y']), lambda box: ((box[2] - box[0]) // 2, plan['controller_group_y']), lambda box: ((box[2] - box[0]) // 2, plan['cc_y'])]
+                    keyboard_levels = 1 if number_of_device_columns > 1 else 0
+                    mouse_levels = keyboard_levels if navigation == 'keyboard' else len(menu_levels)
+                    cached = mouse_levels > 0 and all(level in geometry_cache for level in menu_levels[:mouse_levels])
+                    image_main = None if cached or not mouse_levels else screenshot(scope='desktop', region=menu_region)
+                    send_input(abort_event, pag.click)
+                    # selection from the cache confirms itself, so the menu opening need not be waited for once trusted; keys sent by keyboard navigation alone would be lost, so it is always waited for
+                    device_menu_trusted = cached and turbo_trusts(turbo, 'device menu', row_number)
+                    turbo_skips += device_menu_trusted
+                    if not device_menu_trusted:
+                        wait_for_device_menu_to_open(grey_pixel, abort_event)
+                    check_abort(abort_event)
+
+                    # select device, channel, controller group and cc, by keyboard in keyboard navigation (except in a device menu of several columns, which is hovered over first)
+                    # or by hovering, straight from the geometry cache when all the menus have been seen from this row position
+                    if mouse_levels and cached:
+                        selected = hover_cached_menu_items(abort_event, geometry_cache, menu_levels[:mouse_levels], item_positions[:mouse_levels], click_point, menu_origin, blue_pixel, average_item_height)
+                    else:
+                        if mouse_levels:
+                            hover_menu_items(abort_event, pipeline, menu_predictions, geometry_cache, menu_levels[:mouse_levels], item_positions[:mouse_levels], click_point, menu_region, image_main, blue_pixel, average_item_height)
+                        selected = True
+                    if selected and navigation == 'keyboard':
+                        selected = select_menu_items_by_keyboard(abort_event, keyboard_menu_keys(plan['menu_keys'], keyboard_levels), menu_region, [None]*keyboard_levels + plan['menu_indices'][keyboard_levels:], blue_pixel, average_item_height, menu_padding)
+                        keyboard_failures = 0 if selected else keyboard_failures + 1
+                    if not selected:
+                        for _ in range(4):
+                            send_input(abort_event, pag.press, 'escape')
+                        send_input(abort_event, pag.moveTo, window_origin[0] + left_menu_x, window_origin[1] + last_row_y)
+                        image_main = screenshot(scope='desktop', region=menu_region)
+                        send_input(abort_event, pag.click)
+                        wait_for_device_menu_to_open(grey_pixel, abort_event)
+                        hover_menu_items(abort_event, pipeline, menu_predictions, geometry_cache, menu_levels, item_positions, click_point, menu_region, image_main, blue_pixel, average_item_height)
+                    turbo_record(turbo, 'device menu', selected)
+                    if selected and navigation == 'keyboard':
+                        send_input(abort_event, pag.press, 'enter')
+                    else:
+                        send_input(abort_event, pag.click)
+                    if keyboard_failures == KEYBOARD_NAVIGATION_MAX_FAILURES:
+                        navigation = 'mouse'
+                        keyboard_failures = 0
+                        update_callback(f'{BULLET} keyboard navigation could not be confirmed {KEYBOARD_NAVIGATION_MAX_FAILURES} rows in a row, so the menus will be hovered over from now on')
+                    check_abort(abort_event)
+
+                    # click on right menu
+                    menus_selected_time = time.perf_counter()
+                    send_input(abort_event, pag.moveTo, window_origin[0] + right_menu_x, window_origin[1] + last_row_y)
+                    send_input(abort_event, pag.click)
+                    check_abort(abort_event)
+
+                    # input destination, learning the glyphs of the typed text
+                    destination_region = (window_origin[0] + right_menu_left_x + 1, window_origin[1] + last_row_y - half_row_height, window_origin[0] + right_menu_right_x, window_origin[1] + last_row_y + half_row_height + 1)
+                    send_keystrokes(abort_event, plan['keystrokes'], destination_region, glyph_atlas)
+                    check_abort(abort_event)
+
+                    # plan the next row while this destination commits
+                    if row_number + 1 < len(data):
+                        next_plan = (row_number + 1, pipeline.submit(plan_row, data[row_number + 1], device_positions, average_item_height))
+
+                    # confirm destination, unless trusted by turbo mode, in which case it is confirmed by the next spot check (the last row is always confirmed)
+                    if previous_last_row_y is not None and not vertical_scrollbar_in_use and last_row_y != previous_last_row_y:
+                        row_pitch = last_row_y - previous_last_row_y
+                    previous_last_row_y = last_row_y
+                    if row_pitch is not None and row_number + 1 < len(data) and turbo_trusts(turbo, 'destination', row_number):
+                        unverified_rows.append((row_number, plan, rows_input))
+                        turbo_skips += 1
+                    else:
+                        wait_for_destination_text_to_appear(right_menu_x - right_menu_left_x, abort_event)
+                        destination_cell = screenshot(scope='desktop', region=destination_region)
+                        if check_destination_cell(glyph_atlas, destination_cell, plan['layers'], f'The destination in CSV row {row_number + kept_rows + 2}'):
+                            turbo_record(turbo, 'destination', True)
+                        else:
+                            # a cell the atlas cannot read yet is confirmed by the colour bands alone, so it is learnt from rather than counted towards turbo mode's streak
+                            learn_destination_cell(glyph_atlas, destination_cell, plan['layers'])
+
+                        # learn to read the row's controller cell back, for sync mode and export, until several rows in a row read back correctly (or for the first rows only, if they never do)
+                        if cell_reading_streak < CELL_READING_STREAK and row_number < CELL_LEARNING_ROWS:
+                            controller_cell = screenshot(scope='desktop', region=(window_origin[0] + left_menu_left_x + 1, destination_region[1], window_origin[0] + left_menu_right_x, destination_region[3]))
+                            if read_controller_cell(glyph_atlas, controller_cell) == (plan['device'], plan['channel'], plan['cc']):
+                                cell_reading_streak += 1
+                            else:
+                                cell_reading_streak = 0
+                                learn_controller_cell(glyph_atlas, controller_cell, (plan['device'], plan['channel'], plan['cc']))
+
+                    break
+                except VEP_MIDI_AutoMate_Error as e:
+                    if not recovery:
+                        raise
+                    error = e
+                    recoveries += 1
+                    update_callback(f'{BULLET} CSV row {row_number + kept_rows + 2} failed ({e}), {"trying again" if attempt + 1 < attempts else "skipping it"}')
+                    previous_last_row_y = attempt_previous_last_row_y
+                    recover_row(abort_event, row_created, window_origin, window_size, new_row_click_location, bottom_gray_y, x_start)
+                    check_abort(abort_event)
             else:
-                pag.press('enter')
-                check_abort(abort_event)
-
-            wait_for_destination_text_to_appear(right_menu_x - right_menu_left_x)
+                rejected_rows.append((row_number + kept_rows + 2, data[row_number], str(error)))
+                send_progress('rejected', row=row_number + 1, rows=len(data), csv_row=row_number + kept_rows + 2, error=str(error))
+                continue
+
+            # spot check the destinations turbo mode did not confirm, every TURBO_SPOT_CHECK_ROWS rows, at the end, and before they could scroll out of sight
+            if unverified_rows and (row_number % TURBO_SPOT_CHECK_ROWS == 0 or row_number + 1 == len(data) or len(unverified_rows) + 1 >= (last_row_y - first_row_y) // row_pitch):
+                spot_check_unverified_rows(last_row_y, rows_input)
+            rows_input += 1
+            row_end_time = time.perf_counter()
+            row_times.append(row_end_time - row_start_time)
+            menu_times.append(menus_selected_time - row_created_time)
+            rows_done_elapsed_time = time.time() - start_time
+            send_progress('row', row=row_number + 1, rows=len(data), csv_row=row_number + kept_rows + 2, elapsed=round(rows_done_elapsed_time, 3), eta=round(rows_done_elapsed_time / (row_number + 1) * (len(data) - row_number - 1), 3), phases={'create_row': round(row_created_time - row_start_time, 3), 'menus': round(menus_selected_time - row_created_time, 3), 'destination': round(row_end_time - menus_selected_time, 3)})
+
+        # spot check any destinations left unconfirmed because the last row was skipped
+        if unverified_rows:
+            spot_check_unverified_rows(find_last_row_y(screenshot(scope='window', window_origin=window_origin, window_size=window_size, packed=True), new_row_click_location, bottom_gray_y), rows_input - 1)
 
         if len(data) > 0:
+            elapsed_time = time.time() - start_time
             update_callback(f'Total time = {datetime.timedelta(seconds = int(elapsed_time))}.')
-            update_callback(f'Average time per row ≈ {round(elapsed_time/len(data), 2)} seconds.')
-            update_callback(f'All done.')
+            update_callback(f'Throughput ≈ {round(60*rows_input/elapsed_time, 1) if elapsed_time > 0 else 0} rows per minute, including time spent recovering from failed rows.')
+            if recovery:
+                update_callback(f'Input {rows_input} of {len(data)} rows, recovering from {recoveries} failed attempts and skipping {len(rejected_rows)} rows.')
+            if row_times:
+                update_callback(f'Average time per row ≈ {round(elapsed_time/rows_input, 2)} seconds.')
+                update_callback(f'Row time jitter (standard deviation) ≈ {round(statistics.pstdev(row_times), 3)} seconds.')
+                update_callback(f'Average time selecting device, channel, controller and cc per row ({navigation} navigation) ≈ {round(statistics.mean(menu_times), 2)} seconds.')
+            if turbo is not None:
+                update_callback(f'Turbo mode skipped {turbo_skips} waits and input {turbo_repairs} destinations again after spot checks.')
+            update_callback('All done.' if not rejected_rows else 'Done, except for the skipped rows.')
+            send_progress('done', rows=len(data), rows_input=rows_input, elapsed=round(elapsed_time, 3), throughput=round(60*rows_input/elapsed_time, 2) if elapsed_time > 0 else 0, **({'row_time_mean': round(statistics.mean(row_times), 3), 'row_time_jitter': round(statistics.pstdev(row_times), 3), 'menu_time_mean': round(statistics.mean(menu_times), 3)} if row_times else {}), navigation=navigation, **({'recoveries': recoveries, 'rejected': len(rejected_rows)} if recovery else {}), **({'turbo_skips': turbo_skips, 'turbo_repairs': turbo_repairs} if turbo is not None else {}))
+        elif kept_rows:
+            update_callback('All rows were already in VEP.')
+            send_progress('done', rows=0, elapsed=0)
         else:
             update_callback(f'No rows found in the CSV.')
+            send_progress('done', rows=0, elapsed=0)
+
+        # record the rows now in VEP, for the next run in sync mode, and what was learnt about VEP's text
+        save_glyph_atlas(glyph_atlas)
+        rejected_csv_rows = {csv_row for csv_row, _, _ in rejected_rows}
+        save_ledger(window.title, {'rows': ledger_rows([datum for csv_row, datum in enumerate(all_data, start=2) if csv_row not in rejected_csv_rows], required_headers), 'empty_table_bands': empty_table_bands, 'bands_per_row': bands_per_row, 'scrolled': vertical_scrollbar_in_use, 'window_size': list(window_size)})
 
     finally:
+        stop_recording()
+        if rejected_rows:
+            write_rejects(rejects_path(path), rejected_rows, required_headers)
+            update_callback(f'{len(rejected_rows)} rows could not be input and have been written to {rejects_path(path)}, to fix and input on their own.')
+        if pipeline is not None:
+            pipeline.shutdown(wait=False, cancel_futures=True)
         if original_nice is not None:
             try:
                 p.nice(original_nice)
             except Exception:
                 pass
+
+def find_scroll_offset(image_before, image_after):
+    # finds how many pixels the content of image_before has moved up in image_after (0 if it has not moved), or None if it cannot be matched
+    width, height = image_before.size
+    rows_before = [row.tobytes() for row in np.frombuffer(image_before.tobytes(), dtype=np.uint8).reshape(height, width * 3)]
+    rows_after = [row.tobytes() for row in np.frombuffer(image_after.tobytes(), dtype=np.uint8).reshape(height, width * 3)]
+    for offset in range(height):
+        if rows_before[offset:] == rows_after[:height - offset]:
+            return offset
+    return None
+
+def export_table(path, abort_event, update_callback, required_headers, BULLET, progress_callback=None, abort_time=None):
+    # reads every row of the MIDI Controllers table back from the screen, scrolling as needed, and writes them to a CSV at path
+    # rows are read with the glyph atlas learnt by earlier runs, failing up front if it cannot read the first row; anything else that cannot be read is written as '?', and repeat is always left blank
+
+    def send_progress(event, **details):
+        # sends a machine-readable progress event
+        if progress_callback is not None:
+            progress_callback({'event': event, **details})
+
+    # auto gui settings
+    pag.FAILSAFE = True
+    pag.PAUSE = 0
+    input_state['pause'] = 0.03
+    input_state['abort_time'] = abort_time
+    input_state['last_input_time'] = None
+    glyph_atlas = load_glyph_atlas()
+    check_abort(abort_event)
+
+    # find, maximise and tidy the VEP window, and select MIDI Controllers
+    window, window_type, desktop_origin, window_origin, window_size, _ = prepare_vep(abort_event, update_callback, BULLET)
+
+    # locate the first row and the cells within it
+    update_callback(f'{BULLET} reading rows')
+    image = screenshot(scope='window', window_origin=window_origin, window_size=window_size)
+    rows = {}
+    new_row_click_location = find_new_row_button(image, window_type)
+    (_, first_row_top_y), _, _ = find_nth_colour_band(image=image, n=4, start_position=new_row_click_location, direction=(0,1))
+    _, _, (left_cell_left_x, _) = find_nth_colour_band(image=image, n=0, start_position=(new_row_click_location[0], first_row_top_y), direction=(-1,0))
+    _, _, (left_cell_right_x, _) = find_nth_colour_band(image=image, n=0, start_position=(new_row_click_location[0], first_row_top_y), direction=(1,0))
+    (right_cell_left_x, _), _, (right_cell_right_x, _) = find_nth_colour_band(image=image, n=4, start_position=(new_row_click_location[0], first_row_top_y), direction=(1,0))
+    _, _, (_, bottom_gray_y) = find_nth_colour_band(image=image, n=0, start_position=(window_size[0]-1, window_size[1]-1), direction=(0,-1))
+    probe_x = left_cell_left_x + 1 # inside the controller cell, left of any text
+    _, _, (_, first_row_bottom_y) = find_nth_colour_band(image=image, n=0, start_position=(probe_x, first_row_top_y), direction=(0,1))
+    row_height = first_row_bottom_y - first_row_top_y + 1
+    (_, second_row_top_y), _, (_, second_row_bottom_y) = find_nth_colour_band(image=image, n=2, start_position=(probe_x, first_row_top_y), direction=(0,1))
+    row_colours = {image.getpixel((probe_x, first_row_top_y + row_height // 2))}
+    if second_row_bottom_y - second_row_top_y + 1 == row_height:
+        row_pitch = second_row_top_y - first_row_top_y
+        row_colours.add(image.getpixel((probe_x, second_row_top_y + row_height // 2)))
+    else:
+        row_pitch = row_height + 1
+    if row_height * 4 < bottom_gray_y - first_row_top_y: # an empty table shows a single tall band where the first row would be
+        table_region = (window_origin[0] + left_cell_left_x, window_origin[1] + first_row_top_y, window_origin[0] + right_cell_right_x + 1, window_origin[1] + bottom_gray_y)
+        check_abort(abort_event)
+
+        def row_at(image, y_top):
+            # whether a row starts at y_top, judged by the colour and height of its controller cell
+            _, _, (_, y_bottom) = find_nth_colour_band(image=image, n=0, start_position=(probe_x, y_top), direction=(0,1))
+            return image.getpixel((probe_x, y_top + row_height // 2)) in row_colours and y_bottom - y_top + 1 == row_height
+
+        def read_row(y_top):
+            # reads the controller and destination cells of the row starting at y_top, each None if it cannot be read
+            controller_cell = screenshot(scope='desktop', region=(window_origin[0] + left_cell_left_x + 1, window_origin[1] + y_top, window_origin[0] + left_cell_right_x, window_origin[1] + y_top + row_height))
+            destination_cell = screenshot(scope='desktop', region=(window_origin[0] + right_cell_left_x + 1, window_origin[1] + y_top, window_origin[0] + right_cell_right_x, window_origin[1] + y_top + row_height))
+            return (read_controller_cell(glyph_atlas, controller_cell), read_destination_cell(glyph_atlas, destination_cell))
+
+        # rather than write a CSV full of '?', fail if the atlas cannot read the first row
+        if None in read_row(first_row_top_y):
+            raise VEP_MIDI_AutoMate_Error('The first row of VEP\'s MIDI Controllers table cannot be read yet. VEP MIDI AutoMate learns to read VEP\'s text while inputting a CSV, so input a CSV that uses the same names at least once, then export again.')
+
+        # read every whole row in view, then scroll down by the distance the table actually moves, until a row slot is empty or the table stops moving
+        offset = 0
+        while True:
+            image = screenshot(scope='window', window_origin=window_origin, window_size=window_size)
+            row_index = -(-offset // row_pitch)
+            end_of_table = False
+            while first_row_top_y + row_index * row_pitch - offset + row_height <= bottom_gray_y:
+                y_top = first_row_top_y + row_index * row_pitch - offset
+                if not row_at(image, y_top):
+                    end_of_table = True
+                    break
+                if row_index not in rows:
+                    rows[row_index] = read_row(y_top)
+                    send_progress('row', row=row_index + 1, csv_row=row_index + 2)
+                row_index += 1
+            check_abort(abort_event)
+            if end_of_table:
+                break
+            send_input(abort_event, pag.moveTo, (table_region[0] + table_region[2]) // 2, (table_region[1] + table_region[3]) // 2)
+            image_before = screenshot(scope='desktop', region=table_region)
+            send_input(abort_event, pag.scroll, -3)
+            shift = find_scroll_offset(image_before, wait_for_region_to_settle(table_region, image_before, abort_event))
+            if not shift:
+                break
+            offset += shift
+
+    # write the CSV
+    unreadable = []
+    with path.open('w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(required_headers)
+        for row_index in sorted(rows):
+            controller, layers = rows[row_index]
+            if controller is None or layers is None or len(layers) > 4:
+                unreadable.append(row_index + 2)
+            values = dict(zip(['device', 'channel', 'cc'], [str(number) for number in controller] if controller is not None else ['?'] * 3))
+            values.update(zip(['layer 1', 'layer 2', 'layer 3', 'layer 4'], (layers + [''] * 4)[:4] if layers is not None and len(layers) <= 4 else ['?'] * 4))
+            writer.writerow([values.get(header, '') for header in required_headers])
+    update_callback(f'Exported {len(rows)} rows to {path}. The repeat column cannot be read from VEP, so it has been left blank.')
+    if unreadable:
+        update_callback(f'Some rows could not be read and contain \'?\': CSV rows {", ".join(map(str, unreadable))}. Inputting a CSV that uses the same names teaches VEP MIDI AutoMate to read them.')
+    send_progress('done', rows=len(rows), unreadable=unreadable)
@@ -0,0 +1,27 @@
+###
+# VEP MIDI AutoMate 1.0.0 engine.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+import core
+
+def run_engine(path, abort_event, abort_time, slow_mode, messages, required_headers, BULLET, record_path=None, navigation='mouse', turbo_mode=False, sync=False, recovery=False):
+    # runs core.go in a process of its own, reporting back on the messages queue with
+    # ('log', text) and ('progress', details) while running, then ('finished', 'done' | 'aborted' | 'error', text)
+    try:
+        core.go(path, abort_event, slow_mode, lambda update: messages.put(('log', update)), required_headers, BULLET, progress_callback=lambda details: messages.put(('progress', details)), abort_time=abort_time, record_path=record_path, navigation=navigation, turbo_mode=turbo_mode, sync=sync, recovery=recovery)
+        messages.put(('finished', 'done', ''))
+    except core.VEP_MIDI_AutoMate_Abort as e:
+        messages.put(('finished', 'aborted', str(e)))
+    except Exception as e:
+        messages.put(('finished', 'error', str(e)))
+
+def run_export(path, abort_event, abort_time, messages, required_headers, BULLET):
+    # runs core.export_table in a process of its own, reporting back on the messages queue as run_engine does
+    try:
+        core.export_table(path, abort_event, lambda update: messages.put(('log', update)), required_headers, BULLET, progress_callback=lambda details: messages.put(('progress', details)), abort_time=abort_time)
+        messages.put(('finished', 'done', ''))
+    except core.VEP_MIDI_AutoMate_Abort as e:
+        messages.put(('finished', 'aborted', str(e)))
+    except Exception as e:
+        messages.put(('finished', 'error', str(e)))
@@ -3,25 +3,26 @@
 # https://github.com/robertrussell22/VEP-MIDI-AutoMate
 ###
 
-import json, os, threading, keyboard, queue, webbrowser, csv, core
+import json, sys, time, queue, core, engine, preview
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from pathlib import Path
-from functools import partial
 
 APP_NAME = 'VEP MIDI AutoMate'
 VERSION = '1.0.0'
-REQUIRED_HEADERS = ['device', 'channel', 'cc', 'layer 1', 'layer 2', 'layer 3', 'layer 4', 'repeat']
+REQUIRED_HEADERS = core.REQUIRED_HEADERS
 ABORT_HOTKEY = 'ctrl+f12'
 ABORT_HOTKEY_STRING = 'Ctrl + F12'
+PROBLEMS_SHOWN = 10
 
-if os.name == 'nt':
-    _base = Path(os.getenv('APPDATA', Path.home()))
-else:
-    _base = Path(os.getenv('XDG_CONFIG_HOME', Path.home() / '.config'))
-CONFIG_DIR = _base / APP_NAME
+CONFIG_DIR = core.CONFIG_DIR
 CONFIG_FILE = CONFIG_DIR / 'settings.json'
 
+STARTUP_TIME = time.perf_counter()
+keyboard = core.Lazy_Module('keyboard')
+webbrowser = core.Lazy_Module('webbrowser')
+multiprocessing = core.Lazy_Module('multiprocessing')
+
 PALETTES = {
     'light': {
         'background': '#FFFFFF',
@@ -58,21 +59,18 @@ PALETTES = {
 def load_settings():
     try:
         json_data = json.loads(CONFIG_FILE.read_text(encoding='utf-8'))
-        return {'csv_path': json_data.get('csv_path', ''), 'slow_mode': bool(json_data.get('slow_mode', False)), 'theme': json_data.get('theme', 'light')}
+        return {'csv_path': json_data.get('csv_path', ''), 'slow_mode': bool(json_data.get('slow_mode', False)), 'turbo_mode': bool(json_data.get('turbo_mode', False)), 'sync': bool(json_data.get('sync', False)), 'skip_failed_rows': bool(json_data.get('skip_failed_rows', False)), 'record_session': bool(json_data.get('record_session', False)), 'navigation': 'keyboard' if json_data.get('navigation') == 'keyboard' else 'mouse', 'theme': json_data.get('theme', 'light')}
     except Exception:
-        return {'csv_path': '', 'slow_mode': False, 'theme': detect_system_theme()}
+        return {'csv_path': '', 'slow_mode': False, 'turbo_mode': False, 'sync': False, 'skip_failed_rows': False, 'record_session': False, 'navigation': 'mouse', 'theme': detect_system_theme()}
 
-def save_settings(csv_path, slow_mode, theme):
+def save_settings(csv_path, slow_mode, turbo_mode, sync, skip_failed_rows, record_session, navigation, theme):
     try:
         CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        settings = {'csv_path': str(csv_path or ''), 'slow_mode': bool(slow_mode), 'theme': str(theme)}
+        settings = {'csv_path': str(csv_path or ''), 'slow_mode': bool(slow_mode), 'turbo_mode': bool(turbo_mode), 'sync': bool(sync), 'skip_failed_rows': bool(skip_failed_rows), 'record_session': bool(record_session), 'navigation': str(navigation), 'theme': str(theme)}
         CONFIG_FILE.write_text(json.dumps(settings, indent=2), encoding='utf-8')
     except Exception:
         pass
 
-def UI(function, *args, **kw):
-    root.after(0, partial(function, *args, **kw))
-
 def detect_system_theme():
     try:
         import winreg
@@ -103,12 +101,14 @@ def apply_theme(theme_string):
     csv_path_label.configure(bg=palette['background'], fg=palette['foreground'])
     entry_box.configure(bg=palette['entry_background'], fg=palette['entry_foreground'], insertbackground=palette['foreground'], selectbackground=palette['accent'], selectforeground='#ffffff', highlightbackground=palette['background'], highlightcolor=palette['accent'])
     button_browse.configure(bg=palette['button_background'], fg=palette['button_foreground'], activebackground=palette['button_background'])
+    button_preview.configure(bg=palette['button_background'], fg=palette['button_foreground'], activebackground=palette['button_background'])
     button_start.configure(bg=palette['accent'], fg=palette['button_background'], activebackground=palette['accent'])
+    button_export.configure(bg=palette['button_background'], fg=palette['button_foreground'], activebackground=palette['button_background'])
 
     csv_status.configure(bg=palette['background'])
 
     modes_row.configure(bg=palette['background'])
-    for button in [slow_mode_button, radio_button_light_mode, radio_button_dark_mode]:
+    for button in [slow_mode_button, turbo_mode_button, sync_button, skip_failed_rows_button, keyboard_navigation_button, record_session_button, radio_button_light_mode, radio_button_dark_mode]:
         button.configure(bg=palette['background'], fg=palette['foreground'], selectcolor=palette['background'])
 
     logging_frame.configure(bg=palette['background'])
@@ -118,59 +118,27 @@ def apply_theme(theme_string):
 
     _hover_off(None)
 
+    preview.apply_palette(palette)
+
 def pick_csv():
     path = filedialog.askopenfilename(title='Choose your CSV', filetypes=[('CSV files', '*.csv'), ('All files', '*.*')])
     if path:
         csv_path_string.set(path)
 
 def find_csv_problems():
+    return core.find_csv_problems(csv_path_string.get().strip(), REQUIRED_HEADERS)
+
+def show_preview(e = None):
+    # shows the CSV as a table with its problems highlighted
     path = csv_path_string.get().strip()
-    problems = []
-    try:
-        f = Path(path).open('r', encoding='utf-8-sig', newline='')    
-    except Exception as e:
-        problems.append(f'Could not read CSV: {e}')
-        return problems
-    
-    valid_integers_string = {
-        'device': '{1, 2, 3, …}',
-        'channel': '{1, 2, 3, …, 16}',
-        'cc': '{0, 1, 2, …, 127}'
-    }
+    if not path or not Path(path).exists():
+        messagebox.showerror(APP_NAME, 'Please choose a valid CSV file.')
+        return
+    preview.open_preview(root, path, REQUIRED_HEADERS, PALETTES[theme.get()], f'{APP_NAME} - {Path(path).name}')
 
-    with f:
-        reader = csv.DictReader(f, skipinitialspace=True)
-        if reader.fieldnames is None:
-            problems.append(f'No header row found. The first row must contain {", ".join(REQUIRED_HEADERS)}.')
-            return problems
-        missing_headers = [header for header in REQUIRED_HEADERS if header not in reader.fieldnames]
-        if missing_headers:
-            problems.append(f'Missing some headings: {", ".join(missing_headers)}.')
-        for row_number, row in enumerate(reader, start=2):
-            row = {key : (value.strip() if isinstance(value, str) else value) for key, value in row.items()}
-            for header in ['device', 'channel', 'cc', 'layer 1', 'layer 2']:
-                if not row.get(header, ''):
-                    problems.append(f'Missing an entry in row {row_number}: \'{header}\'.')
-            if row.get('layer 3') and not row.get('layer 2'):
-                problems.append(f'Row {row_number} (device={row.get("device")},channel={row.get("channel")},cc={row.get("cc")}): Cannot have \'layer 3\' without \'layer 2\'.')
-            if row.get('layer 4') and not row.get('layer 3'):
-                problems.append(f'Row {row_number} (device={row.get("device")},channel={row.get("channel")},cc={row.get("cc")}): Cannot have \'layer 4\' without \'layer 3\'.')
-            if row.get('repeat') and not (row.get('layer 3') or row.get('layer 4')):
-                problems.append(f'Row {row_number} (device={row.get("device")},channel={row.get("channel")},cc={row.get("cc")}): Must have \'layer 3\' or \'layer 4\' to have \'repeat\'.')
-            for header in ['device', 'channel', 'cc']:
-                value_string = (row.get(header, '') or '').strip()
-                if not value_string.isdecimal():
-                    problems.append(f'Row {row_number} (device={row.get("device")},channel={row.get("channel")},cc={row.get("cc")}): Must have an integer for \'{header}\'.')
-                    continue
-                value = int(value_string)
-                if header == 'device' and value < 1 or header == 'channel' and value not in range(1, 17) or header == 'cc' and value not in range(0, 128):
-                    problems.append(f'Row {row_number} (device={row.get("device")},channel={row.get("channel")},cc={row.get("cc")}): Must have an integer from {valid_integers_string[header]} for \'{header}\'.')
-            value_string = (row.get('repeat', '') or '').strip()
-            if value_string:
-                if not value_string.isdecimal() or int(value_string) < 1:
-                    problems.append(f'Row {row_number} (device={row.get("device")},channel={row.get("channel")},cc={row.get("cc")}): Must be blank or have an integer (1, 2, 3, …) for \'repeat\'.')
-
-    return problems
+def summarise_problems(problems):
+    # lists the first few problems, so that a CSV with thousands of them still fits in a dialog
+    return '\n'.join(problems[:PROBLEMS_SHOWN]) + (f'\n… and {len(problems) - PROBLEMS_SHOWN} more, shown in the preview.' if len(problems) > PROBLEMS_SHOWN else '')
 
 def update_csv_status():
     path = csv_path_string.get().strip()
@@ -186,16 +154,17 @@ def update_csv_status():
     
     problems = find_csv_problems()
     if problems:
-        csv_status.config(text=f'CSV has problems ({len(problems)}). Click for details…', fg=palette['warning'], cursor='hand2')
-        def show_problems(e = None):
-            messagebox.showerror(APP_NAME, 'CSV problems. Reported row number includes heading row.\n\n' + '\n'.join(problems))
+        csv_status.config(text=f'CSV has problems ({len(problems)}). Click to see them…', fg=palette['warning'], cursor='hand2')
         csv_status.unbind('<Button-1>')
-        csv_status.bind('<Button-1>', show_problems)
+        csv_status.bind('<Button-1>', show_preview)
     else:
         csv_status.config(text='CSV looks good ✓', fg=palette['okay'], cursor='')
         csv_status.unbind('<Button-1>')
 
-updates = queue.Queue()
+engine_process = None
+engine_messages = None
+abort_event = None
+hotkey_handle = None
 
 def append_log(message):
     logging_box.configure(state='normal')
@@ -203,38 +172,74 @@ def append_log(message):
     logging_box.see('end')
     logging_box.configure(state='disabled')
 
+def show_progress(details):
+    # shows the row the engine has reached in the window title, which stays in sight on the taskbar while VEP is in front
+    if details['event'] == 'row':
+        root.title(f'{APP_NAME} {VERSION} - row {details["row"]}' + (f' of {details["rows"]}' if 'rows' in details else ''))
+
+def reap_engine(process):
+    # joins a finished engine process once it has exited, checking back from the Tk loop rather than blocking it
+    if process.is_alive():
+        root.after(80, reap_engine, process)
+    else:
+        process.join()
+
+def finish_engine(outcome, message):
+    global engine_process, engine_messages, hotkey_handle
+    root.title(f'{APP_NAME} {VERSION}')
+    if outcome == 'aborted':
+        append_log(message)
+    elif outcome == 'error':
+        append_log(f'Error: {message}')
+        messagebox.showerror(APP_NAME, message)
+    if hotkey_handle is not None:
+        try:
+            keyboard.remove_hotkey(hotkey_handle)
+        except Exception:
+            pass
+        hotkey_handle = None
+    reap_engine(engine_process)
+    engine_process = None
+    engine_messages = None
+    button_start.config(state='normal')
+    button_browse.config(state='normal')
+    button_export.config(state='normal')
+
 def pump_updates():
-    try:
-        while True:
-            update = updates.get_nowait()
-            append_log(update)
-    except queue.Empty:
-        pass
+    # passes messages from the engine process to the log
+    if engine_messages is not None:
+        try:
+            while True:
+                message = engine_messages.get(timeout=0.1) if not engine_process.is_alive() else engine_messages.get_nowait()
+                if message[0] == 'log':
+                    append_log(message[1])
+                elif message[0] == 'progress':
+                    show_progress(message[1])
+                elif message[0] == 'finished':
+                    finish_engine(message[1], message[2])
+                    break
+        except queue.Empty:
+            if not engine_process.is_alive():
+                finish_engine('error', f'The automation stopped unexpectedly (exit code {engine_process.exitcode}).')
     root.after(80, pump_updates)
 
-def run_worker(path, abort_event, slow_mode, update_callback, headers, hotkey_handle, BULLET):
+def listen_for_abort():
+    # creates a fresh abort event and time, and listens for the abort hotkey to set them
+    global abort_event, hotkey_handle
+    abort_event = multiprocessing.Event()
+    abort_time = multiprocessing.Value('d', 0.0)
+    def abort():
+        if not abort_event.is_set():
+            core.request_abort(abort_event, abort_time)
     try:
-        UI(append_log, f'Starting{" in slow mode" if slow_mode else ""}. Press \'{ABORT_HOTKEY_STRING}\' to abort at any time.')
-        root.update()
-        root.update_idletasks()
-        core.go(path, abort_event, slow_mode, update_callback, headers, BULLET)
-    except core.VEP_MIDI_AutoMate_Abort as e:
-        UI(append_log, str(e))
-    except Exception as e:
-        UI(append_log, f'Error: {e}')
-        UI(messagebox.showerror, APP_NAME, str(e))
-    finally:
-        if hotkey_handle is not None:
-            try:
-                keyboard.remove_hotkey(hotkey_handle)
-            except Exception:
-                pass
-        UI(button_start.config, state='normal')
-        UI(button_browse.config, state='normal')
+        hotkey_handle = keyboard.add_hotkey(ABORT_HOTKEY, abort)
+    except Exception:
+        append_log('Manually aborting failed. Close the window to stop.')
+        hotkey_handle = None
+    return abort_time
 
 def start():
-    hotkey_handle = None
-    abort_event.clear()
+    global engine_process, engine_messages
     path = Path(csv_path_string.get().strip())
     if not path.exists():
         messagebox.showerror(APP_NAME, 'Please choose a valid CSV file.')
@@ -242,214 +247,268 @@ def start():
     
     problems = find_csv_problems()
     if problems:
-        messagebox.showerror(APP_NAME, 'Please fix the CSV before continuing.\n\n' + '\n'.join(problems))
+        messagebox.showerror(APP_NAME, 'Please fix the CSV before continuing. Reported row numbers include the heading row.\n\n' + summarise_problems(problems))
+        show_preview()
         return
 
-    def abort():
-        if not abort_event.is_set():
-            abort_event.set()
-    try:
-        hotkey_handle = keyboard.add_hotkey(ABORT_HOTKEY, abort)
-    except Exception:
-        UI(append_log, 'Manually aborting failed. Close the window to stop.')
-        hotkey_handle = None
+    abort_time = listen_for_abort()
 
-    if not path.exists():
-        messagebox.showerror(APP_NAME, 'Please choose a valid CSV file.')
+    save_settings(path, slow_mode.get(), turbo_mode.get(), sync.get(), skip_failed_rows.get(), record_session.get(), navigation.get(), theme.get())
+    button_start.config(state='disabled')
+    button_browse.config(state='disabled')
+    button_export.config(state='disabled')
+    append_log(f'Starting{" in slow mode" if slow_mode.get() else " in turbo mode" if turbo_mode.get() else ""}. Press \'{ABORT_HOTKEY_STRING}\' to abort at any time.')
+
+    # the engine runs in its own process so that the GUI never competes with it for the GIL
+    record_path = core.recording_path(path) if record_session.get() else None
+    engine_messages = multiprocessing.Queue()
+    engine_process = multiprocessing.Process(target=engine.run_engine, args=(path, abort_event, abort_time, slow_mode.get(), engine_messages, REQUIRED_HEADERS, BULLET, record_path, navigation.get(), turbo_mode.get(), sync.get(), skip_failed_rows.get()), daemon=True)
+    engine_process.start()
+
+def export():
+    # reads the VEP table back into a CSV of the user's choice
+    global engine_process, engine_messages
+    path = filedialog.asksaveasfilename(title='Export VEP\'s MIDI Controllers to', defaultextension='.csv', filetypes=[('CSV files', '*.csv'), ('All files', '*.*')])
+    if not path:
         return
-    save_settings(path, slow_mode.get(), theme.get())
+    path = Path(path)
+    abort_time = listen_for_abort()
     button_start.config(state='disabled')
     button_browse.config(state='disabled')
-
-    def update_callback(update: str):
-        updates.put(update)
-
-    threading.Thread(target=run_worker, args=(path, abort_event, slow_mode.get(), update_callback, REQUIRED_HEADERS, hotkey_handle, BULLET), daemon=True).start()
+    button_export.config(state='disabled')
+    append_log(f'Exporting to {path}. Press \'{ABORT_HOTKEY_STRING}\' to abort at any time.')
+    engine_messages = multiprocessing.Queue()
+    engine_process = multiprocessing.Process(target=engine.run_export, args=(path, abort_event, abort_time, engine_messages, REQUIRED_HEADERS, BULLET), daemon=True)
+    engine_process.start()
 
 def on_close():
-    abort_event.set()
+    if abort_event is not None:
+        abort_event.set()
     path = Path(csv_path_string.get().strip())
     try:
-        save_settings(path, slow_mode.get(), theme.get())
-        keyboard.unhook_all_hotkeys()
+        save_settings(path, slow_mode.get(), turbo_mode.get(), sync.get(), skip_failed_rows.get(), record_session.get(), navigation.get(), theme.get())
+        if 'keyboard' in sys.modules:
+            keyboard.unhook_all_hotkeys()
     except Exception:
         pass
+    if engine_process is not None:
+        engine_process.join(timeout=1)
+        if engine_process.is_alive():
+            engine_process.terminate()
     root.destroy()
 
-root = tk.Tk()
-root.geometry('1100x900')
-root.minsize(410, 230)
-root.title(f'{APP_NAME} {VERSION}')
-
-APP_DIR = Path(__file__).parent
-icon_png_path = APP_DIR / 'icon.png'
-try:
-    if icon_png_path.exists():
-        icon_image = tk.PhotoImage(file=str(icon_png_path))
-        root.iconphoto(True, icon_image)
-except Exception:
-    pass
-import tkinter.font as tkfont
-
-default_font = tkfont.nametofont('TkDefaultFont')
-default_font.configure(family='Segoe UI', size=10)
-root.option_add('*Font', default_font)
-output_font = tkfont.nametofont('TkFixedFont')
-output_font.configure(size=10)
-
-container = tk.Frame(root)
-container.pack(fill='both', expand=True)
-
-canvas = tk.Canvas(container, highlightthickness=0, bd=0)
-vertical_scroll_global = tk.Scrollbar(container, orient='vertical', command=canvas.yview)
-canvas.configure(yscrollcommand=vertical_scroll_global.set)
-
-canvas.pack(side='left', fill='both', expand=True)
-vertical_scroll_global.pack(side='right', fill='y')
-
-scroll_frame = tk.Frame(canvas)
-scroll_frame.grid_rowconfigure(0, weight=1)
-scroll_frame.grid_columnconfigure(0, weight=1)
-frame_id = canvas.create_window((0,0), window=scroll_frame, anchor='nw')
-
-def _update_scroll_region(_event=None):
-    canvas.configure(scrollregion=canvas.bbox('all'))
-def _on_canvas_config(event):
-    canvas.itemconfig(frame_id, width=event.width)
-    required_height = scroll_frame.winfo_reqheight()
-    if event.height > required_height:
-        canvas.itemconfig(frame_id, height=event.height)
-    else:
-        canvas.itemconfig(frame_id, height=0)
-    canvas.configure(scrollregion=canvas.bbox('all'))
-scroll_frame.bind('<Configure>', _update_scroll_region)
-canvas.bind('<Configure>', _on_canvas_config)
-
-wrapper = tk.Frame(scroll_frame, padx=12, pady=12)
-wrapper.rowconfigure(7, weight=1)
-wrapper.columnconfigure(0, weight=1)
-wrapper.grid(row=0, column=0, sticky='nsew')
-
-settings = load_settings()
-
-theme = tk.StringVar(value=settings['theme'])
-
-BULLET = '▸'
-instructions_text = (
-    'VEP MIDI AutoMate will read a CSV file and automatically create MIDI Automation rows in Vienna Ensemble Pro 7 (VEP).\n\n'
-    'What you need to do:\n'
-    f' {BULLET} Open VEP with your target instance active on a screen with scaling set to 100%.\n'
-    f' {BULLET} Choose your CSV file below.\n'
-    f' {BULLET} Click "Let\'s AutoMate ▶" and do not touch your mouse or keyboard, except to press \'{ABORT_HOTKEY_STRING}\' to abort at any time.\n\n'
-    'What ' + APP_NAME + ' will do:\n'
-    + APP_NAME + ' will take control of your mouse and keyboard and use screenshots to transfer the MIDI automation stored in your CSV file using the following algorithm.\n'
-    f' {BULLET} import CSV file\n'
-    f' {BULLET} find VEP window, maximise, bring to front, check for active instance, reset layout, maximise \'MIDI Controllers\' section \n'
-    f' {BULLET} delete all current MIDI automation rows\n'
-    f' {BULLET} investigate general layout and menu positions\n'
-    f' {BULLET} for each item in your CSV file\n'
-    f'    {BULLET} create new row in the \'MIDI Controllers\' section, scrolling down if needed\n'
-    f'    {BULLET} select device, channel, cc\n'
-    f'    {BULLET} input destination items\n\n'
-    'Advice:\n'
-    f' {BULLET} You can watch a video walkthrough on GitHub.\n'
-    f' {BULLET} Open VEP on a screen that is unlikely to see pop-ups, which may disrupt the automation.\n'
-    f' {BULLET} {APP_NAME} is designed to work as quickly as possible, so use \'slow mode\' if you want to watch more carefully.\n'
-    f' {BULLET} {APP_NAME} operates fastest when it is on a separate monitor to VEP.\n'
-    f' {BULLET} Use the provided example.csv as a template for your CSV file; it has the necessary column headings.\n'
-    f' {BULLET} If {APP_NAME} fails, it is most likely that something in your CSV file is not spelt correctly.\n'
-    f' {BULLET} Avoid mixer channel names that are likely to collide with plugin names or parameters, this might lead to confusion during the destination input stage.\n'
-    f' {BULLET} Report issues or share feedback on GitHub.'
-    )
-
-instructions = tk.Label(wrapper, text=instructions_text, justify='left', anchor='w', wraplength=1)
-instructions.grid(row=0, column=0, columnspan=3, sticky='we', pady=(0,8))
-def _sync_wrap(event):
-    instructions.configure(wraplength=event.width)
-instructions.bind('<Configure>', _sync_wrap)
-
-github_link = tk.Label(wrapper, text='Open GitHub for documentation, tips, and updates.', font=('TkDefaultFont', 9, 'underline'), fg=PALETTES[theme.get()]['link'], cursor='hand2')
-github_link.grid(row=1, column=0, sticky='w')
-def _hover_on(event):
-    palette = PALETTES[theme.get()]
-    github_link.config(fg=palette['accent'], cursor='hand2')
-def _hover_off(event):
-    palette = PALETTES[theme.get()]
-    github_link.config(fg=palette['link'], cursor='arrow')
-github_link.bind('<Enter>', _hover_on)
-github_link.bind('<Leave>', _hover_off)
-def open_github(event):
-    github_url = 'https://github.com/robertrussell22/VEP-MIDI-AutoMate'
-    try:
-        webbrowser.open_new(github_url)
-    except Exception as e:
-        messagebox.showerror(APP_NAME, f'Could not open browser: {e}. Please navigate to {github_url}.')
-github_link.bind('<Button-1>', open_github)
-
-def theme_toggle():
-    apply_theme(theme.get())
-    update_csv_status()
-    save_settings(csv_path_string.get(), slow_mode.get(), theme.get())
-
-separator = ttk.Separator(wrapper, orient='horizontal')
-separator.grid(row=2, column=0, columnspan=3, sticky='ew', pady=(6,10))
-
-csv_row = tk.Frame(wrapper)
-csv_row.grid(row=3, column=0, columnspan=3, sticky='we')
-csv_row.columnconfigure(0, weight=1)
-
-csv_path_label = tk.Label(csv_row, text='CSV file')
-csv_path_label.pack(side='left')
-
-csv_path_string = tk.StringVar(value=settings['csv_path'])
-csv_path_string.trace_add('write', lambda *args: update_csv_status())
-
-entry_box = tk.Entry(csv_row, textvariable=csv_path_string)
-entry_box.pack(side='left', fill='x', expand=True, padx=(6,8))
-entry_box.bind('<FocusOut>', lambda x: update_csv_status())
-entry_box.bind('<Return>', lambda x: update_csv_status())
-
-button_browse = tk.Button(csv_row, text='Browse…', command=pick_csv)
-button_browse.pack(side='left')
-
-csv_status = tk.Label(wrapper, text='(waiting for CSV)', anchor='w', fg='#666')
-csv_status.grid(row=4, column=0, columnspan=3, sticky='w', pady=(2,8))
+if __name__ == '__main__':
+    if getattr(sys, 'frozen', False):
+        multiprocessing.freeze_support()
 
-modes_row = tk.Frame(wrapper)
-modes_row.grid(row=5, column=0, columnspan=3, sticky='w')
+    root = tk.Tk()
+    root.geometry('1100x900')
+    root.minsize(410, 230)
+    root.title(f'{APP_NAME} {VERSION}')
 
-slow_mode = tk.BooleanVar(value=settings['slow_mode'])
-slow_mode_button = tk.Checkbutton(modes_row, text='Slow mode', variable=slow_mode)
-slow_mode_button.pack(side='left')
-
-radio_button_light_mode = tk.Radiobutton(modes_row, text='Light mode', variable=theme, value='light', command=theme_toggle)
-radio_button_light_mode.pack(side='left', padx=(12,0))
-radio_button_dark_mode = tk.Radiobutton(modes_row, text='Dark mode', variable=theme, value='dark', command=theme_toggle)
-radio_button_dark_mode.pack(side='left', padx=(12,0))
+    APP_DIR = Path(__file__).parent
+    icon_png_path = APP_DIR / 'icon.png'
+    try:
+        if icon_png_path.exists():
+            icon_image = tk.PhotoImage(file=str(icon_png_path))
+            root.iconphoto(True, icon_image)
+    except Exception:
+        pass
+    import tkinter.font as tkfont
+
+    default_font = tkfont.nametofont('TkDefaultFont')
+    default_font.configure(family='Segoe UI', size=10)
+    root.option_add('*Font', default_font)
+    output_font = tkfont.nametofont('TkFixedFont')
+    output_font.configure(size=10)
+
+    container = tk.Frame(root)
+    container.pack(fill='both', expand=True)
+
+    canvas = tk.Canvas(container, highlightthickness=0, bd=0)
+    vertical_scroll_global = tk.Scrollbar(container, orient='vertical', command=canvas.yview)
+    canvas.configure(yscrollcommand=vertical_scroll_global.set)
+
+    canvas.pack(side='left', fill='both', expand=True)
+    vertical_scroll_global.pack(side='right', fill='y')
+
+    scroll_frame = tk.Frame(canvas)
+    scroll_frame.grid_rowconfigure(0, weight=1)
+    scroll_frame.grid_columnconfigure(0, weight=1)
+    frame_id = canvas.create_window((0,0), window=scroll_frame, anchor='nw')
+
+    def _update_scroll_region(_event=None):
+        canvas.configure(scrollregion=canvas.bbox('all'))
+    def _on_canvas_config(event):
+        canvas.itemconfig(frame_id, width=event.width)
+        required_height = scroll_frame.winfo_reqheight()
+        if event.height > required_height:
+            canvas.itemconfig(frame_id, height=event.height)
+        else:
+            canvas.itemconfig(frame_id, height=0)
+        canvas.configure(scrollregion=canvas.bbox('all'))
+    scroll_frame.bind('<Configure>', _update_scroll_region)
+    canvas.bind('<Configure>', _on_canvas_config)
+
+    wrapper = tk.Frame(scroll_frame, padx=12, pady=12)
+    wrapper.rowconfigure(7, weight=1)
+    wrapper.columnconfigure(0, weight=1)
+    wrapper.grid(row=0, column=0, sticky='nsew')
+
+    settings = load_settings()
+
+    theme = tk.StringVar(value=settings['theme'])
+
+    BULLET = '▸'
+    instructions_text = (
+        'VEP MIDI AutoMate will read a CSV file and automatically create MIDI Automation rows in Vienna Ensemble Pro 7 (VEP).\n\n'
+        'What you need to do:\n'
+        f' {BULLET} Open VEP with your target instance active on a screen with scaling set to 100%.\n'
+        f' {BULLET} Choose your CSV file below.\n'
+        f' {BULLET} Click "Let\'s AutoMate ▶" and do not touch your mouse or keyboard, except to press \'{ABORT_HOTKEY_STRING}\' to abort at any time.\n\n'
+        'What ' + APP_NAME + ' will do:\n'
+        + APP_NAME + ' will take control of your mouse and keyboard and use screenshots to transfer the MIDI automation stored in your CSV file using the following algorithm.\n'
+        f' {BULLET} import CSV file\n'
+        f' {BULLET} find VEP window, maximise, bring to front, check for active instance, reset layout, maximise \'MIDI Controllers\' section \n'
+        f' {BULLET} delete all current MIDI automation rows\n'
+        f' {BULLET} investigate general layout and menu positions\n'
+        f' {BULLET} check that every destination in your CSV can be found in VEP\n'
+        f' {BULLET} for each item in your CSV file\n'
+        f'    {BULLET} create new row in the \'MIDI Controllers\' section, scrolling down if needed\n'
+        f'    {BULLET} select device, channel, cc\n'
+        f'    {BULLET} input destination items\n\n'
+        'Advice:\n'
+        f' {BULLET} You can watch a video walkthrough on GitHub.\n'
+        f' {BULLET} Open VEP on a screen that is unlikely to see pop-ups, which may disrupt the automation.\n'
+        f' {BULLET} {APP_NAME} is designed to work as quickly as possible, so use \'slow mode\' if you want to watch more carefully.\n'
+        f' {BULLET} {APP_NAME} operates fastest when it is on a separate monitor to VEP.\n'
+        f' {BULLET} Use the provided example.csv as a template for your CSV file; it has the necessary column headings.\n'
+        f' {BULLET} If {APP_NAME} fails, it is most likely that something in your CSV file is not spelt correctly.\n'
+        f' {BULLET} Avoid mixer channel names that are likely to collide with plugin names or parameters, this might lead to confusion during the destination input stage.\n'
+        f' {BULLET} Report issues or share feedback on GitHub.'
+        )
+
+    instructions = tk.Label(wrapper, text=instructions_text, justify='left', anchor='w', wraplength=1)
+    instructions.grid(row=0, column=0, columnspan=3, sticky='we', pady=(0,8))
+    def _sync_wrap(event):
+        instructions.configure(wraplength=event.width)
+    instructions.bind('<Configure>', _sync_wrap)
+
+    github_link = tk.Label(wrapper, text='Open GitHub for documentation, tips, and updates.', font=('TkDefaultFont', 9, 'underline'), fg=PALETTES[theme.get()]['link'], cursor='hand2')
+    github_link.grid(row=1, column=0, sticky='w')
+    def _hover_on(event):
+        palette = PALETTES[theme.get()]
+        github_link.config(fg=palette['accent'], cursor='hand2')
+    def _hover_off(event):
+        palette = PALETTES[theme.get()]
+        github_link.config(fg=palette['link'], cursor='arrow')
+    github_link.bind('<Enter>', _hover_on)
+    github_link.bind('<Leave>', _hover_off)
+    def open_github(event):
+        github_url = 'https://github.com/robertrussell22/VEP-MIDI-AutoMate'
+        try:
+            webbrowser.open_new(github_url)
+        except Exception as e:
+            messagebox.showerror(APP_NAME, f'Could not open browser: {e}. Please navigate to {github_url}.')
+    github_link.bind('<Button-1>', open_github)
+
+    def theme_toggle():
+        apply_theme(theme.get())
+        update_csv_status()
+        save_settings(csv_path_string.get(), slow_mode.get(), turbo_mode.get(), sync.get(), skip_failed_rows.get(), record_session.get(), navigation.get(), theme.get())
+
+    separator = ttk.Separator(wrapper, orient='horizontal')
+    separator.grid(row=2, column=0, columnspan=3, sticky='ew', pady=(6,10))
+
+    csv_row = tk.Frame(wrapper)
+    csv_row.grid(row=3, column=0, columnspan=3, sticky='we')
+    csv_row.columnconfigure(0, weight=1)
+
+    csv_path_label = tk.Label(csv_row, text='CSV file')
+    csv_path_label.pack(side='left')
+
+    csv_path_string = tk.StringVar(value=settings['csv_path'])
+    csv_path_string.trace_add('write', lambda *args: update_csv_status())
+
+    entry_box = tk.Entry(csv_row, textvariable=csv_path_string)
+    entry_box.pack(side='left', fill='x', expand=True, padx=(6,8))
+    entry_box.bind('<FocusOut>', lambda x: update_csv_status())
+    entry_box.bind('<Return>', lambda x: update_csv_status())
+
+    button_browse = tk.Button(csv_row, text='Browse…', command=pick_csv)
+    button_browse.pack(side='left')
+
+    button_preview = tk.Button(csv_row, text='Preview…', command=show_preview)
+    button_preview.pack(side='left', padx=(6,0))
+
+    csv_status = tk.Label(wrapper, text='(waiting for CSV)', anchor='w', fg='#666')
+    csv_status.grid(row=4, column=0, columnspan=3, sticky='w', pady=(2,8))
+
+    modes_row = tk.Frame(wrapper)
+    modes_row.grid(row=5, column=0, columnspan=3, sticky='w')
+
+    slow_mode = tk.BooleanVar(value=settings['slow_mode'])
+    slow_mode_button = tk.Checkbutton(modes_row, text='Slow mode', variable=slow_mode)
+    slow_mode_button.pack(side='left')
+
+    turbo_mode = tk.BooleanVar(value=settings['turbo_mode'])
+    turbo_mode_button = tk.Checkbutton(modes_row, text='Turbo mode', variable=turbo_mode)
+    turbo_mode_button.pack(side='left', padx=(12,0))
+
+    sync = tk.BooleanVar(value=settings['sync'])
+    sync_button = tk.Checkbutton(modes_row, text='Sync changes only', variable=sync)
+    sync_button.pack(side='left', padx=(12,0))
+
+    skip_failed_rows = tk.BooleanVar(value=settings['skip_failed_rows'])
+    skip_failed_rows_button = tk.Checkbutton(modes_row, text='Skip failed rows', variable=skip_failed_rows)
+    skip_failed_rows_button.pack(side='left', padx=(12,0))
+
+    navigation = tk.StringVar(value=settings['navigation'])
+    keyboard_navigation_button = tk.Checkbutton(modes_row, text='Keyboard menus', variable=navigation, onvalue='keyboard', offvalue='mouse')
+    keyboard_navigation_button.pack(side='left', padx=(12,0))
+
+    record_session = tk.BooleanVar(value=settings['record_session'])
+    record_session_button = tk.Checkbutton(modes_row, text='Record session', variable=record_session)
+    record_session_button.pack(side='left', padx=(12,0))
+
+    radio_button_light_mode = tk.Radiobutton(modes_row, text='Light mode', variable=theme, value='light', command=theme_toggle)
+    radio_button_light_mode.pack(side='left', padx=(12,0))
+    radio_button_dark_mode = tk.Radiobutton(modes_row, text='Dark mode', variable=theme, value='dark', command=theme_toggle)
+    radio_button_dark_mode.pack(side='left', padx=(12,0))
+
+    button_start = tk.Button(wrapper, text='Let\'s AutoMate ▶', command=start)
+    button_start.grid(row=6, column=0, sticky='w', pady=(8,8))
+
+    button_export = tk.Button(wrapper, text='Export from VEP…', command=export)
+    button_export.grid(row=6, column=2, sticky='e', pady=(8,8))
+
+    logging_frame = tk.Frame(wrapper)
+    logging_frame.rowconfigure(0, weight=1, minsize=180)
+    logging_frame.columnconfigure(0, weight=1)
+    logging_frame.grid(row=7, column=0, columnspan=3, sticky='nsew')
+    scrollbar_horizontal = tk.Scrollbar(logging_frame, orient='horizontal')
+    scrollbar_vertical = tk.Scrollbar(logging_frame, orient='vertical')
+    logging_box = tk.Text(logging_frame, height=12, state='disabled', wrap='none', xscrollcommand=scrollbar_horizontal.set, yscrollcommand=scrollbar_vertical.set)
+    logging_box.configure(font=output_font)
+    scrollbar_horizontal.config(command=logging_box.xview)
+    scrollbar_vertical.config(command=logging_box.yview)
+    logging_box.grid(row=0, column=0, sticky='nsew')
+    scrollbar_horizontal.grid(row=1, column=0, sticky='ew')
+    scrollbar_vertical.grid(row=0, column=1, sticky='ns')
 
-button_start = tk.Button(wrapper, text='Let\'s AutoMate ▶', command=start)
-button_start.grid(row=6, column=0, sticky='w', pady=(8,8))
+    apply_theme(theme.get())
 
-logging_frame = tk.Frame(wrapper)
-logging_frame.rowconfigure(0, weight=1, minsize=180)
-logging_frame.columnconfigure(0, weight=1)
-logging_frame.grid(row=7, column=0, columnspan=3, sticky='nsew')
-scrollbar_horizontal = tk.Scrollbar(logging_frame, orient='horizontal')
-scrollbar_vertical = tk.Scrollbar(logging_frame, orient='vertical')
-logging_box = tk.Text(logging_frame, height=12, state='disabled', wrap='none', xscrollcommand=scrollbar_horizontal.set, yscrollcommand=scrollbar_vertical.set)
-logging_box.configure(font=output_font)
-scrollbar_horizontal.config(command=logging_box.xview)
-scrollbar_vertical.config(command=logging_box.yview)
-logging_box.grid(row=0, column=0, sticky='nsew')
-scrollbar_horizontal.grid(row=1, column=0, sticky='ew')
-scrollbar_vertical.grid(row=0, column=1, sticky='ns')
+    update_csv_status()
 
-apply_theme(theme.get())
+    pump_updates()
 
-update_csv_status()
+    def report_first_paint():
+        # used by benchmarks/startup.py to time how long the window takes to paint
+        print(f'first paint {1000*(time.perf_counter() - STARTUP_TIME):.1f} ms', flush=True)
+        root.destroy()
 
-pump_updates()
-abort_event = threading.Event()
+    if '--startup-probe' in sys.argv:
+        root.after_idle(lambda: root.after_idle(report_first_paint))
 
-root.protocol('WM_DELETE_WINDOW', on_close)
-root.mainloop()
+    root.protocol('WM_DELETE_WINDOW', on_close)
+    root.mainloop()
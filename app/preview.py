@@ -0,0 +1,245 @@
+###
+# VEP MIDI AutoMate 1.0.0 preview.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+# A window showing the CSV as a table, with its problems highlighted. Only the rows in view are drawn,
+# so scrolling, filtering and jumping between problems cost the same for 100 rows as for 100,000.
+
+import bisect, csv, core
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+
+ALL_ROWS = 'All rows'
+PROBLEM_ROWS = 'Rows with problems'
+COLUMN_MAX_WIDTH = 240
+COLUMN_SAMPLE_ROWS = 200
+WHEEL_ROWS = 3
+
+# the open preview window, if any, and the function that recolours it
+preview_state = {'window': None, 'apply_palette': None}
+
+def load_rows(path):
+    # reads the CSV at path as its heading and rows, skipping blank lines as csv.DictReader does, so that rows[n] is row n + 2 in core.find_csv_problem_records
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, skipinitialspace=True)
+        heading = next(reader, [])
+        return heading, [row for row in reader if row]
+
+def close_preview():
+    if preview_state['window'] is not None:
+        preview_state['window'].destroy()
+    preview_state['window'] = None
+    preview_state['apply_palette'] = None
+
+def apply_palette(palette):
+    # recolours the open preview window, if any
+    if preview_state['apply_palette'] is not None:
+        preview_state['apply_palette'](palette)
+
+def open_preview(parent, path, required_headers, palette, title):
+    # opens a window showing the CSV at path, replacing any preview already open
+    close_preview()
+    try:
+        heading, rows = load_rows(path)
+    except Exception:
+        heading, rows = [], []
+    problems = core.find_csv_problem_records(path, required_headers)
+    problems_by_row = {}
+    for problem in problems:
+        problems_by_row.setdefault(problem['row'], []).append(problem)
+    file_problems = problems_by_row.pop(None, [])
+    problem_rows = sorted(row_number - 2 for row_number in problems_by_row)
+    rows_by_kind = {}
+    for row_number, row_problems in problems_by_row.items():
+        for kind in {problem['kind'] for problem in row_problems}:
+            rows_by_kind.setdefault(kind, []).append(row_number - 2)
+    for kind_rows in rows_by_kind.values():
+        kind_rows.sort()
+    filters = {ALL_ROWS: range(len(rows)), PROBLEM_ROWS: problem_rows}
+    filters.update((core.CSV_PROBLEM_KINDS[kind], rows_by_kind[kind]) for kind in core.CSV_PROBLEM_KINDS if kind in rows_by_kind)
+    view = {'rows': filters[ALL_ROWS], 'top': 0, 'selected': None, 'palette': palette}
+
+    window = tk.Toplevel(parent)
+    window.title(title)
+    window.geometry('960x540')
+    preview_state['window'] = window
+
+    font = tkfont.nametofont('TkDefaultFont')
+    row_height = font.metrics('linespace') + 6
+    character_width = max(1, font.measure('0'))
+    columns = heading if heading else list(required_headers)
+    column_widths = []
+    for column_index, column in enumerate(columns):
+        sample = [row[column_index] for row in rows[:COLUMN_SAMPLE_ROWS] if column_index < len(row)]
+        column_widths.append(min(COLUMN_MAX_WIDTH, max(font.measure(text) for text in [column] + sample) + 12))
+    gutter_width = font.measure(str(len(rows) + 1)) + 16
+    column_lefts = [gutter_width]
+    for column_width in column_widths:
+        column_lefts.append(column_lefts[-1] + column_width)
+
+    toolbar = tk.Frame(window)
+    toolbar.pack(side='top', fill='x', padx=8, pady=(8,4))
+    filter_label = tk.Label(toolbar, text='Show')
+    filter_label.pack(side='left')
+    filter_string = tk.StringVar(value=ALL_ROWS)
+    filter_box = ttk.Combobox(toolbar, textvariable=filter_string, values=list(filters), state='readonly', width=24)
+    filter_box.pack(side='left', padx=(6,8))
+    button_next = tk.Button(toolbar, text='Next problem ▼', command=lambda: jump_to_problem(1))
+    button_next.pack(side='left')
+    button_previous = tk.Button(toolbar, text='Previous problem ▲', command=lambda: jump_to_problem(-1))
+    button_previous.pack(side='left', padx=(6,0))
+    summary = tk.Label(toolbar, text=f'{len(rows)} rows, {len(problems)} problem{"s" if len(problems) != 1 else ""} in {len(problem_rows)} row{"s" if len(problem_rows) != 1 else ""}. Row numbers include the heading row.', anchor='w')
+    summary.pack(side='left', padx=(12,0))
+
+    detail = tk.Label(window, text='', anchor='w', justify='left')
+    detail.pack(side='bottom', fill='x', padx=8, pady=(4,8))
+
+    table = tk.Frame(window)
+    table.pack(side='top', fill='both', expand=True, padx=8)
+    table.rowconfigure(0, weight=1)
+    table.columnconfigure(0, weight=1)
+    canvas = tk.Canvas(table, highlightthickness=0, xscrollincrement=character_width)
+    scrollbar_vertical = tk.Scrollbar(table, orient='vertical')
+    scrollbar_horizontal = tk.Scrollbar(table, orient='horizontal', command=canvas.xview)
+    canvas.configure(xscrollcommand=scrollbar_horizontal.set, scrollregion=(0, 0, column_lefts[-1], 1))
+    canvas.grid(row=0, column=0, sticky='nsew')
+    scrollbar_vertical.grid(row=0, column=1, sticky='ns')
+    scrollbar_horizontal.grid(row=1, column=0, sticky='ew')
+
+    def visible_rows():
+        return max(1, canvas.winfo_height() // row_height - 1)
+
+    def clipped(text, width):
+        # shortens text to roughly fit width, without measuring it
+        characters = max(1, (width - 8) // character_width)
+        return text if len(text) <= characters else text[:characters - 1] + '…'
+
+    def render():
+        # draws the heading and the rows in view, and nothing else
+        palette = view['palette']
+        canvas.delete('all')
+        canvas_width = max(canvas.winfo_width(), column_lefts[-1])
+        canvas.configure(scrollregion=(0, 0, column_lefts[-1], canvas.winfo_height()))
+        canvas.create_rectangle(0, 0, canvas_width, row_height, fill=palette['button_background'], width=0)
+        for column, left, width in zip(columns, column_lefts, column_widths):
+            canvas.create_text(left + 4, row_height // 2, text=clipped(column, width), anchor='w', fill=palette['button_foreground'], font=font)
+        view_rows = view['rows']
+        for position in range(view['top'], min(len(view_rows), view['top'] + visible_rows())):
+            row_index = view_rows[position]
+            row = rows[row_index] if row_index < len(rows) else []
+            top = row_height * (position - view['top'] + 1)
+            bad_columns = {problem['column'] for problem in problems_by_row.get(row_index + 2, [])}
+            selected = row_index == view['selected']
+            row_background = palette['accent'] if selected else palette['log_background'] if position % 2 else palette['background']
+            row_foreground = '#ffffff' if selected else palette['foreground']
+            canvas.create_rectangle(0, top, canvas_width, top + row_height, fill=row_background, width=0)
+            canvas.create_text(gutter_width - 8, top + row_height // 2, text=str(row_index + 2), anchor='e', fill=palette['warning'] if bad_columns and not selected else row_foreground if selected else palette['muted'], font=font)
+            for column_index, (column, left, width) in enumerate(zip(columns, column_lefts, column_widths)):
+                if column in bad_columns:
+                    canvas.create_rectangle(left + 1, top + 1, left + width - 1, top + row_height - 1, fill=palette['warning'], width=0)
+                text = row[column_index] if column_index < len(row) else ''
+                if text:
+                    canvas.create_text(left + 4, top + row_height // 2, text=clipped(text, width), anchor='w', fill='#ffffff' if column in bad_columns else row_foreground, font=font)
+        if view_rows:
+            scrollbar_vertical.set(view['top'] / len(view_rows), min(1.0, (view['top'] + visible_rows()) / len(view_rows)))
+        else:
+            scrollbar_vertical.set(0.0, 1.0)
+            canvas.create_text(gutter_width, row_height * 3 // 2, text='No rows to show.', anchor='w', fill=palette['muted'], font=font)
+
+    def show_detail():
+        # describes the selected row's problems, or the problems with the whole file
+        selected_problems = problems_by_row.get(view['selected'] + 2, []) if view['selected'] is not None else file_problems
+        detail.config(text='\n'.join(problem['message'] for problem in selected_problems) if selected_problems else f'Row {view["selected"] + 2} looks good ✓' if view['selected'] is not None else 'Click a row to see its problems.', fg=view['palette']['warning'] if selected_problems else view['palette']['muted'])
+
+    def scroll_to(top):
+        view['top'] = max(0, min(top, len(view['rows']) - visible_rows()))
+        render()
+
+    def on_scrollbar(action, amount, unit=None):
+        if action == 'moveto':
+            scroll_to(int(float(amount) * len(view['rows'])))
+        elif action == 'scroll':
+            scroll_to(view['top'] + int(amount) * (visible_rows() if unit == 'pages' else 1))
+
+    def on_wheel(event):
+        scroll_to(view['top'] + (WHEEL_ROWS if event.num == 5 or event.delta < 0 else -WHEEL_ROWS))
+
+    def on_click(event):
+        position = view['top'] + int(event.y) // row_height - 1
+        if int(event.y) >= row_height and position < len(view['rows']):
+            view['selected'] = view['rows'][position]
+            show_detail()
+            render()
+
+    def select(position):
+        # selects the row at position in the view, scrolling it into view
+        view['selected'] = view['rows'][position]
+        if not view['top'] <= position < view['top'] + visible_rows():
+            view['top'] = max(0, min(position - visible_rows() // 3, len(view['rows']) - visible_rows()))
+        show_detail()
+        render()
+
+    def move_selection(step):
+        if not view['rows']:
+            return
+        position = bisect.bisect_left(view['rows'], view['selected']) if view['selected'] is not None else view['top'] - step
+        select(max(0, min(len(view['rows']) - 1, position + step)))
+
+    def jump_to_problem(step):
+        # selects the next (step 1) or previous (step -1) row with a problem shown by the filter, wrapping around
+        candidates = view['rows'] if view['rows'] is not filters[ALL_ROWS] else problem_rows
+        if not candidates:
+            return
+        current = view['selected'] if view['selected'] is not None else view['rows'][view['top']] - 1 if view['rows'] else -1
+        index = bisect.bisect_right(candidates, current) if step > 0 else bisect.bisect_left(candidates, current) - 1
+        row_index = candidates[index % len(candidates)]
+        filter_rows = view['rows']
+        select(bisect.bisect_left(filter_rows, row_index))
+
+    def on_filter(event=None):
+        view['rows'] = filters[filter_string.get()]
+        view['top'] = 0
+        if view['selected'] is not None:
+            position = bisect.bisect_left(view['rows'], view['selected'])
+            if position < len(view['rows']) and view['rows'][position] == view['selected']:
+                select(position)
+                return
+        render()
+
+    def recolour(palette):
+        view['palette'] = palette
+        window.configure(bg=palette['background'])
+        for frame in [toolbar, table]:
+            frame.configure(bg=palette['background'])
+        for label in [filter_label, summary]:
+            label.configure(bg=palette['background'], fg=palette['foreground'])
+        detail.configure(bg=palette['background'])
+        show_detail()
+        for button in [button_next, button_previous]:
+            button.configure(bg=palette['button_background'], fg=palette['button_foreground'], activebackground=palette['button_background'])
+        canvas.configure(bg=palette['background'])
+        for scrollbar in [scrollbar_vertical, scrollbar_horizontal]:
+            scrollbar.configure(bg=palette['background'])
+        render()
+
+    scrollbar_vertical.configure(command=on_scrollbar)
+    filter_box.bind('<<ComboboxSelected>>', on_filter)
+    canvas.bind('<Configure>', lambda event: scroll_to(view['top']))
+    canvas.bind('<Button-1>', on_click)
+    for sequence in ['<MouseWheel>', '<Button-4>', '<Button-5>']:
+        canvas.bind(sequence, on_wheel)
+    window.bind('<Down>', lambda event: move_selection(1))
+    window.bind('<Up>', lambda event: move_selection(-1))
+    window.bind('<Next>', lambda event: move_selection(visible_rows()))
+    window.bind('<Prior>', lambda event: move_selection(-visible_rows()))
+    window.bind('<F3>', lambda event: jump_to_problem(1))
+    window.bind('<Shift-F3>', lambda event: jump_to_problem(-1))
+    window.protocol('WM_DELETE_WINDOW', close_preview)
+    preview_state['apply_palette'] = recolour
+
+    window.update_idletasks() # so that the number of rows in view is known before jumping to the first problem
+    recolour(palette)
+    if problem_rows:
+        jump_to_problem(1)
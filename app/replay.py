@@ -0,0 +1,93 @@
+###
+# VEP MIDI AutoMate 1.0.0 replay.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+# Feeds the frames of a recording (made with 'Record session' or cli.py --record) back through the image analysis functions offline,
+# timing each one, so they can be profiled and regression-tested against real VEP captures on any platform.
+# Usage: python replay.py RECORDING [--repeat N] [--results FILE] [--compare FILE]
+
+import argparse, json, statistics, sys, time, core
+
+TEXT_LINE_MAX_HEIGHT = 64
+
+def timed(timings, name, function, *args):
+    # calls function, adding its duration in seconds to timings[name]
+    t_0 = time.perf_counter()
+    result = function(*args)
+    timings.setdefault(name, []).append(time.perf_counter() - t_0)
+    return result
+
+def analyse_frame(timings, frame, previous_image):
+    # runs the analysis functions that apply to frame, returning their results in a form that can be saved as JSON
+    frame_time, (left, top, width, height), last_input, image = frame
+    results = {'time': round(frame_time, 4), 'region': [left, top, width, height], 'input': last_input}
+    if width > 1 and height > 1:
+        results['bands_down'] = timed(timings, 'count_colour_bands', core.count_colour_bands, image, (width // 2, 0), (0, 1))
+        results['band_3_up'] = [list(position) for position in timed(timings, 'find_nth_colour_band', core.find_nth_colour_band, image, 3, (width // 2, height - 1), (0, -1))]
+    if 1 < height <= TEXT_LINE_MAX_HEIGHT:
+        glyphs = timed(timings, 'segment_glyphs', core.segment_glyphs, timed(timings, 'find_ink', core.find_ink, image))
+        results['glyphs'] = [[glyph_left, glyph_right] for glyph_left, glyph_right, _ in glyphs]
+    if previous_image is not None and width > 1 and height > 1 and previous_image.tobytes() != image.tobytes():
+        try:
+            _, bounding_box = timed(timings, 'crop_by_largest_difference', core.crop_by_largest_difference, previous_image, image)
+            results['difference'] = [int(value) for value in bounding_box]
+        except core.VEP_MIDI_AutoMate_Error:
+            results['difference'] = None
+    return results
+
+def replay(path, repeat=1):
+    # replays the recording at path repeat times, returning the results of the last pass and the timings of all passes
+    timings = {}
+    for _ in range(repeat):
+        all_results = []
+        previous_images = {}
+        frames = core.read_recording(path)
+        while True:
+            frame = timed(timings, 'decode', next, frames, None)
+            if frame is None:
+                break
+            all_results.append(analyse_frame(timings, frame, previous_images.get(frame[1])))
+            previous_images[frame[1]] = frame[3]
+    return all_results, timings
+
+def compare(results, expected_results):
+    # lists the frames whose results differ from expected_results
+    differences = []
+    if len(results) != len(expected_results):
+        differences.append(f'{len(results)} frames, expected {len(expected_results)}')
+    for index, (result, expected_result) in enumerate(zip(results, expected_results)):
+        for name in sorted(set(result) | set(expected_result)):
+            if name != 'time' and result.get(name) != expected_result.get(name):
+                differences.append(f'frame {index} ({result["input"] or "no input"}): {name} is {result.get(name)}, expected {expected_result.get(name)}')
+    return differences
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog='replay.py', description='Replays a recorded session through the image analysis functions, timing each one.')
+    parser.add_argument('recording', help='.vmarec file to replay')
+    parser.add_argument('--repeat', type=int, default=1, help='number of passes to time (default 1)')
+    parser.add_argument('--results', help='save the analysis results of each frame to this JSON file')
+    parser.add_argument('--compare', help='compare the analysis results with a JSON file saved earlier with --results, exiting with 1 if they differ')
+    options = parser.parse_args(arguments)
+
+    results, timings = replay(options.recording, options.repeat)
+    print(f'{len(results)} frames, {options.repeat} pass{"es" if options.repeat != 1 else ""}')
+    print(f'{"function":<28}{"calls":>8}{"total ms":>12}{"mean ms":>10}{"p95 ms":>10}{"max ms":>10}')
+    for name, durations in sorted(timings.items(), key=lambda item: -sum(item[1])):
+        durations = sorted(durations)
+        print(f'{name:<28}{len(durations):>8}{1000*sum(durations):>12.1f}{1000*statistics.mean(durations):>10.3f}{1000*durations[int(0.95*(len(durations) - 1))]:>10.3f}{1000*durations[-1]:>10.3f}')
+
+    if options.results:
+        with open(options.results, 'w', encoding='utf-8') as f:
+            json.dump(results, f)
+    if options.compare:
+        with open(options.compare, encoding='utf-8') as f:
+            differences = compare(results, json.load(f))
+        for difference in differences[:20]:
+            print(difference)
+        print(f'{len(differences)} difference{"s" if len(differences) != 1 else ""} from {options.compare}')
+        return 1 if differences else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
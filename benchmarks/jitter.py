@@ -0,0 +1,73 @@
+###
+# VEP MIDI AutoMate 1.0.0 benchmarks/jitter.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+# Compares per-row time and jitter of engine.run_engine inputting a CSV into VEP when it shares a process (and so the GIL) with a busy GUI,
+# as it did when core.go ran on a thread of gui.py, against running in a process of its own, as gui.py runs it now.
+# It needs VEP open, as the app does, and inputs the CSV once in each mode; row times come from the engine's own 'row' progress events.
+# Usage: python benchmarks/jitter.py rows.csv [--slow-mode]
+
+import argparse, multiprocessing, statistics, sys, threading, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'app'))
+import core, engine
+
+BULLET = '▸'
+
+def busy_gui(stop_event):
+    # stands in for the Tk mainloop, keyboard hook and pump_updates timer, holding the GIL for 20 ms every 80 ms
+    while not stop_event.is_set():
+        t_0 = time.perf_counter()
+        while time.perf_counter() - t_0 < 0.02:
+            sum(range(1000))
+        stop_event.wait(0.06)
+
+def measure(mode, path, slow_mode):
+    # inputs the CSV with engine.run_engine on a thread of this process or in a process of its own, alongside a busy GUI, returning each row's time in seconds
+    messages = multiprocessing.Queue()
+    abort_event = multiprocessing.Event()
+    abort_time = multiprocessing.Value('d', 0.0)
+    arguments = (path, abort_event, abort_time, slow_mode, messages, core.REQUIRED_HEADERS, BULLET)
+    runner = threading.Thread(target=engine.run_engine, args=arguments, daemon=True) if mode == 'thread' else multiprocessing.Process(target=engine.run_engine, args=arguments, daemon=True)
+    stop_event = threading.Event()
+    gui = threading.Thread(target=busy_gui, args=(stop_event,), daemon=True)
+    gui.start()
+    runner.start()
+    row_times = []
+    try:
+        while True:
+            message = messages.get()
+            if message[0] == 'progress' and message[1]['event'] == 'row':
+                row_times.append(sum(message[1]['phases'].values()))
+            elif message[0] == 'finished':
+                if message[1] != 'done':
+                    raise SystemExit(f'The run with the engine on a {mode} ended early ({message[1]}): {message[2]}')
+                break
+    finally:
+        stop_event.set()
+        runner.join()
+        gui.join()
+    return row_times
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures per-row jitter of real runs with the engine on a GUI thread and in its own process.')
+    parser.add_argument('csv', help='CSV to input into the open VEP window, once in each mode')
+    parser.add_argument('--slow-mode', action='store_true', help='pause between inputs, as the GUI\'s slow mode does')
+    options = parser.parse_args()
+    problems = core.find_csv_problems(options.csv)
+    if problems:
+        print('\n'.join(problems))
+        return 1
+    for mode, description in [('thread', 'engine on a GUI thread (before)'), ('process', 'engine in its own process (after)')]:
+        row_times = measure(mode, Path(options.csv), options.slow_mode)[1:] # the first row includes start-up
+        if len(row_times) < 2:
+            print(f'{description}: fewer than three rows, so no jitter to report')
+            continue
+        quantiles = statistics.quantiles(row_times, n=20)
+        print(f'{description}: mean {1000*statistics.mean(row_times):.1f} ms, jitter (standard deviation) {1000*statistics.pstdev(row_times):.1f} ms, 95th percentile {1000*quantiles[-1]:.1f} ms')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+###
+# VEP MIDI AutoMate 1.0.0 benchmarks/rows.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+# Compares the time per row, or per phase of each row, between runs of cli.py over the same CSV,
+# such as runs before and after a change to core.go, or one with --navigation mouse and one with --navigation keyboard.
+# Usage: python app/cli.py rows.csv > before.jsonl
+#        python app/cli.py rows.csv > after.jsonl
+#        python benchmarks/rows.py before.jsonl after.jsonl [--phase row|create_row|menus|destination] [--min-speedup X]
+
+import argparse, json, statistics, sys
+
+PHASES = ['row', 'create_row', 'menus', 'destination']
+
+def read_row_times(path, phase):
+    # returns the navigation mode and the time of phase ('row' for the whole row) for each row from a cli.py progress log
+    navigation = '?'
+    row_times = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get('event') == 'start':
+                navigation = event.get('navigation', 'mouse')
+            elif event.get('event') == 'row':
+                row_times.append(sum(event['phases'].values()) if phase == 'row' else event['phases'][phase])
+    return navigation, row_times
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares the time per row of cli.py progress logs, the first being the baseline.')
+    parser.add_argument('logs', nargs='+', help='cli.py progress logs')
+    parser.add_argument('--phase', choices=PHASES, default='row', help='compare the whole row (default) or one phase of it')
+    parser.add_argument('--min-speedup', type=float, default=0.0, help='exit with 1 unless every log\'s mean time is at least this many times faster than the first')
+    options = parser.parse_args()
+    baseline_mean = None
+    exit_code = 0
+    for path in options.logs:
+        navigation, row_times = read_row_times(path, options.phase)
+        if len(row_times) < 2:
+            print(f'{path}: fewer than two rows, skipped')
+            continue
+        mean = statistics.mean(row_times)
+        quantiles = statistics.quantiles(row_times, n=20)
+        speedup = baseline_mean / mean if baseline_mean else 1.0
+        print(f'{path} ({navigation} navigation, {len(row_times)} rows, {options.phase}): mean {1000*mean:.0f} ms, median {1000*statistics.median(row_times):.0f} ms, 95th percentile {1000*quantiles[-1]:.0f} ms, jitter (standard deviation) {1000*statistics.pstdev(row_times):.0f} ms{"" if baseline_mean is None else f", {speedup:.2f}x the first"}')
+        if baseline_mean is None:
+            baseline_mean = mean
+        elif speedup < options.min_speedup:
+            exit_code = 1
+    return exit_code
+
+if __name__ == '__main__':
+    sys.exit(main())
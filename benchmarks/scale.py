@@ -0,0 +1,132 @@
+###
+# VEP MIDI AutoMate 1.0.0 benchmarks/scale.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+# Measures how the CSV layer scales with the size of the template: validation (core.find_csv_problems, as the GUI and cli.py use it),
+# loading (core.load_csv, as core.go uses it) and the per-row progress overhead (core.row_update_string and a cli.py-style JSON event),
+# over synthetic CSVs from 100 to 100,000 rows, both valid and with problems. It needs neither VEP nor a display.
+# Each phase must stay within a per-row time budget, and must not slow down per row as the CSV grows.
+# Usage: python benchmarks/scale.py [--sizes 100 1000 10000 100000] [--runs N] [--results FILE] [--compare FILE]
+
+import argparse, csv, json, random, sys, tempfile, time, tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'app'))
+import core
+
+VALIDATE_BUDGET_US_PER_ROW = 60
+LOAD_BUDGET_US_PER_ROW = 50
+PROGRESS_BUDGET_US_PER_ROW = 80
+SCALING_TOLERANCE = 2.0 # largest CSV's time per row against the smallest's
+COMPARE_TOLERANCE = 1.25 # time against a saved --results file
+PROBLEM_RATE = 0.05
+
+def write_csv(path, number_of_rows, with_problems, seed=0):
+    # writes a synthetic CSV of number_of_rows rows, a PROBLEM_RATE share of them broken in one of several ways if with_problems
+    random.seed(seed)
+    breakages = [('device', '0'), ('channel', '17'), ('cc', 'x'), ('layer 1', ''), ('layer 3', ''), ('repeat', '-1')]
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(core.REQUIRED_HEADERS)
+        for row_number in range(number_of_rows):
+            row = {'device': str(random.randint(1, 4)), 'channel': str(random.randint(1, 16)), 'cc': str(random.randint(0, 127)), 'layer 1': f'{random.randint(1, 64)} Violins {random.randint(1, 2)}', 'layer 2': random.choice(['Volume', 'Pan', 'Kontakt 7']), 'layer 3': '', 'layer 4': '', 'repeat': ''}
+            if row['layer 2'] == 'Kontakt 7':
+                row['layer 3'] = f'Parameter {random.randint(1, 128)}'
+                row['repeat'] = random.choice(['', '', '2'])
+            if with_problems and random.random() < PROBLEM_RATE:
+                header, value = random.choice(breakages)
+                row[header] = value
+            writer.writerow([row[header] for header in core.REQUIRED_HEADERS])
+
+def time_best(function, runs):
+    # returns the best time of runs calls to function, in seconds, and its last result
+    best = None
+    for _ in range(runs):
+        t_0 = time.perf_counter()
+        result = function()
+        duration = time.perf_counter() - t_0
+        best = duration if best is None else min(best, duration)
+    return best, result
+
+def peak_memory(function):
+    # returns the peak memory allocated by Python during a call to function, in bytes
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def report_progress(data):
+    # formats every row's log line and progress event, as core.go and cli.py do, discarding the output
+    number_of_rows = len(data)
+    for row_number, datum in enumerate(data):
+        core.row_update_string(row_number, number_of_rows, datum, None if row_number == 0 else 12.3 * (number_of_rows - row_number))
+        json.dumps({'event': 'row', 'time': 0.0, 'csv': 'scale.csv', 'row': row_number + 1, 'rows': number_of_rows, 'csv_row': row_number + 2, 'elapsed': 1.0, 'eta': 2.0, 'phases': {'create_row': 0.1, 'menus': 0.2, 'destination': 0.3}}, ensure_ascii=False)
+
+def measure(path, runs):
+    # measures each phase over the CSV at path, valid or not, returning {phase: {'us_per_row', 'peak_mib'}} and the number of problems found
+    validate_time, problems = time_best(lambda: core.find_csv_problems(path), runs)
+    load_time, data = time_best(lambda: core.load_csv(path), runs)
+    progress_time, _ = time_best(lambda: report_progress(data), runs)
+    with open(path, encoding='utf-8') as f:
+        number_of_rows = sum(1 for _ in f) - 1
+    results = {
+        'validate': {'us_per_row': 1e6*validate_time/number_of_rows, 'peak_mib': peak_memory(lambda: core.find_csv_problems(path))/2**20},
+        'load': {'us_per_row': 1e6*load_time/number_of_rows, 'peak_mib': peak_memory(lambda: core.load_csv(path))/2**20},
+        'progress': {'us_per_row': 1e6*progress_time/number_of_rows, 'peak_mib': peak_memory(lambda: report_progress(data))/2**20}
+    }
+    return results, len(problems)
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures CSV validation, loading and progress reporting on synthetic CSVs of growing size.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000], help='numbers of rows to generate')
+    parser.add_argument('--runs', type=int, default=3, help='number of timed runs of each phase, of which the best is kept')
+    parser.add_argument('--results', help='save the measurements to this JSON file')
+    parser.add_argument('--compare', help=f'fail if any time per row is more than {COMPARE_TOLERANCE}x that in a JSON file saved earlier with --results')
+    options = parser.parse_args()
+
+    budgets = {'validate': VALIDATE_BUDGET_US_PER_ROW, 'load': LOAD_BUDGET_US_PER_ROW, 'progress': PROGRESS_BUDGET_US_PER_ROW}
+    measurements = {}
+    failures = []
+    print(f'{"CSV":<22}{"problems":>10}{"phase":>10}{"µs/row":>10}{"peak MiB":>10}')
+    with tempfile.TemporaryDirectory() as directory:
+        for number_of_rows in sorted(options.sizes):
+            for with_problems in [False, True]:
+                name = f'{number_of_rows} rows{", invalid" if with_problems else ""}'
+                path = Path(directory) / f'{number_of_rows}-{"invalid" if with_problems else "valid"}.csv'
+                write_csv(path, number_of_rows, with_problems)
+                results, number_of_problems = measure(path, options.runs)
+                measurements[name] = results
+                for phase, result in results.items():
+                    print(f'{name:<22}{number_of_problems:>10}{phase:>10}{result["us_per_row"]:>10.2f}{result["peak_mib"]:>10.2f}')
+                    if result['us_per_row'] > budgets[phase]:
+                        failures.append(f'{name}: {phase} takes {result["us_per_row"]:.2f} µs per row, over the budget of {budgets[phase]} µs')
+                path.unlink()
+
+    # time per row should not grow with the CSV, which would mean something in the CSV layer is worse than linear
+    smallest, largest = f'{min(options.sizes)} rows', f'{max(options.sizes)} rows'
+    for suffix in ['', ', invalid']:
+        for phase in measurements[largest + suffix]:
+            if measurements[largest + suffix][phase]['us_per_row'] > SCALING_TOLERANCE * measurements[smallest + suffix][phase]['us_per_row']:
+                failures.append(f'{largest}{suffix}: {phase} takes {measurements[largest + suffix][phase]["us_per_row"]:.2f} µs per row, more than {SCALING_TOLERANCE}x the {measurements[smallest + suffix][phase]["us_per_row"]:.2f} µs at {smallest}')
+
+    if options.results:
+        with open(options.results, 'w', encoding='utf-8') as f:
+            json.dump(measurements, f, indent=2)
+    if options.compare:
+        with open(options.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        for name, results in measurements.items():
+            for phase, result in results.items():
+                baseline_result = baseline.get(name, {}).get(phase)
+                if baseline_result and result['us_per_row'] > COMPARE_TOLERANCE * baseline_result['us_per_row']:
+                    failures.append(f'{name}: {phase} takes {result["us_per_row"]:.2f} µs per row, against {baseline_result["us_per_row"]:.2f} µs in {options.compare}')
+
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
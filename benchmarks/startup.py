@@ -0,0 +1,82 @@
+###
+# VEP MIDI AutoMate 1.0.0 benchmarks/startup.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+# Measures how long core.py takes to import and gui.py takes to paint, failing when start-up regresses.
+# Usage: python benchmarks/startup.py [--runs N]
+
+import argparse, os, subprocess, sys, time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / 'app'
+
+CORE_IMPORT_BUDGET_MS = 100
+GUI_PAINT_BUDGET_MS = 1500
+DEFERRED_MODULES = ['numpy', 'mss', 'psutil', 'pygetwindow', 'pyautogui', 'PIL', 'keyboard']
+
+def import_times(statement):
+    # runs statement in a fresh interpreter with -X importtime, returning {module: (self_us, cumulative_us)}
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=APP_DIR, capture_output=True, text=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us), len(name) - len(name.lstrip()))
+    return times
+
+def measure_core_import(runs):
+    # returns the best cumulative import time of core in milliseconds, and the deferred modules it pulled in
+    best_ms = None
+    for _ in range(runs):
+        times = import_times('import core')
+        core_ms = times['core'][1] / 1000
+        best_ms = core_ms if best_ms is None else min(best_ms, core_ms)
+    eager = [module for module in DEFERRED_MODULES if any(name == module or name.startswith(module + '.') for name in times)]
+    heaviest = sorted(((cumulative_us, name) for name, (_, cumulative_us, depth) in times.items() if depth == 3), reverse=True)[:5]
+    return best_ms, eager, heaviest
+
+def measure_gui_paint(runs):
+    # returns the best time in milliseconds from launching gui.py to its first paint, or None without a display
+    if sys.platform != 'win32' and not os.environ.get('DISPLAY'):
+        return None
+    best_ms = None
+    for _ in range(runs):
+        t_0 = time.perf_counter()
+        result = subprocess.run([sys.executable, 'gui.py', '--startup-probe'], cwd=APP_DIR, capture_output=True, text=True, timeout=60)
+        paint_ms = 1000*(time.perf_counter() - t_0)
+        if 'first paint' not in result.stdout:
+            raise RuntimeError(f'gui.py did not report its first paint:\n{result.stderr}')
+        best_ms = paint_ms if best_ms is None else min(best_ms, paint_ms)
+    return best_ms
+
+def main():
+    parser = argparse.ArgumentParser(description='Fails when VEP MIDI AutoMate start-up exceeds its budget.')
+    parser.add_argument('--runs', type=int, default=5, help='number of runs, of which the best is kept')
+    options = parser.parse_args()
+
+    failures = []
+    core_ms, eager, heaviest = measure_core_import(options.runs)
+    print(f'import core: {core_ms:.1f} ms (budget {CORE_IMPORT_BUDGET_MS} ms)')
+    for cumulative_us, name in heaviest:
+        print(f'    {cumulative_us/1000:7.1f} ms  {name}')
+    if core_ms > CORE_IMPORT_BUDGET_MS:
+        failures.append('import core is over budget')
+    if eager:
+        failures.append(f'import core eagerly imports {", ".join(eager)}')
+
+    paint_ms = measure_gui_paint(options.runs)
+    if paint_ms is None:
+        print('gui.py first paint: skipped (no display)')
+    else:
+        print(f'gui.py first paint: {paint_ms:.1f} ms (budget {GUI_PAINT_BUDGET_MS} ms)')
+        if paint_ms > GUI_PAINT_BUDGET_MS:
+            failures.append('gui.py first paint is over budget')
+
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,11 @@
+###
+# VEP MIDI AutoMate 1.0.0 tests/conftest.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+# makes the app's modules importable, as the benchmarks do; nothing here needs VEP or a display
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'app'))
@@ -0,0 +1,144 @@
+###
+# VEP MIDI AutoMate 1.0.0 tests/test_glyph_atlas.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+# learns the glyph atlas from names typed into a text box, as core.go does, and reads them back from table cells, in Pillow's bitmap font (whose glyphs often touch) and an anti-aliased one
+
+import core, pytest
+from PIL import Image, ImageDraw, ImageFont
+
+NAMES = ['Violins', 'Violas', 'Cellos', 'Basses', 'Flutes', 'Oboes', 'Clarinets', 'Bassoons', 'Horns', 'Trumpets', 'Trombones', 'Tuba', 'Harp', 'Piano', 'Volume', 'Pan', 'Kontakt 7', 'Violins 1', 'Violins 2', '1 Violins 2', 'Expression', 'Modulation', 'Parameter 12', 'Send A']
+
+def fonts():
+    # Pillow's bitmap font, and its anti-aliased font at two sizes where FreeType is available
+    yield ImageFont.load_default_imagefont()
+    try:
+        yield ImageFont.load_default(size=10)
+        yield ImageFont.load_default(size=13)
+    except (ImportError, OSError):
+        pass
+
+def render(text, font, cursor=False):
+    # draws text as VEP's text box (with a cursor taller than the text) or a table cell shows it
+    image = Image.new('RGB', (320, 24), (40, 40, 40))
+    draw = ImageDraw.Draw(image)
+    draw.text((3, 3), text, fill=(230, 230, 230), font=font)
+    if cursor:
+        x = int(draw.textlength(text, font=font)) + 5
+        draw.line([(x, 2), (x, 21)], fill=(230, 230, 230))
+    return image
+
+def learnt_atlas(font):
+    # learns every name twice, so that clusters of glyphs can be learnt once the rest of their word is known
+    atlas = core.new_glyph_atlas()
+    for _ in range(2):
+        for name in NAMES:
+            core.learn_glyph_atlas(atlas, render(name, font, cursor=True), name)
+    return atlas
+
+@pytest.mark.parametrize('font', list(fonts()), ids=lambda font: f'{type(font).__name__}-{getattr(font, "size", "bitmap")}')
+def test_names_read_back_correctly_or_not_at_all(font):
+    # a name is either read back exactly or has a glyph that cannot be read, and is never reported as wrong
+    atlas = learnt_atlas(font)
+    for name in NAMES:
+        classes = core.read_glyphs(atlas, render(name, font))
+        if () not in classes:
+            assert core.read_text(atlas, render(name, font)).replace(' ', '') == name.replace(' ', '')
+        assert core.check_destination_cell(atlas, render(name, font), [name], name) == (() not in classes)
+
+@pytest.mark.parametrize('font', list(fonts()), ids=lambda font: f'{type(font).__name__}-{getattr(font, "size", "bitmap")}')
+def test_wrong_names_are_only_reported_from_a_unique_reading(font):
+    # asking for another name fails fast when every glyph can be read, and otherwise is left to the colour band checks
+    atlas = learnt_atlas(font)
+    for name, wrong_name in zip(NAMES, NAMES[1:] + NAMES[:1]):
+        if () in core.read_glyphs(atlas, render(name, font)):
+            assert not core.check_destination_cell(atlas, render(name, font), [wrong_name], name)
+        else:
+            with pytest.raises(core.VEP_MIDI_AutoMate_Destination_Error):
+                core.check_destination_cell(atlas, render(name, font), [wrong_name], name)
+
+@pytest.mark.parametrize('size, names', [(None, ['Oboes', 'Horns', 'Harp']), (13, ['Tuba', 'Piano', 'Volume', 'Pan'])])
+def test_single_words_are_learnt_from_the_text_box(size, names):
+    # these names have as many glyphs as characters (or, for Harp in the bitmap font, a single glyph), so can be learnt on their own
+    try:
+        font = ImageFont.load_default_imagefont() if size is None else ImageFont.load_default(size=size)
+    except (ImportError, OSError):
+        pytest.skip('FreeType is not available')
+    for name in names:
+        atlas = core.new_glyph_atlas()
+        assert core.learn_glyph_atlas(atlas, render(name, font, cursor=True), name)
+        assert core.read_text(atlas, render(name, font)) == name
+
+def test_glyphs_matched_to_the_wrong_characters_are_not_learnt():
+    # in the bitmap font, Violins splits into as many glyphs as it has characters, but not one for each, so its two i glyphs differ in width
+    font = ImageFont.load_default_imagefont()
+    atlas = core.new_glyph_atlas()
+    assert len(core.segment_glyphs(core.find_ink(render('Violins', font)))) == len('Violins')
+    assert not core.learn_glyph_atlas(atlas, render('Violins', font, cursor=True), 'Violins')
+    assert atlas['glyphs'] == {}
+    assert core.read_text(atlas, render('Violins', font)) == '???????'
+
+def test_glyphs_seen_as_different_characters_are_disputed():
+    # a glyph taught as another character of the same width, as l and I can be, is read as unknown from then on
+    font = ImageFont.load_default_imagefont()
+    atlas = core.new_glyph_atlas()
+    assert core.learn_glyph_atlas(atlas, render('Oboes', font, cursor=True), 'Oboes')
+    glyph = core.segment_glyphs(core.find_ink(render('Oboes', font)))[0]
+    assert core.teach_glyph_atlas(atlas, [(glyph, 'Q')])
+    assert glyph[2] in atlas['disputed']
+    assert core.read_text(atlas, render('Oboes', font)) == '?boes'
+    assert not core.check_destination_cell(atlas, render('Oboes', font), ['Qboes'], 'Oboes')
+
+def destination_atlas():
+    # learns Tuba, Volume, Piano and Pan from the text box, then the glyphs between layers from a destination cell, as core.go does as each row is confirmed
+    try:
+        font = ImageFont.load_default(size=13)
+    except (ImportError, OSError):
+        pytest.skip('FreeType is not available')
+    atlas = core.new_glyph_atlas()
+    for name in ['Tuba', 'Volume', 'Piano', 'Pan', 'Kontakt 7']:
+        core.learn_glyph_atlas(atlas, render(name, font, cursor=True), name)
+    assert core.read_destination_cell(atlas, render('Tuba -> Volume', font)) is None
+    assert core.learn_destination_cell(atlas, render('Tuba -> Volume', font), ['Tuba', 'Volume'])
+    return atlas, font
+
+def test_destination_cells_are_checked_as_whole_paths():
+    # the same last layer under another layer 1, or search text that was never committed, fails; an empty cell or an unknown glyph is left to the colour band checks
+    atlas, font = destination_atlas()
+    assert core.read_destination_cell(atlas, render('Piano -> Pan', font)) == ['Piano', 'Pan']
+    assert core.check_destination_cell(atlas, render('Tuba -> Volume', font), ['Tuba', 'Volume'], 'Tuba')
+    with pytest.raises(core.VEP_MIDI_AutoMate_Destination_Error):
+        core.check_destination_cell(atlas, render('Piano -> Volume', font), ['Tuba', 'Volume'], 'Tuba')
+    with pytest.raises(core.VEP_MIDI_AutoMate_Destination_Error):
+        core.check_destination_cell(atlas, render('Volume', font), ['Tuba', 'Volume'], 'Tuba')
+    assert not core.check_destination_cell(atlas, render('', font), ['Tuba', 'Volume'], 'Tuba')
+    assert not core.check_destination_cell(atlas, render('Tuba -> Volume 9', font), ['Tuba', 'Volume'], 'Tuba')
+
+def test_spot_checks_fail_empty_cells_but_pass_unknown_glyphs():
+    # turbo mode's spot check has no wait_for_destination_text_to_appear to fall back on, so it checks the colour bands across the cell itself
+    atlas, font = destination_atlas()
+    core.spot_check_destination_cell(atlas, render('Tuba -> Volume', font), ['Tuba', 'Volume'], 'Tuba')
+    core.spot_check_destination_cell(atlas, render('Tuba -> Volume 9', font), ['Tuba', 'Volume'], 'Tuba')
+    with pytest.raises(core.VEP_MIDI_AutoMate_Destination_Error):
+        core.spot_check_destination_cell(atlas, render('', font), ['Tuba', 'Volume'], 'Tuba')
+
+def test_atlas_is_saved_and_loaded(tmp_path, monkeypatch):
+    # the atlas survives a round trip through its file, disputed glyphs and widths included
+    monkeypatch.setattr(core, 'CONFIG_DIR', tmp_path)
+    monkeypatch.setattr(core, 'GLYPH_ATLAS_FILE', tmp_path / 'glyph_atlas.json')
+    font = ImageFont.load_default_imagefont()
+    atlas = learnt_atlas(font)
+    atlas['disputed'].add(next(iter(atlas['glyphs'])))
+    core.save_glyph_atlas(atlas)
+    assert core.load_glyph_atlas() == atlas
+
+def test_a_row_reads_back_only_as_its_csv_row():
+    # sync mode only trusts its ledger when the last row to keep reads back as the CSV has it, which a row the atlas cannot read never does
+    atlas, font = destination_atlas()
+    assert core.learn_controller_cell(atlas, render('2 3 37', font), (2, 3, 37))
+    datum = {'device': '2', 'channel': '3', 'cc': '37', 'layer 1': 'Tuba', 'layer 2': 'Volume', 'layer 3': '', 'layer 4': '', 'repeat': ''}
+    assert core.row_reads_back(atlas, render('2 3 37', font), render('Tuba -> Volume', font), datum)
+    assert not core.row_reads_back(atlas, render('2 3 37', font), render('Tuba -> Volume', font), dict(datum, cc='33'))
+    assert not core.row_reads_back(atlas, render('2 3 37', font), render('Tuba -> Volume', font), dict(datum, **{'layer 1': 'Piano'}))
+    assert not core.row_reads_back(core.new_glyph_atlas(), render('2 3 37', font), render('Tuba -> Volume', font), datum)
@@ -0,0 +1,77 @@
+###
+# VEP MIDI AutoMate 1.0.0 tests/test_ledger.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+# compares the sync mode ledger of the last run with the table in VEP and the CSV, and saves and loads ledgers
+
+import core, pytest
+
+WINDOW_SIZE = (1920, 1040)
+
+def row(device, cc, layer_1='Violins', layer_2='Volume'):
+    # a CSV row as core.load_csv returns it
+    return {'device': str(device), 'channel': '1', 'cc': str(cc), 'layer 1': layer_1, 'layer 2': layer_2, 'layer 3': '', 'layer 4': '', 'repeat': ''}
+
+def ledger_for(data, **values):
+    # the ledger a successful run over data leaves, in a table whose rows are 2 colour bands each below 4 for the empty table
+    ledger = {'rows': core.ledger_rows(data, core.REQUIRED_HEADERS), 'empty_table_bands': 4, 'bands_per_row': 2, 'scrolled': False, 'window_size': list(WINDOW_SIZE)}
+    ledger.update(values)
+    return ledger
+
+def table_bands(number_of_rows):
+    return 4 + 2*number_of_rows
+
+DATA = [row(1, 1), row(1, 2), row(2, 3), row(2, 4)]
+
+def test_ledger_rows_keep_only_the_required_headers_in_order():
+    assert core.ledger_rows([dict(row(3, 7), extra='x')], core.REQUIRED_HEADERS) == [['3', '1', '7', 'Violins', 'Volume', '', '', '']]
+
+@pytest.mark.parametrize('rows_before, rows_after, length', [([], [], 0), ([[1], [2]], [[1], [2]], 2), ([[1], [2], [3]], [[1], [9], [3]], 1), ([[1], [2]], [[1], [2], [3]], 2), ([[1], [2], [3]], [[1]], 1), ([[1]], [[2]], 0)])
+def test_common_prefix_length(rows_before, rows_after, length):
+    assert core.common_prefix_length(rows_before, rows_after) == length
+
+def test_unchanged_csv_keeps_every_row():
+    assert core.compare_ledger(ledger_for(DATA), table_bands(4), WINDOW_SIZE, core.ledger_rows(DATA, core.REQUIRED_HEADERS))[:2] == (4, 0)
+
+def test_changed_row_keeps_the_rows_before_it_and_deletes_the_rest():
+    data = DATA[:2] + [row(2, 3, layer_2='Pan')] + DATA[3:] + [row(3, 5)]
+    kept_rows, deleted_rows, message = core.compare_ledger(ledger_for(DATA), table_bands(4), WINDOW_SIZE, core.ledger_rows(data, core.REQUIRED_HEADERS))
+    assert (kept_rows, deleted_rows) == (2, 2)
+    assert message == 'keeping 2 unchanged rows, deleting 2 and inputting 3'
+
+def test_appended_rows_keep_every_row():
+    data = DATA + [row(3, 5), row(3, 6)]
+    assert core.compare_ledger(ledger_for(DATA), table_bands(4), WINDOW_SIZE, core.ledger_rows(data, core.REQUIRED_HEADERS))[:2] == (4, 0)
+
+def test_shorter_csv_deletes_the_rows_after_it():
+    assert core.compare_ledger(ledger_for(DATA), table_bands(4), WINDOW_SIZE, core.ledger_rows(DATA[:1], core.REQUIRED_HEADERS))[:2] == (1, 3)
+
+@pytest.mark.parametrize('ledger, bands, window_size', [
+    (None, table_bands(4), WINDOW_SIZE), # no previous run
+    (ledger_for(DATA), table_bands(5), WINDOW_SIZE), # a row added by hand since
+    (ledger_for(DATA), table_bands(3), WINDOW_SIZE), # a row deleted by hand since
+    (ledger_for(DATA, scrolled=True), table_bands(4), WINDOW_SIZE), # rows out of sight
+    (ledger_for(DATA), table_bands(4), (1280, 720)), # a different window size
+    (ledger_for(DATA, bands_per_row=0), table_bands(4), WINDOW_SIZE), # no rows measured
+])
+def test_rows_are_all_input_again_unless_the_table_matches_the_ledger(ledger, bands, window_size):
+    kept_rows, deleted_rows, message = core.compare_ledger(ledger, bands, window_size, core.ledger_rows(DATA, core.REQUIRED_HEADERS))
+    assert (kept_rows, deleted_rows) == (0, 0)
+    assert message.endswith('so all rows will be input')
+
+def test_ledgers_are_saved_loaded_and_forgotten_per_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(core, 'CONFIG_DIR', tmp_path)
+    monkeypatch.setattr(core, 'LEDGER_FILE', tmp_path / 'ledgers.json')
+    assert core.load_ledger('Vienna Ensemble Pro Server') is None
+    core.save_ledger('Vienna Ensemble Pro Server', ledger_for(DATA))
+    core.save_ledger('Vienna Ensemble Pro Standalone', ledger_for(DATA[:1]))
+    assert core.load_ledger('Vienna Ensemble Pro Server') == ledger_for(DATA)
+    core.save_ledger('Vienna Ensemble Pro Server', None)
+    assert core.load_ledger('Vienna Ensemble Pro Server') is None
+    assert core.load_ledger('Vienna Ensemble Pro Standalone') == ledger_for(DATA[:1])
+
+def test_unreadable_ledger_file_is_no_ledger(tmp_path, monkeypatch):
+    monkeypatch.setattr(core, 'LEDGER_FILE', tmp_path / 'ledgers.json')
+    (tmp_path / 'ledgers.json').write_text('{not json', encoding='utf-8')
+    assert core.load_ledger('Vienna Ensemble Pro Server') is None
@@ -0,0 +1,76 @@
+###
+# VEP MIDI AutoMate 1.0.0 tests/test_plan_row.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+# plans rows as core.go does before inputting them, and checks the menu keys that keyboard navigation presses
+
+import core, pytest
+from concurrent import futures
+
+DEVICE_POSITIONS = {device: (10, 20*device) for device in range(1, 5)}
+ITEM_HEIGHT = 20
+
+def datum(**values):
+    # a CSV row as core.load_csv returns it
+    row = {'device': '2', 'channel': '3', 'cc': '37', 'layer 1': 'Violins', 'layer 2': 'Volume', 'layer 3': '', 'layer 4': '', 'repeat': ''}
+    row.update(values)
+    return row
+
+def press(menu_keys):
+    # follows menu keys from a menu that has just opened with nothing highlighted, returning the index highlighted in each menu
+    indices = []
+    for key, presses in menu_keys:
+        if key == 'right':
+            indices.append(0)
+        elif indices:
+            indices[-1] += presses
+        else:
+            indices.append(presses - 1)
+    return indices
+
+def test_plan_keystrokes_search_each_layer_then_commit():
+    # layer 1 is typed into the empty search box and learnt from, each deeper layer replaces the search text, and repeat moves further down the last list
+    plan = core.plan_row(datum(**{'layer 3': 'Parameter 12', 'repeat': '2'}), DEVICE_POSITIONS, ITEM_HEIGHT)
+    assert plan['keystrokes'] == [('type', 'Violins'), ('learn', 'Violins'), ('press', 'down')] + core.CLEAR_TEXT_KEYSTROKES + [('type', 'Volume'), ('press', 'down')] + core.CLEAR_TEXT_KEYSTROKES + [('type', 'Parameter 12'), ('press', 'down'), ('press', 'down'), ('press', 'down'), ('press', 'enter')]
+    assert plan['layers'] == ['Violins', 'Volume', 'Parameter 12']
+
+def test_plan_ignores_repeat_without_layer_3():
+    plan = core.plan_row(datum(repeat='3'), DEVICE_POSITIONS, ITEM_HEIGHT)
+    assert plan['keystrokes'][-2:] == [('press', 'down'), ('press', 'enter')]
+    assert plan['layers'] == ['Violins', 'Volume']
+
+def test_plan_positions_items_in_the_middle_of_their_rows():
+    # cc 37 is in the third controller group (32 to 47), six items down
+    plan = core.plan_row(datum(), DEVICE_POSITIONS, ITEM_HEIGHT)
+    assert (plan['device'], plan['channel'], plan['controller_group'], plan['cc']) == (2, 3, 2, 37)
+    assert plan['device_position'] == DEVICE_POSITIONS[2]
+    assert (plan['channel_y'], plan['controller_group_y'], plan['cc_y']) == (50, 50, 110)
+
+@pytest.mark.parametrize('device, channel, cc', [(2, 3, 37), (1, 1, 0), (4, 16, 127), (3, 9, 16), (2, 1, 15)])
+def test_menu_keys_reach_the_planned_items(device, channel, cc):
+    plan = core.plan_row(datum(device=str(device), channel=str(channel), cc=str(cc)), DEVICE_POSITIONS, ITEM_HEIGHT)
+    assert plan['menu_indices'] == [device - 1, channel - 1, cc // 16, cc % 16]
+    assert press(plan['menu_keys']) == plan['menu_indices']
+
+def test_keyboard_keys_after_hovering_the_device_menu_move_focus_into_the_channel_menu():
+    # hovering over the device opens the channel menu but leaves focus in the device menu, so the first key must be right
+    plan = core.plan_row(datum(), DEVICE_POSITIONS, ITEM_HEIGHT)
+    keys = core.keyboard_menu_keys(plan['menu_keys'], 1)
+    assert keys[0] == ('right', 1)
+    assert press(keys) == plan['menu_indices'][1:]
+    assert core.keyboard_menu_keys(plan['menu_keys'], 0) == plan['menu_keys']
+
+def test_a_row_failing_before_planning_ahead_does_not_pass_its_plan_on():
+    # as in core.go: row 1 plans row 2 ahead, row 2 fails before planning row 3 ahead and is skipped, and row 3 must still get its own plan
+    data = [datum(device='1', cc='1'), datum(device='2', cc='2'), datum(device='3', cc='3')]
+    with futures.ThreadPoolExecutor(max_workers=1) as pipeline:
+        next_plan = None
+        plans = []
+        for row_number in range(len(data)):
+            plans.append(core.take_plan(next_plan, row_number, data[row_number], DEVICE_POSITIONS, ITEM_HEIGHT))
+            if row_number == 1:
+                continue
+            if row_number + 1 < len(data):
+                next_plan = (row_number + 1, pipeline.submit(core.plan_row, data[row_number + 1], DEVICE_POSITIONS, ITEM_HEIGHT))
+    assert plans == [core.plan_row(row, DEVICE_POSITIONS, ITEM_HEIGHT) for row in data]
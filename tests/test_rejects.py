@@ -0,0 +1,52 @@
+###
+# VEP MIDI AutoMate 1.0.0 tests/test_rejects.py
+# https://github.com/robertrussell22/VEP-MIDI-AutoMate
+###
+
+# writes the rows skipped when recovering from failures, as core.go does, and reads them back as a CSV to fix and input on its own
+
+import core, csv
+from pathlib import Path
+
+def row(device, cc, layer_1='Violins 1', layer_2='Volume', layer_3='', repeat=''):
+    # a CSV row as core.load_csv returns it
+    return {'device': str(device), 'channel': '1', 'cc': str(cc), 'layer 1': layer_1, 'layer 2': layer_2, 'layer 3': layer_3, 'layer 4': '', 'repeat': repeat}
+
+REJECTED_ROWS = [
+    (3, row(1, 2), 'Something went wrong. Unable to create a new row. Please contact the developer.'),
+    (7, row(2, 64, layer_1='Cellos, divisi', layer_2='Kontakt 7', layer_3='Parameter 12', repeat='2'), 'The destination in CSV row 7 reads \'Cellos divisi\' on screen, but the CSV asks for \'Parameter 12\'.\nMake sure this is spelt exactly as it appears in VEP.'),
+    (12, row(4, 127, layer_1='Flûtes'), 'timed out'),
+]
+
+def test_rejects_are_written_next_to_the_csv():
+    assert core.rejects_path(Path('templates') / 'strings.csv') == Path('templates') / 'strings-rejects.csv'
+
+def test_rejects_keep_each_row_with_its_csv_row_and_error(tmp_path):
+    path = tmp_path / 'strings-rejects.csv'
+    core.write_rejects(path, REJECTED_ROWS, core.REQUIRED_HEADERS)
+    with path.open(encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames == core.REQUIRED_HEADERS + ['csv row', 'error']
+        rows = list(reader)
+    assert [{header: written_row[header] for header in core.REQUIRED_HEADERS} for written_row in rows] == [datum for _, datum, _ in REJECTED_ROWS]
+    assert [(int(written_row['csv row']), written_row['error']) for written_row in rows] == [(csv_row, error) for csv_row, _, error in REJECTED_ROWS]
+
+def test_rejects_are_written_in_csv_order(tmp_path):
+    # turbo mode spot checks skip rows from the bottom up, after the rows below them
+    path = tmp_path / 'strings-rejects.csv'
+    core.write_rejects(path, REJECTED_ROWS[::-1], core.REQUIRED_HEADERS)
+    with path.open(encoding='utf-8', newline='') as f:
+        assert [int(written_row['csv row']) for written_row in csv.DictReader(f)] == [3, 7, 12]
+
+def test_rejects_can_be_input_on_their_own(tmp_path):
+    # the extra columns are ignored, so the rejects CSV passes the same checks and loads as the rows it came from
+    path = tmp_path / 'strings-rejects.csv'
+    core.write_rejects(path, REJECTED_ROWS, core.REQUIRED_HEADERS)
+    assert core.find_csv_problems(path) == []
+    assert [{header: datum[header] for header in core.REQUIRED_HEADERS} for datum in core.load_csv(path)] == [datum for _, datum, _ in REJECTED_ROWS]
+
+def test_rejects_fill_in_missing_values(tmp_path):
+    path = tmp_path / 'strings-rejects.csv'
+    core.write_rejects(path, [(2, {'device': '1', 'channel': '1', 'cc': '1'}, 'error')], core.REQUIRED_HEADERS)
+    with path.open(encoding='utf-8', newline='') as f:
+        assert list(csv.reader(f))[1] == ['1', '1', '1', '', '', '', '', '', '2', 'error']